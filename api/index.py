@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """
 Vercel API endpoint for Backlink Checker Pro
+
+Na inicialização da função (partida a frio) o app é importado e pré-aquecido
+conforme BACKLINKS_PREWARM ('off', 'dns' ou 'connect'; padrão: 'dns'); as
+fases medidas vão no cabeçalho Server-Timing da primeira resposta.
 """
 
-import sys
+import time
+
+_import_started = time.perf_counter()
+
 import os
+import sys
+
+# Adiciona o diretório pai ao path para importar o app (o vercel.json já
+# define PYTHONPATH=., então normalmente não é necessário)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
 
-# Adiciona o diretório pai ao path para importar o app
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import app, prewarm, startup_timings
 
-from app import app
+startup_timings.record('import', time.perf_counter() - _import_started)
+prewarm(os.getenv('BACKLINKS_PREWARM', 'dns'))
 
 # Para o Vercel
 if __name__ == "__main__":
@@ -3,146 +3,65 @@
 Backlink Checker Web App - Interface web para análise de backlinks
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
+import hmac
+import json
 import os
-import requests
+import secrets
+import threading
+import time
 from dotenv import load_dotenv
-from urllib.parse import urlparse
-import json
+
+from backlink_core import BacklinkClient
+from backlink_core.metrics import metrics
+from backlink_core.response_cache import CACHE_BYPASS, CACHE_MODES, CACHE_USE
+from backlink_core.result_cache import LRUResultCache, SingleFlight
+from backlink_core.server_timing import StartupTimings, format_server_timing
+from backlink_core.wire import (COMPRESSIBLE_MIMETYPES, FORMAT_COLUMNS, body_etag, choose_encoding,
+                                compress_body, negotiate_format)
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
 app = Flask(__name__)
 
-class BacklinkChecker:
-    """Classe para análise de backlinks usando SE Ranking API"""
-    
-    def __init__(self):
-        self.api_token = os.getenv('SE_RANKING_API_TOKEN')
-        self.base_url = "https://api.seranking.com"
-        self.session = requests.Session()
-        
-        if not self.api_token:
-            raise ValueError("Chave da API não encontrada!")
-    
-    def _make_request(self, endpoint: str, params: dict) -> dict:
-        """Faz uma requisição para a API da SE Ranking"""
-        url = f"{self.base_url}{endpoint}"
-        params['apiKey'] = self.api_token
-        
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Erro na requisição: {e}")
-        except json.JSONDecodeError as e:
-            raise Exception(f"Erro ao decodificar resposta JSON: {e}")
-    
-    def get_backlinks(self, domain: str, limit: int = 1000) -> dict:
-        """Obtém backlinks de um domínio"""
-        # Remove protocolo se presente
-        domain = domain.replace('http://', '').replace('https://', '').replace('www.', '')
-        
-        params = {
-            'target': domain,
-            'mode': 'domain',
-            'limit': limit,
-            'output': 'json'
-        }
-        
-        return self._make_request('/v1/backlinks/raw', params)
-    
-    def analyze_domain(self, domain: str) -> dict:
-        """Analisa um domínio e retorna dados formatados"""
-        try:
-            # Obtém dados dos backlinks
-            backlinks_data = self.get_backlinks(domain)
-            backlinks = backlinks_data.get('backlinks', [])
-            
-            # Conta domínios únicos
-            unique_domains = set()
-            dofollow_count = 0
-            nofollow_count = 0
-            image_links = 0
-            total_domain_rank = 0
-            domain_ranks = []
-            
-            for backlink in backlinks:
-                url_from = backlink.get('url_from', '')
-                if url_from:
-                    try:
-                        domain_name = urlparse(url_from).netloc
-                        if domain_name:
-                            unique_domains.add(domain_name)
-                    except:
-                        pass
-                
-                # Conta tipos de links
-                if backlink.get('nofollow', False):
-                    nofollow_count += 1
-                else:
-                    dofollow_count += 1
-                
-                # Conta links de imagem
-                if backlink.get('image', False):
-                    image_links += 1
-                
-                # Coleta ranks de domínio
-                domain_rank = backlink.get('domain_inlink_rank', 0)
-                if domain_rank > 0:
-                    domain_ranks.append(domain_rank)
-                    total_domain_rank += domain_rank
-            
-            # Calcula estatísticas
-            avg_domain_rank = total_domain_rank / len(domain_ranks) if domain_ranks else 0
-            max_domain_rank = max(domain_ranks) if domain_ranks else 0
-            min_domain_rank = min(domain_ranks) if domain_ranks else 0
-            
-            # Formata dados para exibição (TODOS os backlinks)
-            formatted_backlinks = []
-            for i, backlink in enumerate(backlinks, 1):
-                formatted_backlinks.append({
-                    'position': i,
-                    'source_url': backlink.get('url_from', 'N/A'),
-                    'target_url': backlink.get('url_to', 'N/A'),
-                    'title': backlink.get('title', 'N/A'),
-                    'anchor_text': backlink.get('anchor', 'N/A'),
-                    'alt_text': backlink.get('alt', 'N/A'),
-                    'is_nofollow': backlink.get('nofollow', False),
-                    'is_image': backlink.get('image', False),
-                    'image_source': backlink.get('image_source', ''),
-                    'inlink_rank': backlink.get('inlink_rank', 0),
-                    'domain_inlink_rank': backlink.get('domain_inlink_rank', 0),
-                    'first_seen': backlink.get('first_seen', 'N/A'),
-                    'last_visited': backlink.get('last_visited', 'N/A')
-                })
-            
-            return {
-                'success': True,
-                'domain': domain,
-                'total_backlinks': len(backlinks),
-                'total_referring_domains': len(unique_domains),
-                'dofollow_count': dofollow_count,
-                'nofollow_count': nofollow_count,
-                'image_links': image_links,
-                'avg_domain_rank': round(avg_domain_rank, 2),
-                'max_domain_rank': max_domain_rank,
-                'min_domain_rank': min_domain_rank,
-                'all_backlinks': formatted_backlinks,
-                'has_more': 'next' in backlinks_data
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
-
 # Inicializa o checker (será criado quando necessário)
 checker = None
 
+# Resultados prontos por domínio e coalescência de análises simultâneas
+result_cache = LRUResultCache.from_env()
+analysis_flight = SingleFlight()
+
+# Análises em segundo plano (fila em SQLite e threads criadas sob demanda)
+job_workers = None
+job_workers_lock = threading.Lock()
+
+# Fases da partida a frio, informadas no cabeçalho Server-Timing
+startup_timings = StartupTimings()
+
+# Compressão das respostas (gzip/br) a partir deste tamanho; 'off' desliga
+COMPRESSION_ENABLED = os.getenv('BACKLINKS_COMPRESSION', 'on').lower() not in ('off', '0', 'false')
+COMPRESS_MIN_BYTES = int(os.getenv('BACKLINKS_COMPRESS_MIN_BYTES', '1024'))
+
+# /analyze/stream: resumo completo (evento `stats`) na 1ª página e a cada N;
+# nas demais, só o progresso (evento `progress`)
+STREAM_STATS_EVERY = max(1, int(os.getenv('BACKLINKS_STREAM_STATS_EVERY', '10')))
+
+# Endpoint /metrics (formato de texto do Prometheus); 'off' desliga
+METRICS_ENABLED = os.getenv('BACKLINKS_METRICS', 'on').lower() not in ('off', '0', 'false')
+
+# Perfil por requisição (cabeçalho X-Profile ou ?profile=): desligado por
+# padrão; com BACKLINKS_PROFILING_TOKEN, exige também o X-Profile-Token
+PROFILING_ENABLED = os.getenv('BACKLINKS_PROFILING', 'off').lower() in ('on', '1', 'true')
+PROFILING_TOKEN = os.getenv('BACKLINKS_PROFILING_TOKEN', '')
+PROFILE_DIR = os.getenv('BACKLINKS_PROFILE_DIR', 'profiles')
+# Uma requisição perfilada por vez; as demais seguem sem perfil
+profiling_slot = threading.BoundedSemaphore(1)
+
+# Pré-aquecimento: 'off', 'dns' (template, cliente e DNS) ou 'connect' (abre
+# também a conexão com a API)
+PREWARM_MODES = ('off', 'dns', 'connect')
+
 def get_checker():
     """Obtém ou cria uma instância do checker"""
     global checker
@@ -154,21 +73,266 @@ def get_checker():
                 print("❌ SE_RANKING_API_TOKEN não encontrada nas variáveis de ambiente")
                 return None
             
-            checker = BacklinkChecker()
-            print("✅ BacklinkChecker inicializado com sucesso")
+            with startup_timings.measure('client'):
+                checker = BacklinkClient()
+            print("✅ BacklinkClient inicializado com sucesso")
         except Exception as e:
-            print(f"❌ Erro ao inicializar BacklinkChecker: {e}")
+            print(f"❌ Erro ao inicializar BacklinkClient: {e}")
             return None
     return checker
 
+def analyze_cached(current_checker: BacklinkClient, domain: str,
+                   cache_mode: str = CACHE_USE) -> dict:
+    """Analisa um domínio reaproveitando resultados recentes
+    
+    Requisições simultâneas para o mesmo domínio aguardam uma única análise
+    em vez de repetir as chamadas à API.
+    """
+    domain = current_checker.normalize_domain(domain)
+    if cache_mode == CACHE_USE:
+        cached = result_cache.get(domain)
+        if cached is not None:
+            return cached
+    
+    def run():
+        result = current_checker.analyze_domain(domain, cache_mode=cache_mode)
+        # Guarda antes de liberar os demais, para que novas requisições já
+        # encontrem o resultado no cache
+        if result.get('success') and cache_mode != CACHE_BYPASS:
+            result_cache.put(domain, result)
+        return result
+    
+    result, _ = analysis_flight.do((domain, cache_mode), run)
+    return result
+
+def prewarm(mode: str = 'dns'):
+    """Antecipa para a inicialização o trabalho da primeira requisição
+    
+    Compila o template da página principal, cria o cliente (requests, pool de
+    conexões e cache em disco) e resolve o DNS da API. Com `mode='connect'`,
+    abre também a conexão TCP/TLS, que fica no pool com keep-alive (no modo
+    de sessão 'per-thread', só para a thread atual). Falhas de rede não
+    impedem a inicialização.
+    """
+    if mode not in PREWARM_MODES:
+        print(f"⚠️  Modo de pré-aquecimento inválido: {mode} (use {', '.join(PREWARM_MODES)})")
+        return
+    if mode == 'off':
+        return
+    
+    with startup_timings.measure('template'):
+        app.jinja_env.get_template('index.html')
+    
+    current_checker = get_checker()
+    if not current_checker:
+        return
+    
+    import socket
+    from urllib.parse import urlsplit
+    
+    url = urlsplit(current_checker.base_url)
+    port = url.port or (443 if url.scheme == 'https' else 80)
+    try:
+        with startup_timings.measure('dns'):
+            socket.getaddrinfo(url.hostname, port, type=socket.SOCK_STREAM)
+        if mode == 'connect':
+            with startup_timings.measure('connect'):
+                transport = current_checker.transport
+                transport.session.head(current_checker.base_url, timeout=transport.config.timeout).close()
+    except OSError as e:
+        # Inclui as exceções do requests (derivadas de IOError)
+        print(f"⚠️  Pré-aquecimento incompleto: {e}")
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+    if PROFILING_ENABLED:
+        start_profile()
+
+def start_profile():
+    """Inicia o perfil da requisição, se pedido por X-Profile ou ?profile=
+    (`sampling`, o padrão, ou `cprofile`) e autorizado pelo token"""
+    mode = request.headers.get('X-Profile') or request.args.get('profile')
+    if not mode:
+        return
+    if PROFILING_TOKEN and not hmac.compare_digest(request.headers.get('X-Profile-Token', ''), PROFILING_TOKEN):
+        return
+    from backlink_core.profiling import MODES, ProfileSession
+    
+    mode = mode if mode in MODES else 'sampling'
+    if not profiling_slot.acquire(blocking=False):
+        g.profile_busy = True
+        return
+    try:
+        g.profile = ProfileSession(mode=mode, current_thread=True).start()
+    except BaseException:
+        profiling_slot.release()
+        raise
+
+def finish_profile():
+    """Encerra o perfil da requisição (se houver) e libera a vaga; None se não havia"""
+    session = g.pop('profile', None)
+    if session is None:
+        return None
+    try:
+        session.stop()
+    finally:
+        profiling_slot.release()
+    return session
+
+@app.after_request
+def write_profile(response):
+    """Grava o perfil da requisição em BACKLINKS_PROFILE_DIR e informa o
+    arquivo (X-Profile-File) e o tempo por etapa (Server-Timing)
+    
+    Registrado antes dos demais para rodar por último e incluir a
+    serialização e a compressão. Em respostas em streaming (SSE, /export),
+    cobre só até o envio dos cabeçalhos.
+    """
+    if not PROFILING_ENABLED:
+        return response
+    if g.pop('profile_busy', False):
+        response.headers['X-Profile'] = 'busy'
+    session = finish_profile()
+    if session is None:
+        return response
+    name = f"{request.endpoint or 'unmatched'}-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+    try:
+        paths = session.write(os.path.join(PROFILE_DIR, name))
+    except OSError as e:
+        print(f"⚠️  Perfil não gravado: {e}")
+        response.headers['X-Profile'] = 'error'
+        return response
+    response.headers['X-Profile-File'] = ', '.join(os.path.basename(path) for path in paths)
+    entries = [(f"stage-{name}", stage['total_ms'], f"{stage['count']}x")
+               for name, stage in session.stages().items()]
+    if entries:
+        timing = format_server_timing(entries)
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f"{existing}, {timing}" if existing else timing
+    return response
+
+@app.teardown_request
+def discard_profile(_):
+    """Encerra o perfil de uma requisição que não chegou ao after_request"""
+    if PROFILING_ENABLED:
+        finish_profile()
+
+@app.after_request
+def add_server_timing(response):
+    """Cabeçalho Server-Timing: tempo da requisição e, na primeira resposta
+    da instância, as fases da partida a frio (importação, template, cliente...)"""
+    entries = startup_timings.take()
+    started = g.get('request_started')
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        entries.append(('app', elapsed * 1000, None))
+        # Em respostas em streaming (SSE, /export), só até o envio dos cabeçalhos
+        metrics.observe('request_seconds', elapsed,
+                        endpoint=request.url_rule.rule if request.url_rule else 'unmatched')
+    compressed = g.get('compressed')
+    if compressed:
+        entries.append(('compress', compressed[1], compressed[0]))
+    if entries:
+        response.headers['Server-Timing'] = format_server_timing(entries)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """ETag/304 para GET e compressão gzip/br conforme o Accept-Encoding
+    
+    Registrado depois do Server-Timing para rodar antes dele (o Flask chama
+    os after_request em ordem inversa) e incluir o tempo de compressão.
+    Respostas em streaming (SSE) não são alteradas.
+    """
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    body = response.get_data()
+    if request.method in ('GET', 'HEAD'):
+        # ETag fraco: o mesmo para qualquer codificação do corpo
+        response.set_etag(body_etag(body), weak=True)
+        response.headers.setdefault('Cache-Control', 'no-cache')
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    
+    if not COMPRESSION_ENABLED:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding and len(body) >= COMPRESS_MIN_BYTES:
+        started = time.perf_counter()
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        elapsed = time.perf_counter() - started
+        metrics.observe('stage_seconds', elapsed, stage='compress')
+        g.compressed = (encoding, elapsed * 1000)
+    return response
+
 @app.route('/')
 def index():
     """Página principal"""
     return render_template('index.html')
 
-@app.route('/analyze', methods=['POST'])
+def parse_analyze_request():
+    """Valida o corpo do /analyze (ou a query string, no GET): retorna (dados,
+    domínio, modo do cache, erro)"""
+    data = request.args.to_dict() if request.method == 'GET' else request.get_json()
+    domain = data.get('domain', '').strip()
+    
+    if not domain:
+        return data, None, None, 'Domínio é obrigatório'
+    
+    # Modo do cache: 'use' (padrão), 'refresh' (força nova busca) ou 'bypass'
+    cache_mode = data.get('cache', CACHE_USE)
+    if cache_mode not in CACHE_MODES:
+        return data, None, None, f"Modo de cache inválido: {cache_mode}"
+    try:
+        data['format'] = response_format(data.get('format'))
+    except ValueError as e:
+        return data, None, None, str(e)
+    return data, domain, cache_mode, None
+
+def response_format(requested=None) -> str:
+    """Formato dos backlinks na resposta: parâmetro `format` ('rows' ou
+    'columns') ou cabeçalho Accept"""
+    return negotiate_format(requested or request.args.get('format'), request.headers.get('Accept', ''))
+
+def wire_response(payload: dict):
+    """jsonify de respostas cujo formato depende do cabeçalho Accept"""
+    with metrics.measure('serialize'):
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
+
+def analyze_response(result: dict, data: dict) -> dict:
+    """Resposta do /analyze a partir do resultado da análise"""
+    # A interface busca os backlinks sob demanda em /backlinks
+    response = {key: value for key, value in result.items() if key != 'backlinks_table'}
+    include_backlinks = data.get('include_backlinks', True)
+    if isinstance(include_backlinks, str):
+        include_backlinks = include_backlinks.lower() not in ('0', 'false', 'no')
+    if result.get('success') and include_backlinks:
+        table = result['backlinks_table']
+        with metrics.measure('format'):
+            if data.get('format') == FORMAT_COLUMNS:
+                response['all_backlinks'] = table.to_columns()
+            else:
+                response['all_backlinks'] = table.to_rows()
+    return response
+
+@app.route('/analyze', methods=['GET', 'POST'])
 def analyze():
-    """Endpoint para análise de backlinks"""
+    """Endpoint para análise de backlinks
+    
+    Aceita os parâmetros no corpo JSON (POST) ou na query string (GET, que
+    permite revalidar a resposta com ETag). `format: 'columns'` (ou o Accept
+    `application/vnd.backlinks.columns+json`) devolve `all_backlinks` no
+    formato compacto colunar.
+    """
     current_checker = get_checker()
     if not current_checker:
         return jsonify({
@@ -176,19 +340,474 @@ def analyze():
             'error': 'Sistema não configurado. Verifique a chave da API.'
         })
     
-    data = request.get_json()
-    domain = data.get('domain', '').strip()
+    data, domain, cache_mode, error = parse_analyze_request()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        })
+    
+    # Analisa o domínio
+    result = analyze_cached(current_checker, domain, cache_mode=cache_mode)
+    return wire_response(analyze_response(result, data))
+
+@app.route('/analyze/async', methods=['POST'])
+async def analyze_async():
+    """Como /analyze, usando o AsyncBacklinkClient (requer httpx e flask[async])
+    
+    Compartilha o cache de resultados com /analyze. O Flask executa views
+    assíncronas em um event loop por requisição, então o cliente (e seu pool
+    de conexões) é criado a cada análise.
+    """
+    current_checker = get_checker()
+    if not current_checker:
+        return jsonify({
+            'success': False,
+            'error': 'Sistema não configurado. Verifique a chave da API.'
+        })
+    
+    data, domain, cache_mode, error = parse_analyze_request()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        })
+    
+    domain = current_checker.normalize_domain(domain)
+    result = result_cache.get(domain) if cache_mode == CACHE_USE else None
+    if result is None:
+        try:
+            from backlink_core import AsyncBacklinkClient
+            async with AsyncBacklinkClient(base_url=current_checker.base_url) as client:
+                result = await client.analyze_domain(domain, cache_mode=cache_mode)
+        except (RuntimeError, ValueError) as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            })
+        if result.get('success') and cache_mode != CACHE_BYPASS:
+            result_cache.put(domain, result)
+    return wire_response(analyze_response(result, data))
+
+def get_job_queue():
+    """Fila de jobs, com os workers deste processo iniciados na primeira chamada
+    
+    BACKLINKS_JOB_WORKERS define quantas threads consomem a fila (padrão: 2;
+    0 = só enfileira, para workers externos: backlink_checker.py --jobs-worker).
+    """
+    global job_workers
+    from backlink_core.jobs import JobWorkerPool, get_shared_queue
+    
+    queue = get_shared_queue()
+    workers = int(os.getenv('BACKLINKS_JOB_WORKERS', '2'))
+    current_checker = get_checker()
+    if job_workers is None and workers > 0 and current_checker:
+        with job_workers_lock:
+            if job_workers is None:
+                job_workers = JobWorkerPool(current_checker, queue, workers=workers, build_table=True,
+                                            on_complete=cache_job_result).start()
+    return queue
+
+def cache_job_result(result: dict):
+    """Guarda o resultado de um job concluído para o /backlinks (se tiver a tabela)"""
+    if result.get('success') and 'backlinks_table' in result:
+        result_cache.put(result['domain'], result)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Enfileira a análise de um domínio em segundo plano (perfis grandes)
+    
+    Aceita o mesmo corpo do /analyze; o progresso é consultado em /jobs/<id>.
+    O orçamento da paginação é o de BACKLINKS_JOB_MAX_ROWS e
+    BACKLINKS_JOB_MAX_PAGES (padrão: 100000 linhas, sem limite de páginas).
+    """
+    current_checker = get_checker()
+    if not current_checker:
+        return jsonify({
+            'success': False,
+            'error': 'Sistema não configurado. Verifique a chave da API.'
+        })
+    
+    data, domain, cache_mode, error = parse_analyze_request()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        })
+    
+    job = get_job_queue().submit(current_checker.normalize_domain(domain),
+                                 int(os.getenv('BACKLINKS_JOB_MAX_ROWS', '100000')),
+                                 int(os.getenv('BACKLINKS_JOB_MAX_PAGES', '0')),
+                                 cache_mode=cache_mode)
+    if job_workers:
+        job_workers.notify()
+    job['success'] = True
+    job['status_url'] = f"/jobs/{job['job_id']}"
+    return jsonify(job), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Progresso de um job: páginas, linhas, estimativa de término e resumo parcial"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job não encontrado'
+        }), 404
+    
+    job['success'] = True
+    if 'result' in job:
+        # A lista de backlinks só está disponível se a tabela estiver em memória
+        job['backlinks_available'] = result_cache.get(job['domain']) is not None
+    return jsonify(job)
+
+def sse_event(event: str, data: dict) -> str:
+    """Um evento no formato Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_stats(stats, page: int) -> dict:
+    """Resumo parcial enviado a cada página (sem os campos mais longos)"""
+    summary = stats.summary(top_n=5)
+    summary['pages_fetched'] = page
+    return summary
+
+@app.route('/analyze/stream')
+def analyze_stream():
+    """Análise com os resultados enviados por Server-Sent Events
+    
+    Parâmetros: domain, cache e rows (total de backlinks enviados durante a
+    análise, padrão 100). A cada página da API são enviados os eventos
+    `progress` (páginas e backlinks processados) e `rows` (backlinks já
+    formatados, até completar `rows`); na primeira página e a cada
+    BACKLINKS_STREAM_STATS_EVERY páginas, vai também `stats` (resumo
+    acumulado, mais caro de calcular). Ao fim, `done` com o mesmo corpo do
+    /analyze sem a lista completa, ou `failure` com o erro. O resultado fica no cache, então
+    /backlinks pagina sem nova análise.
+    """
+    from backlink_core.backlink_table import format_backlink
+    
+    current_checker = get_checker()
+    domain = request.args.get('domain', '').strip()
+    cache_mode = request.args.get('cache', CACHE_USE)
+    error = None
+    if not current_checker:
+        error = 'Sistema não configurado. Verifique a chave da API.'
+    elif not domain:
+        error = 'Domínio é obrigatório'
+    elif cache_mode not in CACHE_MODES:
+        error = f"Modo de cache inválido: {cache_mode}"
+    try:
+        row_limit = max(0, min(int(request.args.get('rows', 100)), 1000))
+    except ValueError:
+        error = error or 'Parâmetros numéricos inválidos'
     
+    def generate():
+        if error:
+            yield sse_event('failure', {'success': False, 'error': error})
+            return
+        
+        normalized = current_checker.normalize_domain(domain)
+        result = result_cache.get(normalized) if cache_mode == CACHE_USE else None
+        if result is not None:
+            # Resultado pronto: um único lote com as primeiras linhas da tabela
+            table = result['backlinks_table']
+            first_rows = [table.row(index) for index in range(min(row_limit, len(table)))]
+            yield sse_event('rows', {'page': 1, 'backlinks': first_rows})
+        else:
+            sent = 0
+            for event in current_checker.iter_analysis(normalized, cache_mode=cache_mode,
+                                                       page_rows=row_limit):
+                if event['event'] == 'result':
+                    result = event['result']
+                    break
+                if event['page'] == 1 or event['page'] % STREAM_STATS_EVERY == 0:
+                    yield sse_event('stats', stream_stats(event['stats'], event['page']))
+                else:
+                    yield sse_event('progress', {'pages_fetched': event['page'],
+                                                 'total_backlinks': event['stats'].total_backlinks})
+                if sent < row_limit:
+                    # As linhas da página seguem a numeração do perfil inteiro
+                    first = event['stats'].total_backlinks - event['rows']
+                    rows = [format_backlink(backlink, first + offset)
+                            for offset, backlink in enumerate(event['backlinks'][:row_limit - sent], 1)]
+                    sent += len(rows)
+                    yield sse_event('rows', {'page': event['page'], 'backlinks': rows})
+            if result.get('success') and cache_mode != CACHE_BYPASS:
+                result_cache.put(normalized, result)
+        
+        final = analyze_response(result, {'include_backlinks': False})
+        yield sse_event('done' if final['success'] else 'failure', final)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/backlinks')
+def backlinks():
+    """Endpoint de consulta paginada dos backlinks de um domínio já analisado
+    
+    Parâmetros: domain, type (all/dofollow/nofollow/image), anchor, min_rank,
+    sort (position/domain_rank/first_seen), page, page_size e format
+    (rows/columns).
+    """
+    current_checker = get_checker()
+    if not current_checker:
+        return jsonify({
+            'success': False,
+            'error': 'Sistema não configurado. Verifique a chave da API.'
+        })
+    
+    domain = request.args.get('domain', '').strip()
     if not domain:
         return jsonify({
             'success': False,
             'error': 'Domínio é obrigatório'
         })
     
-    # Analisa o domínio
-    result = current_checker.analyze_domain(domain)
+    try:
+        min_rank = int(request.args.get('min_rank', 0))
+        page = int(request.args.get('page', 1))
+        page_size = int(request.args.get('page_size', 20))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Parâmetros numéricos inválidos'
+        })
+    try:
+        wire_format = response_format()
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+    
+    # Usa o resultado em memória (ou analisa o domínio, se ainda não estiver lá)
+    result = analyze_cached(current_checker, domain)
+    if not result.get('success'):
+        return jsonify(result)
+    
+    try:
+        page_data = result['backlinks_table'].query(
+            link_type=request.args.get('type', 'all'),
+            anchor=request.args.get('anchor'),
+            min_rank=min_rank,
+            sort=request.args.get('sort', 'position'),
+            page=page,
+            page_size=page_size,
+            compact=wire_format == FORMAT_COLUMNS
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+    
+    page_data['success'] = True
+    page_data['domain'] = result['domain']
+    return wire_response(page_data)
+
+@app.route('/export')
+def export():
+    """Exporta os backlinks de um domínio em CSV, NDJSON ou Parquet
+    
+    Parâmetros: domain, format (csv/ndjson/parquet; padrão: csv) e cache. As
+    linhas são convertidas à medida que as páginas chegam da API e enviadas
+    em chunks (Transfer-Encoding: chunked), sem montar a lista completa. O
+    total segue BACKLINKS_EXPORT_MAX_ROWS (padrão: 100000; 0 = sem limite).
+    """
+    from itertools import chain
+    from backlink_core.export import BacklinkExporter
+    
+    current_checker = get_checker()
+    if not current_checker:
+        return jsonify({
+            'success': False,
+            'error': 'Sistema não configurado. Verifique a chave da API.'
+        })
+    
+    domain = request.args.get('domain', '').strip()
+    if not domain:
+        return jsonify({
+            'success': False,
+            'error': 'Domínio é obrigatório'
+        })
+    
+    cache_mode = request.args.get('cache', CACHE_USE)
+    if cache_mode not in CACHE_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"Modo de cache inválido: {cache_mode}"
+        })
+    
+    export_format = request.args.get('format', 'csv')
+    try:
+        exporter = BacklinkExporter(export_format)
+    except (RuntimeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+    
+    domain = current_checker.normalize_domain(domain)
+    errors = []
+    pages = current_checker.iter_page_rows(domain, errors, cache_mode=cache_mode,
+                                           max_rows=int(os.getenv('BACKLINKS_EXPORT_MAX_ROWS', '100000')))
+    # A primeira página é buscada antes de responder: uma falha ainda vira um erro JSON
+    first_page = next(pages, None)
+    if errors:
+        return jsonify({
+            'success': False,
+            'error': errors[0]
+        })
+    
+    def generate():
+        yield from exporter.iter_chunks(chain([first_page] if first_page is not None else [], pages))
+        if errors:
+            print(f"⚠️  Exportação de {domain} interrompida após {exporter.rows} linhas: {errors[0]}")
+    
+    return Response(stream_with_context(generate()), mimetype=exporter.mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{domain}-backlinks.{export_format}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/compare', methods=['POST'])
+def compare():
+    """Endpoint de link gap: domínios que linkam para concorrentes e não para o alvo
+    
+    Corpo JSON: target, competitors (lista), min_competitors (padrão: 1; de
+    1 ao número de concorrentes, senão HTTP 400), level (registrable/host), limit (domínios por lista, padrão: 100) e
+    cache. Os perfis são buscados em paralelo (BACKLINKS_COMPARE_WORKERS,
+    padrão: 8), até BACKLINKS_COMPARE_MAX_DOMAINS concorrentes (padrão: 20).
+    A resposta traz também a matriz de sobreposição, os domínios únicos de
+    cada perfil e os comuns a todos.
+    """
+    from backlink_core.link_gap import link_gap
+    
+    current_checker = get_checker()
+    if not current_checker:
+        return jsonify({
+            'success': False,
+            'error': 'Sistema não configurado. Verifique a chave da API.'
+        })
+    
+    data = request.get_json(silent=True) or {}
+    target = str(data.get('target', '')).strip()
+    competitors = data.get('competitors') or []
+    if not target:
+        return jsonify({
+            'success': False,
+            'error': 'Domínio é obrigatório'
+        })
+    if not isinstance(competitors, list) or not all(isinstance(item, str) for item in competitors):
+        return jsonify({
+            'success': False,
+            'error': 'competitors deve ser uma lista de domínios'
+        })
+    max_domains = int(os.getenv('BACKLINKS_COMPARE_MAX_DOMAINS', '20'))
+    if len(competitors) > max_domains:
+        return jsonify({
+            'success': False,
+            'error': f"Máximo de {max_domains} concorrentes por comparação"
+        })
+    
+    cache_mode = data.get('cache', CACHE_USE)
+    if cache_mode not in CACHE_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"Modo de cache inválido: {cache_mode}"
+        })
+    
+    try:
+        result = link_gap(current_checker, target, competitors,
+                          min_competitors=int(data.get('min_competitors', 1)),
+                          level=data.get('level', 'registrable'),
+                          limit=max(0, min(int(data.get('limit', 100)), 10000)),
+                          workers=int(os.getenv('BACKLINKS_COMPARE_WORKERS', '8')),
+                          cache_mode=cache_mode)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    return jsonify(result)
+
+@app.route('/history/<domain>')
+def history(domain):
+    """Tendência do perfil de um domínio, a partir do histórico das análises
+    
+    Parâmetros: bucket (day/week/month, padrão: day) e o período, com since
+    e until (datas ISO em UTC; until exclusivo) ou days (últimos N dias).
+    Não chama a API: lê o histórico gravado a cada análise
+    (BACKLINKS_HISTORY_DIR; BACKLINKS_HISTORY=off desliga).
+    """
+    from backlink_core.history import get_shared_history, parse_time
+    from backlink_core.normalize import normalize_domain
+    
+    store = get_shared_history()
+    if store is None:
+        return jsonify({
+            'success': False,
+            'error': 'Histórico desativado'
+        }), 404
+    
+    try:
+        since = parse_time(request.args['since']) if request.args.get('since') else None
+        until = parse_time(request.args['until']) if request.args.get('until') else None
+        if request.args.get('days'):
+            since = time.time() - float(request.args['days']) * 86400
+        result = store.trend(normalize_domain(domain), request.args.get('bucket', 'day'), since, until)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+    if not result['points']:
+        return jsonify({
+            'success': False,
+            'error': 'Sem histórico para o domínio'
+        }), 404
     return jsonify(result)
 
+def collected_metrics() -> list:
+    """Contadores já mantidos pelos caches, pela coalescência e pelo limitador"""
+    cache = result_cache.stats()
+    flight = analysis_flight.stats()
+    families = [
+        ('result_cache_requests_total', 'counter', 'Consultas ao cache de resultados em memória',
+         [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]),
+        ('result_cache_entries', 'gauge', 'Resultados no cache em memória', [({}, cache['entries'])]),
+        ('result_cache_bytes', 'gauge', 'Tamanho estimado do cache em memória', [({}, cache['estimated_bytes'])]),
+        ('analyses_coalesced_total', 'counter', 'Requisições que aguardaram uma análise já em andamento',
+         [({}, flight['coalesced'])])
+    ]
+    # Sem criar o cliente: antes da primeira análise, só as métricas acima
+    if checker is not None:
+        limiter = checker.limiter.stats()
+        families += [
+            ('rate_limiter_retries_total', 'counter', 'Retentativas de chamadas à API', [({}, limiter['retries'])]),
+            ('rate_limiter_throttled_total', 'counter', 'Respostas HTTP 429 da API', [({}, limiter['throttled'])]),
+            ('rate_limiter_in_flight', 'gauge', 'Chamadas à API em andamento', [({}, limiter['in_flight'])])
+        ]
+        if checker.cache:
+            response_cache = checker.cache.stats()
+            families.append(('response_cache_requests_total', 'counter', 'Consultas ao cache de respostas em disco',
+                             [({'result': 'hit'}, response_cache['hits']),
+                              ({'result': 'miss'}, response_cache['misses'])]))
+    return families
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Métricas no formato de texto do Prometheus
+    
+    Histogramas por etapa (`backlinks_stage_seconds`: upstream, decode,
+    aggregate, format, serialize, compress) e por endpoint
+    (`backlinks_request_seconds`), contadores de chamadas à API, bytes,
+    linhas e erros por tipo, e os contadores dos caches e do limitador.
+    BACKLINKS_METRICS=off desliga o endpoint.
+    """
+    if not METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'Métricas desativadas'}), 404
+    return Response(metrics.render(collected_metrics()), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health():
     """Endpoint de saúde da aplicação"""
@@ -196,7 +815,12 @@ def health():
     return jsonify({
         'status': 'ok',
         'api_configured': current_checker is not None,
-        'api_token_present': bool(os.getenv('SE_RANKING_API_TOKEN'))
+        'api_token_present': bool(os.getenv('SE_RANKING_API_TOKEN')),
+        'response_cache': current_checker.cache.stats() if current_checker and current_checker.cache else None,
+        'result_cache': result_cache.stats(),
+        'coalescing': analysis_flight.stats(),
+        'transport': current_checker.transport.stats() if current_checker else None,
+        'startup_ms': startup_timings.stats()
     })
 
 @app.route('/debug')
@@ -5,108 +5,109 @@ Autor: Assistente de Programação
 Versão: 1.0.0
 """
 
-import argparse
-import os
 import sys
-import requests
-from dotenv import load_dotenv
+import time
 from typing import Dict, List, Optional, Tuple
-import json
-from datetime import datetime
 
+from backlink_core.client import BacklinkClient
+from backlink_core.export import JSONLWriter
+from backlink_core.response_cache import CACHE_BYPASS, CACHE_REFRESH, CACHE_USE
 
-class BacklinkChecker:
-    """Classe principal para análise de backlinks usando SE Ranking API"""
+
+class BacklinkChecker(BacklinkClient):
+    """Classe principal para análise de backlinks usando SE Ranking API
     
-    def __init__(self):
-        """Inicializa o checker e carrega configurações"""
-        load_dotenv()
-        self.api_token = os.getenv('SE_RANKING_API_TOKEN')
-        self.base_url = "https://api.seranking.com"
-        self.session = requests.Session()
-        
-        if not self.api_token:
-            print("❌ ERRO: Chave da API não encontrada!")
-            print("💡 Dica: Crie um arquivo .env com SE_RANKING_API_TOKEN=sua_chave_aqui")
-            sys.exit(1)
+    Acrescenta ao BacklinkClient a exibição no terminal; as requisições, a
+    paginação e as estatísticas vêm do núcleo compartilhado (backlink_core).
+    """
     
-    def _make_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
-        """Faz uma requisição para a API da SE Ranking"""
-        url = f"{self.base_url}{endpoint}"
+    def __init__(self, max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                 pool_size: Optional[int] = None, cache_mode: str = CACHE_USE,
+                 aggregation_workers: Optional[int] = None):
+        """Inicializa o checker e valida a chave da API
         
-        # Adiciona a chave da API como parâmetro para a API v1
-        params['apiKey'] = self.api_token
+        `pool_size` dimensiona o pool de conexões por host (padrão:
+        SE_RANKING_POOL_SIZE), compartilhado entre várias threads no modo
+        lote. `cache_mode` controla o cache em disco: 'use', 'refresh' ou
+        'bypass'.
+        `aggregation_workers` agrega as páginas em vários processos (padrão:
+        BACKLINKS_AGGREGATION_WORKERS; 0 = desligado).
+        """
+        from dotenv import load_dotenv
         
+        load_dotenv()
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Erro na requisição: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"❌ Erro ao decodificar resposta JSON: {e}")
-            return None
-    
-    def get_backlinks_summary(self, domain: str) -> Optional[Dict]:
-        """Obtém resumo dos backlinks de um domínio"""
-        print(f"🔍 Analisando o domínio: {domain}")
-        print("⏳ Buscando dados de resumo...")
-        
-        params = {
-            'target': domain,
-            'mode': 'domain',
-            'limit': 100,
-            'output': 'json'
-        }
-        
-        return self._make_request('/v1/backlinks/raw', params)
-    
-    def get_backlinks_list(self, domain: str, limit: int = 10) -> Optional[Dict]:
-        """Obtém lista de backlinks de um domínio"""
-        print("⏳ Buscando lista de backlinks...")
-        
-        params = {
-            'target': domain,
-            'mode': 'domain',
-            'limit': limit,
-            'output': 'json'
-        }
-        
-        return self._make_request('/v1/backlinks/raw', params)
+            super().__init__(max_rows=max_rows, max_pages=max_pages,
+                             pool_size=pool_size, cache_mode=cache_mode,
+                             aggregation_workers=aggregation_workers)
+        except ValueError:
+            print("❌ ERRO: Chave da API não encontrada!")
+            print("💡 Dica: Crie um arquivo .env com SE_RANKING_API_TOKEN=sua_chave_aqui")
+            sys.exit(1)
     
-    def format_number(self, number: int) -> str:
+    @staticmethod
+    def format_number(number: int) -> str:
         """Formata números com separadores de milhares"""
         return f"{number:,}".replace(',', '.')
     
-    def display_summary(self, domain: str, backlinks_data: Dict):
+    def display_summary(self, domain: str, summary: Dict):
         """Exibe resumo dos backlinks de forma formatada"""
         print("\n" + "="*50)
         print("📊 RESUMO DOS BACKLINKS")
         print("="*50)
         
-        # Extrai dados dos backlinks
-        backlinks = backlinks_data.get('backlinks', [])
-        total_backlinks = len(backlinks)
-        
-        # Conta domínios únicos
-        unique_domains = set()
-        for backlink in backlinks:
-            url_from = backlink.get('url_from', '')
-            if url_from:
-                try:
-                    from urllib.parse import urlparse
-                    domain_name = urlparse(url_from).netloc
-                    if domain_name:
-                        unique_domains.add(domain_name)
-                except:
-                    pass
-        
-        total_referring_domains = len(unique_domains)
-        
         print(f"🌐 Domínio Analisado: {domain}")
-        print(f"🔗 Total de Backlinks: {self.format_number(total_backlinks)}")
-        print(f"🌍 Total de Domínios de Referência: {self.format_number(total_referring_domains)}")
+        print(f"🔗 Total de Backlinks: {self.format_number(summary['total_backlinks'])}")
+        print(f"🌍 Total de Domínios de Referência: {self.format_number(summary['total_referring_domains'])}")
+        print(f"✅ Dofollow: {self.format_number(summary['dofollow_count'])} | "
+              f"🔒 Nofollow: {self.format_number(summary['nofollow_count'])} | "
+              f"🖼️  Imagem: {self.format_number(summary['image_links'])}")
+        
+        percentiles = summary['domain_rank_percentiles']
+        print(f"📈 Rank do Domínio: médio {summary['avg_domain_rank']} | "
+              f"mín {summary['min_domain_rank']} | máx {summary['max_domain_rank']} | "
+              f"p50 {percentiles['p50']} | p90 {percentiles['p90']}")
+        
+        if summary['top_anchors']:
+            anchors = ', '.join(f"\"{item['anchor'][:30]}\" ({item['count']})"
+                                for item in summary['top_anchors'][:5])
+            print(f"⚓ Âncoras mais usadas: {anchors}")
+        if summary['tld_distribution']:
+            tlds = ', '.join(f".{tld} ({count})" for tld, count in
+                             list(summary['tld_distribution'].items())[:5])
+            print(f"🌐 TLDs de referência: {tlds}")
+        
+        if summary.get('has_more'):
+            print("⚠️  Limite de paginação atingido: o perfil possui mais backlinks")
+    
+    def display_changes(self, changes: Dict):
+        """Exibe os backlinks novos/perdidos e a variação das métricas"""
+        print("\n" + "="*50)
+        print("🔄 MUDANÇAS DESDE A ÚLTIMA ANÁLISE")
+        print("="*50)
+        
+        if changes['mode'] == 'baseline':
+            print(f"📸 Primeira análise: snapshot criado com "
+                  f"{self.format_number(changes['new_count'])} backlinks")
+            return
+        
+        mode = 'incremental' if changes['mode'] == 'incremental' else 'varredura completa'
+        print(f"🕒 Último snapshot: {changes['since']} ({mode})")
+        if not changes['ordered']:
+            print("⚠️  A API não retornou os backlinks por data; o perfil foi percorrido inteiro")
+        print(f"🆕 Novos: {self.format_number(changes['new_count'])}")
+        for backlink in changes['new_backlinks'][:10]:
+            print(f"   + {backlink.get('url_from')} → {backlink.get('url_to')}")
+        if changes['lost_count'] is None:
+            print("❔ Perdidos: verificados apenas na varredura completa (--full-scan)")
+        else:
+            print(f"💔 Perdidos: {self.format_number(changes['lost_count'])}")
+            for backlink in changes['lost_backlinks'][:10]:
+                print(f"   - {backlink.get('url_from')} → {backlink.get('url_to')}")
+        
+        deltas = [f"{key} {value:+}" for key, value in changes['deltas'].items() if value]
+        if deltas:
+            print(f"📊 Variação: {', '.join(deltas)}")
     
     def display_backlinks_list(self, backlinks_data: Dict):
         """Exibe lista de backlinks de forma formatada"""
@@ -145,33 +146,415 @@ class BacklinkChecker:
             print(f"    Primeira vez visto: {first_seen}")
             print()
     
-    def check_domain(self, domain: str):
-        """Executa análise completa de um domínio"""
+    def analyze_domain(self, domain: str, verbose: bool = False, **kwargs) -> Dict:
+        """Percorre todas as páginas de um domínio e retorna o resumo da análise
+        
+        Não imprime nada, exceto o progresso por página quando `verbose=True`.
+        O resultado traz os 10 primeiros backlinks em `top_backlinks`.
+        """
+        on_page = None
+        if verbose:
+            def on_page(page: int, rows: int):
+                print(f"⏳ Página {page}: {self.format_number(rows)} backlinks recebidos")
+        
+        kwargs.setdefault('build_table', False)
+        kwargs.setdefault('sample_size', 10)
+        return super().analyze_domain(domain, on_page=on_page, **kwargs)
+    
+    def check_domain(self, domain: str, incremental: bool = False, full_scan: bool = False):
+        """Executa análise completa de um domínio
+        
+        Com `incremental=True`, compara com o snapshot da análise anterior e
+        exibe os backlinks novos e perdidos.
+        """
         print("🚀 Iniciando análise de backlinks...")
         print("="*50)
         
-        # Remove protocolo se presente
-        domain = domain.replace('http://', '').replace('https://', '').replace('www.', '')
+        domain = self.normalize_domain(domain)
+        print(f"🔍 Analisando o domínio: {domain}")
         
-        # Obtém dados dos backlinks
-        backlinks_data = self.get_backlinks_summary(domain)
-        if not backlinks_data:
-            print("❌ Falha ao obter dados dos backlinks.")
+        result = self.analyze_domain(domain, verbose=True, incremental=incremental,
+                                     full_scan=full_scan)
+        if not result['success']:
+            print(f"❌ {result['error']}")
             return
+        if result['partial']:
+            print("⚠️  Falha ao obter a página seguinte; exibindo dados parciais.")
         
         # Exibe resumo
-        self.display_summary(domain, backlinks_data)
+        self.display_summary(domain, result)
+        
+        if 'changes' in result:
+            self.display_changes(result['changes'])
         
         # Exibe lista de backlinks
-        self.display_backlinks_list(backlinks_data)
+        self.display_backlinks_list({'backlinks': result['top_backlinks']})
         
         print("="*50)
         print("✅ Análise concluída com sucesso!")
         print("="*50)
+    
+    def export_domain(self, domain: str, path: str, export_format: Optional[str] = None) -> bool:
+        """Exporta os backlinks do domínio (até o orçamento de linhas) para um arquivo
+        
+        As páginas são convertidas e gravadas à medida que chegam, sem montar a
+        lista completa. `export_format` (csv, ndjson ou parquet) vem da extensão
+        de `path` quando omitido; `path='-'` grava na saída padrão, por isso as
+        mensagens vão para a saída de erro.
+        """
+        from backlink_core.export import BacklinkExporter, format_from_path
+        
+        out = sys.stderr
+        domain = self.normalize_domain(domain)
+        try:
+            exporter = BacklinkExporter(export_format or format_from_path(path))
+        except (RuntimeError, ValueError) as e:
+            print(f"❌ ERRO: {e}", file=out)
+            return False
+        
+        print(f"📤 Exportando os backlinks de {domain} ({exporter.format})...", file=out)
+        errors = []
+        pages = self.iter_page_rows(domain, errors)
+        started = time.perf_counter()
+        if path == '-':
+            exporter.write_to(pages, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        else:
+            with open(path, 'wb') as output:
+                exporter.write_to(pages, output)
+        elapsed = time.perf_counter() - started
+        
+        if errors and not exporter.rows:
+            print(f"❌ {errors[0]}", file=out)
+            return False
+        if errors:
+            print(f"⚠️  Falha ao obter a página seguinte; exportação parcial: {errors[0]}", file=out)
+        rate = exporter.rows / elapsed if elapsed else 0.0
+        print(f"✅ {self.format_number(exporter.rows)} backlinks, {exporter.bytes / (1024 * 1024):.1f} MB "
+              f"em {elapsed:.2f}s ({self.format_number(int(rate))} linhas/s)"
+              + ('' if path == '-' else f" → {path}"), file=out)
+        return True
+
+    
+    def compare_domains(self, domain: str, competitors: List[str], min_competitors: int = 1,
+                        level: str = 'registrable', workers: int = 8, limit: int = 20) -> bool:
+        """Link gap: domínios que linkam para os concorrentes e não para `domain`
+        
+        Os perfis são buscados em paralelo (`workers` threads, um único pool de
+        conexões); exibe também a sobreposição entre os perfis.
+        """
+        from backlink_core.link_gap import link_gap
+        
+        print(f"🔍 Comparando {self.normalize_domain(domain)} com {len(competitors)} concorrente(s)...")
+        try:
+            result = link_gap(self, domain, competitors, min_competitors=min_competitors,
+                              level=level, limit=limit, workers=workers)
+        except ValueError as e:
+            print(f"❌ ERRO: {e}")
+            return False
+        if not result['success']:
+            print(f"❌ {result['error']}")
+            return False
+        
+        self.display_comparison(result)
+        return True
+    
+    def display_comparison(self, result: Dict):
+        """Exibe o link gap e a matriz de sobreposição de uma comparação"""
+        gap = result['gap']
+        names = result['domains']
+        level = 'domínios registráveis' if result['level'] == 'registrable' else 'hosts'
+        
+        print("\n" + "="*50)
+        print("🧭 LINK GAP")
+        print("="*50)
+        for failed, error in result['errors'].items():
+            print(f"⚠️  {failed} ignorado: {error}")
+        for incomplete in result['incomplete']:
+            print(f"⚠️  {incomplete}: perfil parcial (limite de paginação ou falha)")
+        print(f"🌍 Domínios de referência ({level}):")
+        for name in names:
+            print(f"   {name}: {self.format_number(result['referring_domains'][name])} "
+                  f"(únicos: {self.format_number(result['unique'][name]['count'])})")
+        print(f"🤝 Comuns a todos: {self.format_number(result['common_to_all']['count'])}")
+        print(f"🎯 Linkam para ≥ {gap['min_competitors']} concorrente(s) e não para {gap['target']}: "
+              f"{self.format_number(gap['count'])}")
+        for i, item in enumerate(gap['domains'], 1):
+            print(f"{i:3d}. {item['domain']} ({item['count']}: {', '.join(item['competitors'])})")
+        
+        print("\n📐 Sobreposição (domínios em comum | Jaccard):")
+        width = max(len(name) for name in names)
+        for i, name in enumerate(names):
+            cells = ' '.join(f"{shared:>8} {jaccard:>5.2f}" for shared, jaccard in
+                             zip(result['overlap']['shared'][i], result['overlap']['jaccard'][i]))
+            print(f"   {name:<{width}} {cells}")
+        print(f"⏱️  Busca: {result['fetch_ms'] / 1000:.2f}s | comparação: {result['compute_ms']:.1f}ms")
+        print("="*50)
+
+def read_domains(source: str) -> List[str]:
+    """Lê domínios (um por linha) de um arquivo ou da entrada padrão ('-')
+    
+    Linhas vazias e comentários iniciados por '#' são ignorados.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    return [line.strip() for line in lines
+            if line.strip() and not line.strip().startswith('#')]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método do posto mais próximo (lista já ordenada)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_batch(checker: BacklinkChecker, domains: List[str], workers: int, output,
+              incremental: bool = False, full_scan: bool = False) -> Dict:
+    """Analisa vários domínios em paralelo com um pool limitado de threads
+    
+    Todas as threads compartilham o mesmo checker (e a mesma sessão HTTP).
+    Cada resultado é escrito em `output` como uma linha JSON assim que fica
+    pronto. Retorna as métricas do lote (tempo total, vazão e latências).
+    Com `incremental=True`, cada linha traz também as mudanças (`changes`).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    # Remove duplicados mantendo a ordem de entrada
+    domains = list(dict.fromkeys(checker.normalize_domain(d) for d in domains))
+    
+    writer = JSONLWriter(output)
+    latencies = []
+    failures = 0
+    
+    def analyze(domain: str) -> Tuple[Dict, float]:
+        started = time.perf_counter()
+        try:
+            result = checker.analyze_domain(domain, incremental=incremental, full_scan=full_scan)
+        except Exception as e:
+            result = {'success': False, 'domain': domain, 'error': str(e)}
+        return result, time.perf_counter() - started
+    
+    batch_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(analyze, domain) for domain in domains]
+        for future in as_completed(futures):
+            result, elapsed = future.result()
+            result['elapsed_ms'] = round(elapsed * 1000, 1)
+            latencies.append(elapsed)
+            if not result['success']:
+                failures += 1
+            writer.write(result)
+    wall_time = time.perf_counter() - batch_started
+    return batch_report(len(domains), failures, latencies, wall_time)
+
+
+def batch_report(domains: int, failures: int, latencies: List[float], wall_time: float) -> Dict:
+    """Métricas do lote: tempo total, vazão e percentis de latência"""
+    latencies = sorted(latencies)
+    return {
+        'domains': domains,
+        'failures': failures,
+        'wall_time_s': round(wall_time, 3),
+        'throughput_domains_per_s': round(domains / wall_time, 2) if wall_time else 0.0,
+        'latency_p50_s': round(percentile(latencies, 50), 3),
+        'latency_p90_s': round(percentile(latencies, 90), 3),
+        'latency_p99_s': round(percentile(latencies, 99), 3),
+        'latency_max_s': round(latencies[-1], 3) if latencies else 0.0
+    }
+
+
+def run_batch_async(domains: List[str], workers: int, output,
+                    max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                    cache_mode: str = CACHE_USE, base_url: Optional[str] = None) -> Dict:
+    """Como `run_batch`, mas com o AsyncBacklinkClient em um único event loop
+    
+    Até `workers` análises avançam ao mesmo tempo sem uma thread por domínio,
+    compartilhando o mesmo pool de conexões com keep-alive.
+    """
+    import asyncio
+    from dotenv import load_dotenv
+    from backlink_core import AsyncBacklinkClient
+    
+    load_dotenv()
+    writer = JSONLWriter(output)
+    
+    async def run() -> Dict:
+        latencies = []
+        failures = 0
+        semaphore = asyncio.Semaphore(workers)
+        
+        async with AsyncBacklinkClient(base_url=base_url, max_rows=max_rows, max_pages=max_pages,
+                                       max_connections=workers) as client:
+            unique = list(dict.fromkeys(client.normalize_domain(d) for d in domains))
+            
+            async def analyze(domain: str) -> Tuple[Dict, float]:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        result = await client.analyze_domain(domain, cache_mode=cache_mode,
+                                                             build_table=False)
+                    except Exception as e:
+                        # Um domínio com erro não interrompe o lote (como em run_batch)
+                        result = {'success': False, 'domain': domain, 'error': str(e)}
+                    return result, time.perf_counter() - started
+            
+            batch_started = time.perf_counter()
+            for future in asyncio.as_completed([analyze(domain) for domain in unique]):
+                result, elapsed = await future
+                result['elapsed_ms'] = round(elapsed * 1000, 1)
+                latencies.append(elapsed)
+                if not result['success']:
+                    failures += 1
+                writer.write(result)
+            wall_time = time.perf_counter() - batch_started
+        
+        return batch_report(len(unique), failures, latencies, wall_time)
+    
+    return asyncio.run(run())
+
+
+def run_jobs_worker(checker: BacklinkChecker, workers: int):
+    """Consome a fila de análises em segundo plano até Ctrl+C
+    
+    Vários processos podem rodar este modo sobre a mesma fila
+    (BACKLINKS_JOBS_PATH); um job interrompido é retomado do último cursor.
+    """
+    from backlink_core.jobs import JobWorkerPool, get_shared_queue
+    
+    queue = get_shared_queue()
+    
+    def on_complete(result: Dict):
+        print(f"✅ {result['domain']}: {checker.format_number(result['total_backlinks'])} backlinks "
+              f"em {result['pages_fetched']} páginas")
+    
+    pool = JobWorkerPool(checker, queue, workers=workers, on_complete=on_complete).start()
+    print(f"👷 {workers} worker(s) consumindo a fila {queue.path} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n⏹️  Encerrando após os jobs em andamento...")
+        pool.stop()
+
+
+def display_batch_report(report: Dict):
+    """Exibe as métricas do lote na saída de erro (stdout fica com o JSON Lines)"""
+    out = sys.stderr
+    print("\n" + "="*50, file=out)
+    print("📦 RESUMO DO LOTE", file=out)
+    print("="*50, file=out)
+    print(f"🌐 Domínios analisados: {report['domains']} ({report['failures']} com falha)", file=out)
+    print(f"⏱️  Tempo total: {report['wall_time_s']:.2f}s", file=out)
+    print(f"⚡ Vazão: {report['throughput_domains_per_s']:.2f} domínios/s", file=out)
+    print(f"📈 Latência por domínio: p50={report['latency_p50_s']:.2f}s "
+          f"p90={report['latency_p90_s']:.2f}s p99={report['latency_p99_s']:.2f}s "
+          f"máx={report['latency_max_s']:.2f}s", file=out)
+    print("="*50, file=out)
+
+
+def display_stats(checker: Optional[BacklinkClient] = None):
+    """Exibe (na saída de erro) o tempo por etapa e os contadores da execução"""
+    from backlink_core.metrics import metrics, stage_names
+    
+    out = sys.stderr
+    summary = metrics.summary()
+    print("\n" + "="*50, file=out)
+    print("📟 ESTATÍSTICAS DA EXECUÇÃO", file=out)
+    print("="*50, file=out)
+    print(f"{'etapa':12} {'chamadas':>9} {'total':>10} {'média':>9} {'p50':>8} {'p95':>8}", file=out)
+    for name in stage_names(summary):
+        stage = summary['stages'][name]
+        quantiles = ' '.join(f"{value:>6g}ms" if value is not None else f"{'>30s':>8}"
+                             for value in (stage['p50_ms'], stage['p95_ms']))
+        print(f"{name:12} {stage['count']:>9} {stage['total_ms']:>8.0f}ms {stage['mean_ms']:>7.1f}ms {quantiles}",
+              file=out)
+    for name, value in summary['counters'].items():
+        print(f"🔢 {name}: {value:g}", file=out)
+    if checker is not None:
+        limiter = checker.limiter.stats()
+        print(f"🚦 Retentativas: {limiter['retries']} | HTTP 429: {limiter['throttled']}", file=out)
+        if checker.cache:
+            cache = checker.cache.stats()
+            print(f"💾 Cache de respostas: {cache['hits']} acertos, {cache['misses']} faltas", file=out)
+    print("="*50, file=out)
+
+
+def display_history(domain: str, bucket: str = 'day', days: Optional[float] = None) -> bool:
+    """Exibe a tendência do domínio por período, a partir do histórico das análises"""
+    from backlink_core.history import get_shared_history
+    from backlink_core.normalize import normalize_domain
+    
+    store = get_shared_history()
+    if store is None:
+        print("❌ Histórico desativado (BACKLINKS_HISTORY=off)")
+        return False
+    domain = normalize_domain(domain)
+    result = store.trend(domain, bucket, since=time.time() - days * 86400 if days else None)
+    if not result['points']:
+        print(f"❌ Sem histórico para {domain}: analise o domínio para começar a registrá-lo")
+        return False
+    
+    print("\n" + "="*50)
+    print(f"📈 HISTÓRICO: {domain}")
+    print("="*50)
+    print(f"🗂️  Análises registradas: {result['points']} ({result['points_in_range']} no período)")
+    print(f"{'período':11} {'análises':>8} {'backlinks':>11} {'domínios':>9} {'Δ domínios':>10} "
+          f"{'rank médio':>10} {'deriva':>7} {'novos top':>9}")
+    for entry in result['buckets']:
+        change = entry['changes']['referring_domains'] if entry['changes'] else None
+        drift = entry['rank_drift']
+        print(f"{entry['bucket']:11} {entry['snapshots']:>8} {BacklinkChecker.format_number(entry['metrics']['total_backlinks']):>11} "
+              f"{BacklinkChecker.format_number(entry['metrics']['referring_domains']):>9} "
+              f"{'' if change is None else f'{change:+,}'.replace(',', '.'):>10} "
+              f"{entry['metrics']['avg_domain_rank']:>10.2f} {'' if drift is None else f'{drift:.1f}%':>7} "
+              f"{entry['new_top_links']:>9}{'  *' if entry['partial'] else ''}")
+    if any(entry['partial'] for entry in result['buckets']):
+        print("* última análise do período incompleta (limite de linhas ou páginas)")
+    
+    latest = result['latest']
+    anchors = ', '.join(f"\"{entry['anchor']}\" ({entry['count']})" for entry in latest['top_anchors'][:5])
+    print(f"🕒 Última análise: {latest['at']}")
+    if anchors:
+        print(f"🔤 Âncoras: {anchors}")
+    print("="*50)
+    return True
+
+
+def display_profile(session, paths: List[str]):
+    """Exibe (na saída de erro) o resumo do perfil e os arquivos gravados"""
+    from backlink_core.metrics import stage_names
+    
+    out = sys.stderr
+    report = session.report(limit=10)
+    print("\n" + "="*50, file=out)
+    print("🔬 PERFIL DA EXECUÇÃO", file=out)
+    print("="*50, file=out)
+    details = f", {report['samples']} amostras" if 'samples' in report else ''
+    print(f"⏱️  Duração: {report['duration_ms'] / 1000:.2f}s ({report['mode']}{details})", file=out)
+    for name in stage_names(report):
+        stage = report['stages'][name]
+        print(f"🧩 {name}: {stage['count']} chamadas, {stage['total_ms']:.0f}ms", file=out)
+    for entry in report['top']:
+        # Amostragem: tempo no topo da pilha; cProfile: tempo acumulado e chamadas
+        if 'calls' in entry:
+            print(f"🔥 {entry['total_ms']:>8.1f}ms {entry['calls']:>8}x  {entry['function']}", file=out)
+        else:
+            print(f"🔥 {entry['self_ms']:>8.1f}ms  {entry['function']}", file=out)
+    for path in paths:
+        print(f"💾 {path}", file=out)
+    print("="*50, file=out)
 
 
 def main():
     """Função principal do programa"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Backlink Checker - Analise backlinks usando SE Ranking API",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -180,6 +563,15 @@ Exemplos de uso:
   python backlink_checker.py google.com
   python backlink_checker.py moz.com
   python backlink_checker.py seranking.com
+  python backlink_checker.py --batch dominios.txt --workers 16 > resultados.jsonl
+  python backlink_checker.py --batch dominios.txt --workers 64 --async > resultados.jsonl
+  cat dominios.txt | python backlink_checker.py --batch - --jsonl resultados.jsonl
+  python backlink_checker.py google.com --incremental
+  python backlink_checker.py google.com --max-rows 0 --max-pages 0 --processes 8
+  python backlink_checker.py google.com --output backlinks.csv --max-rows 0
+  python backlink_checker.py meusite.com --compare concorrente1.com concorrente2.com --min-competitors 2
+  python backlink_checker.py google.com --max-rows 0 --profile perfis/google
+  python backlink_checker.py google.com --history --bucket week --days 90
 
 Configuração:
   1. Crie um arquivo .env na pasta do projeto
@@ -190,9 +582,170 @@ Configuração:
     
     parser.add_argument(
         'domain',
+        nargs='?',
         help='Domínio para análise (ex: google.com)'
     )
     
+    parser.add_argument(
+        '--batch',
+        metavar='ARQUIVO',
+        help="Modo lote: analisa os domínios listados no arquivo (um por linha; '-' lê da entrada padrão)"
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Número de análises simultâneas no modo lote (padrão: 8)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Modo lote com cliente assíncrono (asyncio + httpx) em vez de threads'
+    )
+    
+    parser.add_argument(
+        '--jsonl',
+        metavar='ARQUIVO',
+        default='-',
+        help="Arquivo de saída JSON Lines do modo lote (padrão: '-' para stdout)"
+    )
+    
+    parser.add_argument(
+        '--max-rows',
+        type=int,
+        default=None,
+        help='Máximo de backlinks a buscar, seguindo a paginação (0 = sem limite; padrão: BACKLINKS_MAX_ROWS ou 10000)'
+    )
+    
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=None,
+        help='Máximo de páginas a buscar (0 = sem limite; padrão: BACKLINKS_MAX_PAGES ou 10)'
+    )
+    
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=None,
+        help='Decodifica e agrega as páginas em N processos, para perfis muito grandes (0 = desligado; padrão: BACKLINKS_AGGREGATION_WORKERS ou 0)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Não usa o cache em disco das respostas da API'
+    )
+    
+    parser.add_argument(
+        '--refresh-cache',
+        action='store_true',
+        help='Ignora o cache em disco e grava as respostas novas'
+    )
+    
+    parser.add_argument(
+        '--jobs-worker',
+        action='store_true',
+        help='Executa as análises em segundo plano da fila de jobs (com --workers threads)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Compara com o snapshot da análise anterior e busca só os backlinks novos'
+    )
+    
+    parser.add_argument(
+        '--full-scan',
+        action='store_true',
+        help='Com --incremental, percorre o perfil inteiro para detectar também os links perdidos'
+    )
+    
+    parser.add_argument(
+        '--output',
+        metavar='ARQUIVO',
+        help="Exporta os backlinks do domínio para o arquivo ('-' para stdout), até --max-rows"
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=('csv', 'ndjson', 'parquet'),
+        default=None,
+        help='Formato do --output (padrão: pela extensão do arquivo, ou csv; parquet requer pyarrow)'
+    )
+    
+    parser.add_argument(
+        '--compare',
+        nargs='+',
+        metavar='CONCORRENTE',
+        help='Link gap: domínios que linkam para os concorrentes e não para o domínio (perfis buscados com --workers threads)'
+    )
+    
+    parser.add_argument(
+        '--min-competitors',
+        type=int,
+        default=1,
+        help='Com --compare, mínimo de concorrentes linkados por um domínio do gap (padrão: 1; até o número de concorrentes)'
+    )
+    
+    parser.add_argument(
+        '--level',
+        choices=('registrable', 'host'),
+        default='registrable',
+        help='Com --compare, compara domínios registráveis (eTLD+1, padrão) ou hosts'
+    )
+    
+    parser.add_argument(
+        '--gap-limit',
+        type=int,
+        default=20,
+        help='Com --compare, máximo de domínios do gap exibidos (padrão: 20)'
+    )
+    
+    parser.add_argument(
+        '--history',
+        action='store_true',
+        help='Exibe a tendência do domínio (domínios de referência, ranks, novos backlinks) a partir do histórico das análises, sem chamar a API'
+    )
+    
+    parser.add_argument(
+        '--bucket',
+        choices=('day', 'week', 'month'),
+        default='day',
+        help='Com --history, período de agregação (padrão: day)'
+    )
+    
+    parser.add_argument(
+        '--days',
+        type=float,
+        default=None,
+        help='Com --history, só os últimos N dias (padrão: todo o histórico)'
+    )
+    
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Ao final, exibe na saída de erro o tempo por etapa (API, decodificação, agregação) e os contadores (exceto com --jobs-worker)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='',
+        metavar='PREFIXO',
+        help='Perfila a execução e grava PREFIXO.collapsed (pilhas para flamegraph; .prof com --profile-mode cprofile) e PREFIXO.json (padrão: profile-<domínio>-<data>)'
+    )
+    
+    parser.add_argument(
+        '--profile-mode',
+        choices=('sampling', 'cprofile'),
+        default='sampling',
+        help='Com --profile, amostragem das pilhas de todas as threads (padrão) ou cProfile da thread principal'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -201,10 +754,143 @@ Configuração:
     
     args = parser.parse_args()
     
+    if args.profile is None:
+        run(args, parser)
+        return
+    
+    import re
+    from backlink_core.normalize import normalize_domain
+    from backlink_core.profiling import ProfileSession
+    
+    # Só caracteres seguros para um nome de arquivo (sem '/', '..' como caminho ou '%')
+    label = re.sub(r'[^A-Za-z0-9._-]', '_', normalize_domain(args.domain or '')) or 'lote'
+    prefix = args.profile or time.strftime(f"profile-{label}-%Y%m%d-%H%M%S")
+    session = ProfileSession(mode=args.profile_mode).start()
+    try:
+        run(args, parser)
+    finally:
+        session.stop()
+        display_profile(session, session.write(prefix))
+
+
+def run(args, parser):
+    """Executa o modo escolhido na linha de comando"""
+    cache_mode = CACHE_USE
+    if args.no_cache:
+        cache_mode = CACHE_BYPASS
+    elif args.refresh_cache:
+        cache_mode = CACHE_REFRESH
+    
+    if args.processes is not None and args.processes < 0:
+        parser.error('--processes não pode ser negativo')
+    if args.full_scan and not args.incremental:
+        parser.error('--full-scan requer --incremental')
+    if args.format and not args.output:
+        parser.error('--format requer --output')
+    if args.output and (args.batch or args.jobs_worker or args.incremental):
+        parser.error('--output exporta um único domínio (sem --batch, --jobs-worker ou --incremental)')
+    if args.compare and (args.batch or args.jobs_worker or args.incremental or args.output):
+        parser.error('--compare compara um único domínio (sem --batch, --jobs-worker, --incremental ou --output)')
+    if args.compare and (args.workers < 1 or args.min_competitors < 1):
+        parser.error('--workers e --min-competitors devem ser maiores que zero')
+    if args.compare and args.domain:
+        from backlink_core.normalize import normalize_domain
+        
+        rivals = {normalize_domain(domain) for domain in args.compare} - {normalize_domain(args.domain)}
+        if args.min_competitors > len(rivals):
+            parser.error(f'--min-competitors ({args.min_competitors}) maior que o número de '
+                         f'concorrentes ({len(rivals)})')
+    
+    if args.history:
+        if args.batch or args.jobs_worker or args.incremental or args.output or args.compare:
+            parser.error('--history exibe um único domínio (sem --batch, --jobs-worker, --incremental, --output ou --compare)')
+        if not args.domain:
+            parser.error('--history requer um domínio')
+        if not display_history(args.domain, args.bucket, args.days):
+            sys.exit(1)
+        return
+    
+    if args.jobs_worker:
+        if args.workers < 1:
+            parser.error('--workers deve ser maior que zero')
+        checker = BacklinkChecker(pool_size=args.workers)
+        run_jobs_worker(checker, args.workers)
+        return
+    
+    if args.batch:
+        if args.workers < 1:
+            parser.error('--workers deve ser maior que zero')
+        if args.use_async and args.incremental:
+            parser.error('--incremental não está disponível com --async')
+        
+        domains = read_domains(args.batch)
+        if args.use_async:
+            try:
+                if args.jsonl == '-':
+                    report = run_batch_async(domains, args.workers, sys.stdout,
+                                             args.max_rows, args.max_pages, cache_mode)
+                else:
+                    with open(args.jsonl, 'w', encoding='utf-8') as output:
+                        report = run_batch_async(domains, args.workers, output,
+                                                 args.max_rows, args.max_pages, cache_mode)
+            except (RuntimeError, ValueError) as e:
+                print(f"❌ ERRO: {e}")
+                sys.exit(1)
+            display_batch_report(report)
+            if args.stats:
+                display_stats()
+            return
+        
+        # Um único checker (e um único pool de conexões) para todo o lote
+        checker = BacklinkChecker(max_rows=args.max_rows, max_pages=args.max_pages,
+                                  pool_size=args.workers, cache_mode=cache_mode,
+                                  aggregation_workers=args.processes)
+        if args.jsonl == '-':
+            report = run_batch(checker, domains, args.workers, sys.stdout,
+                               args.incremental, args.full_scan)
+        else:
+            with open(args.jsonl, 'w', encoding='utf-8') as output:
+                report = run_batch(checker, domains, args.workers, output,
+                                   args.incremental, args.full_scan)
+        display_batch_report(report)
+        if args.stats:
+            display_stats(checker)
+        return
+    
+    if not args.domain:
+        parser.error('informe um domínio ou use --batch')
+    
+    if args.compare:
+        # Um único pool de conexões para os perfis buscados em paralelo
+        checker = BacklinkChecker(max_rows=args.max_rows, max_pages=args.max_pages,
+                                  pool_size=args.workers, cache_mode=cache_mode)
+        success = checker.compare_domains(args.domain, args.compare, args.min_competitors,
+                                          args.level, args.workers, args.gap_limit)
+        if args.stats:
+            display_stats(checker)
+        if not success:
+            sys.exit(1)
+        return
+    
     # Cria e executa o checker
-    checker = BacklinkChecker()
-    checker.check_domain(args.domain)
+    checker = BacklinkChecker(max_rows=args.max_rows, max_pages=args.max_pages,
+                              cache_mode=cache_mode, aggregation_workers=args.processes)
+    if args.output:
+        success = checker.export_domain(args.domain, args.output, args.format)
+        if args.stats:
+            display_stats(checker)
+        if not success:
+            sys.exit(1)
+        return
+    checker.check_domain(args.domain, incremental=args.incremental, full_scan=args.full_scan)
+    if args.stats:
+        display_stats(checker)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Pools de processos da agregação paralela, se algum foi criado
+        if 'backlink_core.parallel' in sys.modules:
+            sys.modules['backlink_core.parallel'].shutdown_shared_aggregators()
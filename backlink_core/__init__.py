@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Núcleo compartilhado do Backlink Checker (CLI e aplicação web)
+
+- client: BacklinkClient (requisições, paginação e análise) e BacklinkAPIError
+- async_client: AsyncBacklinkClient (asyncio + httpx, opcional)
+- normalize: normalize_domain
+- aggregation / backlink_table / backlink_query: estatísticas e consultas
+- rate_limiter / transport: vazão, retentativas e pool de conexões HTTP
+- response_cache / result_cache: cache em disco das respostas e em memória
+  dos resultados
+- snapshots: snapshots por domínio para a análise incremental
+- history: histórico das análises por domínio (tendências, via mmap)
+- jobs: fila (SQLite) e workers das análises em segundo plano
+- export: gravação dos resultados (JSON Lines) e exportação dos backlinks
+  (CSV, NDJSON e Parquet)
+- wire: formato compacto (colunar) e compressão das respostas da aplicação web
+- link_gap: comparação de perfis entre domínios (link gap e sobreposição)
+- parallel: agregação das páginas em um pool de processos
+- metrics: contadores e histogramas de latência por etapa (/metrics, --stats)
+- profiling: perfil sob demanda (amostragem de pilhas ou cProfile)
+
+Os nomes abaixo são importados sob demanda (PEP 562): `import backlink_core`
+não carrega `requests`, `sqlite3` nem `asyncio` até que sejam usados.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'API_BASE_URL': 'client',
+    'DEFAULT_PAGE_SIZE': 'client',
+    'BacklinkAPIError': 'client',
+    'BacklinkClient': 'client',
+    'AsyncBacklinkClient': 'async_client',
+    'normalize_domain': 'normalize',
+    'BacklinkStats': 'aggregation',
+    'BacklinkTable': 'backlink_table',
+    'query_backlinks': 'backlink_query',
+    'RateLimiter': 'rate_limiter',
+    'get_shared_limiter': 'rate_limiter',
+    'SessionPool': 'transport',
+    'TransportConfig': 'transport',
+    'CACHE_BYPASS': 'response_cache',
+    'CACHE_MODES': 'response_cache',
+    'CACHE_REFRESH': 'response_cache',
+    'CACHE_USE': 'response_cache',
+    'ResponseCache': 'response_cache',
+    'get_shared_cache': 'response_cache',
+    'LRUResultCache': 'result_cache',
+    'SingleFlight': 'result_cache',
+    'SnapshotStore': 'snapshots',
+    'get_shared_snapshots': 'snapshots',
+    'HistoryStore': 'history',
+    'get_shared_history': 'history',
+    'JobQueue': 'jobs',
+    'JobWorkerPool': 'jobs',
+    'JSONLWriter': 'export',
+    'BacklinkExporter': 'export',
+    'compare_profiles': 'link_gap',
+    'link_gap': 'link_gap',
+    'Metrics': 'metrics',
+    'ProfileSession': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Agregação das estatísticas de backlinks de um domínio
+
+`BacklinkStats` calcula todas as métricas do resumo em uma única passada por
+lote de backlinks (uma página da API), e duas instâncias podem ser combinadas
+com `merge`, de modo que resultados parciais da paginação se somam sem
+reprocessar linhas. Usada tanto pela CLI quanto pela aplicação web.
+
+Os ranks de domínio (0-100) são acumulados em um histograma exato, então
+média, mínimo, máximo e percentis saem do histograma sem guardar a lista de
+ranks. Com NumPy instalado, o histograma de cada lote é calculado com
+`numpy.bincount`.
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from .hostnames import extract_host, public_suffix, registrable_domain
+
+# NumPy é opcional e só é importado no primeiro lote grande (ver _get_numpy)
+_numpy = False
+
+
+def _get_numpy():
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+MAX_RANK = 100
+PERCENTILES = (25, 50, 75, 90, 99)
+
+
+class BacklinkStats:
+    """Acumulador mesclável das métricas de um perfil de backlinks"""
+
+    def __init__(self):
+        self.total_backlinks = 0
+        self.nofollow_count = 0
+        self.image_links = 0
+        self.referring_domains = set()
+        self.rank_histogram = [0] * (MAX_RANK + 1)
+        self.anchors = Counter()
+        self.first_seen_months = Counter()
+
+    @property
+    def dofollow_count(self) -> int:
+        return self.total_backlinks - self.nofollow_count
+
+    def add_batch(self, backlinks: Iterable[Dict]) -> 'BacklinkStats':
+        """Acumula um lote de backlinks no formato da API (uma passada)"""
+        referring_domains = self.referring_domains
+        anchors = self.anchors
+        months = self.first_seen_months
+        ranks = array('i')
+        count = nofollow = image = 0
+
+        for backlink in backlinks:
+            count += 1
+            url_from = backlink.get('url_from')
+            if url_from:
+                host = extract_host(url_from)
+                if host:
+                    referring_domains.add(host)
+
+            if backlink.get('nofollow'):
+                nofollow += 1
+            if backlink.get('image'):
+                image += 1
+
+            rank = int(backlink.get('domain_inlink_rank') or 0)
+            ranks.append(min(max(rank, 0), MAX_RANK))
+
+            anchor = backlink.get('anchor')
+            if anchor:
+                anchors[anchor.strip().lower()] += 1
+
+            first_seen = backlink.get('first_seen')
+            if first_seen:
+                months[first_seen[:7]] += 1
+
+        self.total_backlinks += count
+        self.nofollow_count += nofollow
+        self.image_links += image
+        self._add_ranks(ranks)
+        return self
+
+    def _add_ranks(self, ranks: array):
+        histogram = self.rank_histogram
+        numpy = _get_numpy() if len(ranks) > 256 else None
+        if numpy is not None:
+            counts = numpy.bincount(numpy.frombuffer(ranks, dtype=numpy.int32),
+                                    minlength=MAX_RANK + 1)
+            for rank, value in enumerate(counts.tolist()):
+                histogram[rank] += value
+        else:
+            for rank in ranks:
+                histogram[rank] += 1
+
+    def merge(self, other: 'BacklinkStats') -> 'BacklinkStats':
+        """Soma as métricas de outro acumulador a este"""
+        self.total_backlinks += other.total_backlinks
+        self.nofollow_count += other.nofollow_count
+        self.image_links += other.image_links
+        self.referring_domains |= other.referring_domains
+        for rank, value in enumerate(other.rank_histogram):
+            self.rank_histogram[rank] += value
+        self.anchors.update(other.anchors)
+        self.first_seen_months.update(other.first_seen_months)
+        return self
+
+    def to_state(self) -> Dict:
+        """Estado serializável em JSON (ex.: para guardar em um snapshot)"""
+        return {
+            'total_backlinks': self.total_backlinks,
+            'nofollow_count': self.nofollow_count,
+            'image_links': self.image_links,
+            'referring_domains': sorted(self.referring_domains),
+            'rank_histogram': list(self.rank_histogram),
+            'anchors': dict(self.anchors),
+            'first_seen_months': dict(self.first_seen_months)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'BacklinkStats':
+        """Recria o acumulador a partir de `to_state`"""
+        stats = cls()
+        stats.total_backlinks = state['total_backlinks']
+        stats.nofollow_count = state['nofollow_count']
+        stats.image_links = state['image_links']
+        stats.referring_domains = set(state['referring_domains'])
+        stats.rank_histogram = list(state['rank_histogram'])
+        stats.anchors = Counter(state['anchors'])
+        stats.first_seen_months = Counter(state['first_seen_months'])
+        return stats
+
+    # Métricas derivadas
+
+    def _ranked(self) -> List[int]:
+        """Histograma apenas dos backlinks com rank > 0 (como no resumo original)"""
+        return self.rank_histogram[1:]
+
+    def rank_percentile(self, pct: float) -> int:
+        """Percentil (posto mais próximo) dos ranks de domínio maiores que zero"""
+        ranked = self._ranked()
+        total = sum(ranked)
+        if not total:
+            return 0
+        target = max(1, -(-pct * total // 100))
+        seen = 0
+        for offset, value in enumerate(ranked):
+            seen += value
+            if seen >= target:
+                return offset + 1
+        return MAX_RANK
+
+    def tld_distribution(self, top_n: Optional[int] = None) -> Dict[str, int]:
+        """Domínios de referência por sufixo público (ex.: 'com', 'com.br')"""
+        tlds = Counter()
+        for host in self.referring_domains:
+            tlds[public_suffix(host) or host] += 1
+        return dict(tlds.most_common(top_n))
+
+    def registrable_domains(self) -> set:
+        """Domínios de referência agrupados por domínio registrável (eTLD+1)"""
+        return {registrable_domain(host) for host in self.referring_domains}
+
+    def summary(self, top_n: int = 10) -> Dict:
+        """Métricas do resumo (mesmas chaves de `analyze_domain`) e extras"""
+        ranked = self._ranked()
+        ranked_count = sum(ranked)
+        rank_sum = sum(rank * value for rank, value in enumerate(ranked, 1))
+        ranks_present = [rank for rank, value in enumerate(ranked, 1) if value]
+
+        buckets = {'0': self.rank_histogram[0]}
+        for start in range(1, MAX_RANK + 1, 10):
+            end = min(start + 9, MAX_RANK)
+            buckets[f"{start}-{end}"] = sum(self.rank_histogram[start:end + 1])
+
+        return {
+            'total_backlinks': self.total_backlinks,
+            'total_referring_domains': len(self.referring_domains),
+            'total_registrable_domains': len(self.registrable_domains()),
+            'dofollow_count': self.dofollow_count,
+            'nofollow_count': self.nofollow_count,
+            'image_links': self.image_links,
+            'avg_domain_rank': round(rank_sum / ranked_count, 2) if ranked_count else 0,
+            'max_domain_rank': ranks_present[-1] if ranks_present else 0,
+            'min_domain_rank': ranks_present[0] if ranks_present else 0,
+            'domain_rank_percentiles': {f"p{pct}": self.rank_percentile(pct) for pct in PERCENTILES},
+            'domain_rank_histogram': buckets,
+            'top_anchors': [{'anchor': anchor, 'count': count}
+                            for anchor, count in self.anchors.most_common(top_n)],
+            'tld_distribution': self.tld_distribution(top_n),
+            'first_seen_timeline': dict(sorted(self.first_seen_months.items()))
+        }
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Cliente assíncrono da SE Ranking API (asyncio + httpx)
+
+`AsyncBacklinkClient` oferece a mesma interface do BacklinkClient síncrono
+(`get_backlinks`, `iter_backlinks`, `analyze_domain`), mas as
+requisições não bloqueiam a thread: várias análises avançam no mesmo event
+loop, sobre um único pool de conexões HTTP com keep-alive.
+
+O cliente (e o pool de conexões) pertence ao event loop em que foi criado.
+Requer o pacote opcional `httpx` (pip install httpx).
+"""
+
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Dict, Optional
+
+from .aggregation import BacklinkStats
+from .backlink_table import BacklinkTable
+from .client import API_BASE_URL, DEFAULT_PAGE_SIZE, BacklinkAPIError, analysis_result, feed_page
+from .metrics import metrics
+from .normalize import normalize_domain
+from .rate_limiter import AsyncRateLimiter, get_shared_limiter
+from .response_cache import CACHE_BYPASS, CACHE_REFRESH, CACHE_USE, CACHEABLE_ENDPOINTS, get_shared_cache
+from .transport import TransportConfig
+
+try:
+    import httpx
+except ImportError:  # httpx é opcional
+    httpx = None
+
+
+class AsyncBacklinkClient:
+    """Cliente assíncrono para análise de backlinks usando SE Ranking API"""
+
+    def __init__(self, api_token: Optional[str] = None, base_url: Optional[str] = None,
+                 max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                 max_connections: Optional[int] = None, transport: Optional[TransportConfig] = None):
+        if httpx is None:
+            raise RuntimeError("O cliente assíncrono requer o pacote httpx (pip install httpx)")
+
+        self.api_token = api_token or os.getenv('SE_RANKING_API_TOKEN')
+        if not self.api_token:
+            raise ValueError("Chave da API não encontrada!")
+
+        self.base_url = base_url or os.getenv('SE_RANKING_API_URL', API_BASE_URL)
+        # Mesmos ajustes de transporte do cliente síncrono (timeouts, pool, compressão)
+        self.transport = transport or TransportConfig.from_env(pool_maxsize=max_connections)
+        pool_size = self.transport.pool_maxsize
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.transport.read_timeout, connect=self.transport.connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size if self.transport.keep_alive else 0),
+            headers=self.transport.headers()
+        )
+        # A cota por segundo é a mesma do cliente síncrono; a concorrência é do event loop
+        self.limiter = AsyncRateLimiter.from_env(bucket=get_shared_limiter().bucket)
+        # Cache em disco das respostas (None se desativado)
+        self.cache = get_shared_cache()
+        # Orçamento da paginação (0 = sem limite)
+        if max_rows is None:
+            max_rows = int(os.getenv('BACKLINKS_MAX_ROWS', '10000'))
+        if max_pages is None:
+            max_pages = int(os.getenv('BACKLINKS_MAX_PAGES', '10'))
+        self.max_rows = max_rows
+        self.max_pages = max_pages
+
+    async def __aenter__(self) -> 'AsyncBacklinkClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Fecha o pool de conexões"""
+        await self.client.aclose()
+
+    async def _make_request(self, endpoint: str, params: dict, cache_mode: str = CACHE_USE) -> dict:
+        """Faz uma requisição para a API da SE Ranking (ver BacklinkClient._make_request)"""
+        url = f"{self.base_url}{endpoint}"
+        cache = self.cache if endpoint in CACHEABLE_ENDPOINTS and cache_mode != CACHE_BYPASS else None
+        if cache and cache_mode != CACHE_REFRESH:
+            # O cache em disco é síncrono: lido e gravado fora do event loop
+            body = await asyncio.to_thread(cache.get, endpoint, params)
+            if body is not None:
+                return json.loads(body)
+
+        cache_params = dict(params)
+        params['apiKey'] = self.api_token
+
+        try:
+            with metrics.measure('upstream'):
+                response = await self.limiter.request(
+                    lambda: self.client.get(url, params=params),
+                    retry_exceptions=(httpx.TransportError,)
+                )
+            metrics.inc('upstream_requests_total', status=response.status_code)
+            if response.status_code == 429:
+                metrics.inc('errors_total', type='rate_limited')
+                raise BacklinkAPIError("Limite de requisições da SE Ranking excedido (HTTP 429). Tente novamente em instantes.")
+            response.raise_for_status()
+            metrics.inc('upstream_bytes_total', len(response.content))
+            with metrics.measure('decode'):
+                data = response.json()
+            if cache:
+                await asyncio.to_thread(cache.put, endpoint, cache_params, response.content)
+            return data
+        except httpx.HTTPStatusError as e:
+            metrics.inc('errors_total', type='http')
+            raise BacklinkAPIError(f"Erro na requisição: {e}")
+        except httpx.HTTPError as e:
+            metrics.inc('errors_total', type='timeout' if isinstance(e, httpx.TimeoutException) else 'connection')
+            raise BacklinkAPIError(f"Erro na requisição: {e}")
+        except json.JSONDecodeError as e:
+            metrics.inc('errors_total', type='decode')
+            raise BacklinkAPIError(f"Erro ao decodificar resposta JSON: {e}")
+
+    def normalize_domain(self, domain: str) -> str:
+        """Remove protocolo, 'www.' e caminho do domínio informado"""
+        return normalize_domain(domain)
+
+    async def get_backlinks(self, domain: str, limit: int = 1000, cursor: Optional[str] = None,
+                            cache_mode: str = CACHE_USE) -> dict:
+        """Obtém uma página de backlinks de um domínio"""
+        params = {
+            'target': self.normalize_domain(domain),
+            'mode': 'domain',
+            'limit': limit,
+            'output': 'json'
+        }
+        if cursor:
+            params['next'] = cursor
+
+        return await self._make_request('/v1/backlinks/raw', params, cache_mode=cache_mode)
+
+    async def iter_backlinks(self, domain: str, page_size: int = DEFAULT_PAGE_SIZE,
+                             max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                             cache_mode: str = CACHE_USE) -> AsyncIterator[Dict]:
+        """Percorre o perfil de backlinks seguindo o cursor `next` da API
+        (mesmas páginas de BacklinkClient.iter_backlinks)"""
+        max_rows = self.max_rows if max_rows is None else max_rows
+        max_pages = self.max_pages if max_pages is None else max_pages
+
+        cursor = None
+        rows_fetched = 0
+        page = 0
+        while True:
+            limit = page_size
+            if max_rows:
+                limit = min(limit, max_rows - rows_fetched)
+
+            data = await self.get_backlinks(domain, limit=limit, cursor=cursor, cache_mode=cache_mode)
+            backlinks = data.get('backlinks', [])
+            cursor = data.get('next')
+            rows_fetched += len(backlinks)
+            page += 1
+
+            budget_exhausted = (
+                (max_rows and rows_fetched >= max_rows) or
+                (max_pages and page >= max_pages)
+            )
+            has_more = bool(cursor) and bool(backlinks)
+            yield {
+                'backlinks': backlinks,
+                'page': page,
+                'has_more': has_more
+            }
+
+            if not has_more or budget_exhausted:
+                break
+
+    async def analyze_domain(self, domain: str, cache_mode: str = CACHE_USE,
+                             build_table: bool = True) -> dict:
+        """Analisa um domínio; mesmo resultado de BacklinkClient.analyze_domain
+
+        Com `build_table=False` (ex.: modo lote da CLI), os backlinks não são
+        guardados e o resultado não traz `backlinks_table`. Erros da API e
+        dados inválidos viram um resultado com `error`, como no cliente síncrono.
+        """
+        stats = BacklinkStats()
+        table = BacklinkTable() if build_table else None
+        has_more = False
+        pages = 0
+        error = None
+
+        try:
+            domain = self.normalize_domain(domain)
+            async for page in self.iter_backlinks(domain, cache_mode=cache_mode):
+                feed_page(page['backlinks'], stats, table)
+                pages = page['page']
+                has_more = page['has_more']
+        except (BacklinkAPIError, ValueError) as e:
+            error = str(e)
+
+        from .history import record_history
+
+        result = analysis_result(domain, stats, table, has_more, pages, error)
+        await asyncio.to_thread(record_history, result)
+        return result
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Filtragem, ordenação e paginação de backlinks no servidor
+
+Recebe a lista de backlinks formatados de `analyze_domain` e devolve apenas a
+página pedida, com os totais necessários para a paginação na interface.
+"""
+
+from typing import Dict, List, Optional
+
+
+LINK_TYPES = ('all', 'dofollow', 'nofollow', 'image')
+SORT_KEYS = ('position', 'domain_rank', 'first_seen')
+MAX_PAGE_SIZE = 100
+
+
+def _matches_type(backlink: Dict, link_type: str) -> bool:
+    if link_type == 'dofollow':
+        return not backlink['is_nofollow'] and not backlink['is_image']
+    if link_type == 'nofollow':
+        return backlink['is_nofollow']
+    if link_type == 'image':
+        return backlink['is_image']
+    return True
+
+
+def _first_seen_key(backlink: Dict) -> str:
+    # Datas no formato YYYY-MM-DD ordenam corretamente como texto; 'N/A' vai para o fim
+    first_seen = backlink['first_seen']
+    return first_seen if first_seen and first_seen != 'N/A' else ''
+
+
+def query_backlinks(backlinks: List[Dict], link_type: str = 'all', anchor: Optional[str] = None,
+                    min_rank: int = 0, sort: str = 'position', page: int = 1,
+                    page_size: int = 20) -> Dict:
+    """Aplica filtros e ordenação e retorna uma página de backlinks
+
+    - `link_type`: 'all', 'dofollow', 'nofollow' ou 'image'
+    - `anchor`: trecho do texto âncora (sem diferenciar maiúsculas)
+    - `min_rank`: `domain_inlink_rank` mínimo
+    - `sort`: 'position', 'domain_rank' (maior primeiro) ou 'first_seen' (mais recente primeiro)
+    """
+    if link_type not in LINK_TYPES:
+        raise ValueError(f"Tipo de link inválido: {link_type}")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Ordenação inválida: {sort}")
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    anchor = anchor.lower() if anchor else None
+    filtered = [
+        backlink for backlink in backlinks
+        if _matches_type(backlink, link_type)
+        and (not anchor or anchor in backlink['anchor_text'].lower())
+        and (not min_rank or (backlink['domain_inlink_rank'] or 0) >= min_rank)
+    ]
+
+    if sort == 'domain_rank':
+        filtered.sort(key=lambda b: b['domain_inlink_rank'] or 0, reverse=True)
+    elif sort == 'first_seen':
+        filtered.sort(key=_first_seen_key, reverse=True)
+
+    total_pages = max(1, -(-len(filtered) // page_size))
+    page = max(1, min(page, total_pages))
+    start = (page - 1) * page_size
+
+    return {
+        'backlinks': filtered[start:start + page_size],
+        'total': len(backlinks),
+        'filtered_total': len(filtered),
+        'page': page,
+        'page_size': page_size,
+        'total_pages': total_pages
+    }
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Armazenamento colunar dos backlinks de um domínio
+
+Em vez de um dicionário por backlink, cada campo vira uma coluna compacta:
+- textos repetidos (domínios, âncoras, títulos...) são internados em tabelas
+  de strings e as linhas guardam apenas o índice
+- `nofollow` e `image` viram bitmaps (inteiros do Python)
+- ranks e datas ficam em `array` de inteiros (datas como ordinais)
+
+Depois de montada, a tabela guarda permutações pré-ordenadas e bitmaps por
+rank, de modo que filtro + ordenação + paginação rodam em laços de C
+(operações de bits, `itertools.compress`) em vez de laços Python por linha.
+Só os backlinks da página pedida são convertidos em dicionários.
+
+`to_columns` gera o formato compacto de resposta: um vetor por coluna (com
+o cabeçalho de nomes uma única vez), `null` no lugar de 'N/A', 0/1 para os
+booleanos e domínios de referência e URLs de destino codificados por
+dicionário.
+"""
+
+import bisect
+from array import array
+from datetime import date
+from itertools import compress, islice
+from typing import Dict, Iterable, List, Optional
+
+from .backlink_query import LINK_TYPES, MAX_PAGE_SIZE, SORT_KEYS
+from .hostnames import extract_host
+
+
+# Índice reservado para campos ausentes (exibidos como 'N/A')
+MISSING = 0
+
+# Colunas do formato compacto (`to_columns`), na ordem do cabeçalho
+WIRE_COLUMNS = (
+    'position', 'source_url', 'referring_domain', 'target_url', 'title', 'anchor_text',
+    'alt_text', 'is_nofollow', 'is_image', 'image_source', 'inlink_rank',
+    'domain_inlink_rank', 'first_seen', 'last_visited'
+)
+
+# Expande um byte de bitmap em 8 bytes 0/1, um por linha
+_BIT_EXPANSION = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+
+class StringTable:
+    """Tabela de strings internadas: cada valor distinto é guardado uma única vez"""
+
+    def __init__(self):
+        self.values = [None]  # posição 0 = campo ausente
+        self._ids = {}
+
+    def intern(self, value) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _bitmap_from_indices(indices: Iterable[int], size: int) -> int:
+    """Monta um bitmap (int) com os bits `indices` ligados"""
+    buffer = bytearray((size + 7) // 8)
+    for index in indices:
+        buffer[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _parse_date(value, cache: Dict) -> int:
+    """Converte 'YYYY-MM-DD' em ordinal (0 se ausente/inválida), com memoização"""
+    ordinal = cache.get(value)
+    if ordinal is None:
+        try:
+            ordinal = date.fromisoformat(value[:10]).toordinal()
+        except (TypeError, ValueError):
+            ordinal = 0
+        cache[value] = ordinal
+    return ordinal
+
+
+def _dictionary_encode(ids: Iterable[int], values: List) -> tuple:
+    """Recodifica ids internados em índices de um dicionário só com os valores usados"""
+    codes = {}
+    dictionary = []
+    encoded = []
+    for value_id in ids:
+        if value_id == MISSING:
+            encoded.append(None)
+            continue
+        code = codes.get(value_id)
+        if code is None:
+            code = codes[value_id] = len(dictionary)
+            dictionary.append(values[value_id])
+        encoded.append(code)
+    return encoded, dictionary
+
+
+def format_backlink(backlink: Dict, position: int) -> Dict:
+    """Backlink da API no formato de `BacklinkTable.row`, sem montar a tabela
+
+    Usado para enviar linhas à interface enquanto a análise ainda está em
+    andamento.
+    """
+    def text(column: str, default='N/A'):
+        return backlink[column] if column in backlink else default
+
+    url_from = backlink.get('url_from')
+    return {
+        'position': position,
+        'source_url': 'N/A' if url_from is None else url_from,
+        'target_url': text('url_to'),
+        'title': text('title'),
+        'anchor_text': text('anchor'),
+        'alt_text': text('alt'),
+        'is_nofollow': bool(backlink.get('nofollow', False)),
+        'is_image': bool(backlink.get('image', False)),
+        'image_source': text('image_source', default=''),
+        'inlink_rank': backlink.get('inlink_rank') or 0,
+        'domain_inlink_rank': backlink.get('domain_inlink_rank') or 0,
+        'first_seen': backlink.get('first_seen') or 'N/A',
+        'last_visited': backlink.get('last_visited') or 'N/A'
+    }
+
+
+class BacklinkTable:
+    """Tabela colunar de backlinks, montada a partir das páginas da API"""
+
+    TEXT_COLUMNS = ('url_to', 'title', 'anchor', 'alt', 'image_source')
+
+    def __init__(self):
+        self.size = 0
+        self.url_from = []
+        self.domains = StringTable()
+        self.domain_ids = array('I')
+        self.strings = {column: StringTable() for column in self.TEXT_COLUMNS}
+        self.string_ids = {column: array('I') for column in self.TEXT_COLUMNS}
+        self.inlink_rank = array('i')
+        self.domain_inlink_rank = array('i')
+        self.first_seen = array('i')
+        self.last_visited = array('i')
+        self._nofollow_rows = []
+        self._image_rows = []
+        self._date_text = {0: None}
+        self._date_cache = {}
+        self._frozen = False
+
+    @classmethod
+    def from_backlinks(cls, backlinks: Iterable[Dict]) -> 'BacklinkTable':
+        table = cls()
+        table.extend(backlinks)
+        table.freeze()
+        return table
+
+    def extend(self, backlinks: Iterable[Dict]):
+        """Acrescenta um lote de backlinks no formato da API"""
+        if self._frozen:
+            raise RuntimeError("A tabela já foi finalizada")
+
+        strings = self.strings
+        string_ids = self.string_ids
+        date_cache = self._date_cache
+        date_text = self._date_text
+        row = self.size
+        for backlink in backlinks:
+            url_from = backlink.get('url_from')
+            self.url_from.append(url_from)
+            host = extract_host(url_from) if url_from else ''
+            self.domain_ids.append(self.domains.intern(host) if host else MISSING)
+
+            for column in self.TEXT_COLUMNS:
+                if column in backlink:
+                    string_ids[column].append(strings[column].intern(backlink[column]))
+                else:
+                    string_ids[column].append(MISSING)
+
+            if backlink.get('nofollow', False):
+                self._nofollow_rows.append(row)
+            if backlink.get('image', False):
+                self._image_rows.append(row)
+            self.inlink_rank.append(backlink.get('inlink_rank') or 0)
+            self.domain_inlink_rank.append(backlink.get('domain_inlink_rank') or 0)
+
+            for column in ('first_seen', 'last_visited'):
+                value = backlink.get(column)
+                ordinal = _parse_date(value, date_cache) if value else 0
+                if ordinal and ordinal not in date_text:
+                    date_text[ordinal] = value
+                getattr(self, column).append(ordinal)
+            row += 1
+        self.size = row
+
+    def freeze(self) -> 'BacklinkTable':
+        """Finaliza a tabela e pré-calcula bitmaps, permutações e índices"""
+        if self._frozen:
+            return self
+        size = self.size
+
+        self.all_rows = (1 << size) - 1
+        self.nofollow = _bitmap_from_indices(self._nofollow_rows, size)
+        self.image = _bitmap_from_indices(self._image_rows, size)
+        del self._nofollow_rows, self._image_rows, self._date_cache
+        # Um byte por linha para leitura rápida na materialização
+        self._nofollow_flags = self._selectors(self.nofollow)
+        self._image_flags = self._selectors(self.image)
+
+        # Permutações estáveis: empates mantêm a posição original
+        ranks = self.domain_inlink_rank
+        self.by_domain_rank = array('I', sorted(range(size), key=ranks.__getitem__, reverse=True))
+        self.by_first_seen = array('I', sorted(range(size), key=self.first_seen.__getitem__, reverse=True))
+
+        # Bitmap de linhas por valor de rank, para o filtro de rank mínimo
+        self.rank_values = sorted(set(ranks))
+        rows_by_rank = {value: [] for value in self.rank_values}
+        for row, value in enumerate(ranks):
+            rows_by_rank[value].append(row)
+        self.rank_bitmaps = [_bitmap_from_indices(rows_by_rank[value], size)
+                             for value in self.rank_values]
+
+        # Índice invertido âncora -> linhas (CSR), para a busca por texto
+        anchor_ids = self.string_ids['anchor']
+        self.anchor_rows = array('I', sorted(range(size), key=anchor_ids.__getitem__))
+        self.anchor_offsets = array('I', [0] * (len(self.strings['anchor']) + 1))
+        for anchor_id in anchor_ids:
+            self.anchor_offsets[anchor_id + 1] += 1
+        for index in range(1, len(self.anchor_offsets)):
+            self.anchor_offsets[index] += self.anchor_offsets[index - 1]
+        self.anchor_lower = [value.lower() if isinstance(value, str) else ''
+                             for value in self.strings['anchor'].values]
+
+        self._frozen = True
+        return self
+
+    # Consultas
+
+    def _mask(self, link_type: str, anchor: Optional[str], min_rank: int) -> int:
+        mask = self.all_rows
+        if link_type == 'dofollow':
+            mask &= ~(self.nofollow | self.image)
+        elif link_type == 'nofollow':
+            mask &= self.nofollow
+        elif link_type == 'image':
+            mask &= self.image
+
+        if min_rank:
+            start = bisect.bisect_left(self.rank_values, min_rank)
+            rank_mask = 0
+            for bitmap in self.rank_bitmaps[start:]:
+                rank_mask |= bitmap
+            mask &= rank_mask
+
+        if anchor:
+            needle = anchor.lower()
+            offsets = self.anchor_offsets
+            matched_rows = []
+            for anchor_id, text in enumerate(self.anchor_lower):
+                if needle in text:
+                    matched_rows.extend(self.anchor_rows[offsets[anchor_id]:offsets[anchor_id + 1]])
+            mask &= _bitmap_from_indices(matched_rows, self.size)
+
+        return mask
+
+    def _selectors(self, mask: int) -> bytes:
+        """Converte o bitmap em um byte 0/1 por linha"""
+        mask_bytes = mask.to_bytes((self.size + 7) // 8, 'little')
+        return b''.join(_BIT_EXPANSION[value] for value in mask_bytes)[:self.size]
+
+    def query(self, link_type: str = 'all', anchor: Optional[str] = None, min_rank: int = 0,
+              sort: str = 'position', page: int = 1, page_size: int = 20,
+              compact: bool = False) -> Dict:
+        """Mesma interface e resultado de `backlink_query.query_backlinks`
+
+        Com `compact=True`, `backlinks` vem no formato de `to_columns`.
+        """
+        if link_type not in LINK_TYPES:
+            raise ValueError(f"Tipo de link inválido: {link_type}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Ordenação inválida: {sort}")
+        self.freeze()
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        mask = self._mask(link_type, anchor, min_rank)
+        filtered_total = bin(mask).count('1')
+        total_pages = max(1, -(-filtered_total // page_size))
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * page_size
+
+        if sort == 'domain_rank':
+            order = self.by_domain_rank
+        elif sort == 'first_seen':
+            order = self.by_first_seen
+        else:
+            order = range(self.size)
+
+        if mask == self.all_rows:
+            rows = order[start:start + page_size]
+        else:
+            selectors = self._selectors(mask)
+            if sort != 'position':
+                selectors = map(selectors.__getitem__, order)
+            rows = islice(compress(order, selectors), start, start + page_size)
+
+        return {
+            'backlinks': self.to_columns(rows) if compact else [self.row(index) for index in rows],
+            'total': self.size,
+            'filtered_total': filtered_total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages
+        }
+
+    # Materialização
+
+    def _text(self, column: str, index: int, default='N/A'):
+        value_id = self.string_ids[column][index]
+        return default if value_id == MISSING else self.strings[column].values[value_id]
+
+    def _date(self, ordinals: array, index: int):
+        text = self._date_text.get(ordinals[index])
+        return 'N/A' if text is None else text
+
+    def row(self, index: int) -> Dict:
+        """Backlink formatado (mesmas chaves de `analyze_domain`)"""
+        self.freeze()
+        url_from = self.url_from[index]
+        return {
+            'position': index + 1,
+            'source_url': 'N/A' if url_from is None else url_from,
+            'target_url': self._text('url_to', index),
+            'title': self._text('title', index),
+            'anchor_text': self._text('anchor', index),
+            'alt_text': self._text('alt', index),
+            'is_nofollow': self._nofollow_flags[index] == 1,
+            'is_image': self._image_flags[index] == 1,
+            'image_source': self._text('image_source', index, default=''),
+            'inlink_rank': self.inlink_rank[index],
+            'domain_inlink_rank': self.domain_inlink_rank[index],
+            'first_seen': self._date(self.first_seen, index),
+            'last_visited': self._date(self.last_visited, index)
+        }
+
+    def to_rows(self) -> List[Dict]:
+        """Todos os backlinks formatados, na ordem original"""
+        return [self.row(index) for index in range(self.size)]
+
+    def to_columns(self, rows: Optional[Iterable[int]] = None) -> Dict:
+        """Backlinks (todos, ou as linhas `rows`) no formato compacto colunar
+
+        `{'format': 'columns', 'rows', 'columns', 'values', 'dictionaries'}`:
+        `values[i]` é o vetor da coluna `columns[i]`; nas colunas presentes
+        em `dictionaries`, os valores são índices do dicionário.
+        """
+        self.freeze()
+        rows = range(self.size) if rows is None else list(rows)
+        strings = self.strings
+        string_ids = self.string_ids
+
+        def text(column: str) -> List:
+            ids = string_ids[column]
+            values = strings[column].values
+            return [values[ids[index]] for index in rows]
+
+        def dates(ordinals: array) -> List:
+            date_text = self._date_text
+            return [date_text.get(ordinals[index]) for index in rows]
+
+        domains, domain_dictionary = _dictionary_encode(
+            (self.domain_ids[index] for index in rows), self.domains.values)
+        targets, target_dictionary = _dictionary_encode(
+            (string_ids['url_to'][index] for index in rows), strings['url_to'].values)
+        values = [
+            [index + 1 for index in rows],
+            [self.url_from[index] for index in rows],
+            domains,
+            targets,
+            text('title'),
+            text('anchor'),
+            text('alt'),
+            [self._nofollow_flags[index] for index in rows],
+            [self._image_flags[index] for index in rows],
+            text('image_source'),
+            [self.inlink_rank[index] for index in rows],
+            [self.domain_inlink_rank[index] for index in rows],
+            dates(self.first_seen),
+            dates(self.last_visited)
+        ]
+        return {
+            'format': 'columns',
+            'rows': len(rows),
+            'columns': list(WIRE_COLUMNS),
+            'values': values,
+            'dictionaries': {'referring_domain': domain_dictionary, 'target_url': target_dictionary}
+        }
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """Estimativa do tamanho em memória da tabela"""
+        strings = sum(len(value) + 50 for table in self.strings.values()
+                      for value in table.values if isinstance(value, str))
+        strings += sum(len(value) + 50 for value in self.domains.values if value)
+        strings += sum(len(url) + 50 for url in self.url_from if url)
+        columns = (self.domain_ids.itemsize * self.size * (len(self.TEXT_COLUMNS) + 1)
+                   + self.inlink_rank.itemsize * self.size * 4)
+        indexes = (self.size * 4 * 3 + self.size * 2
+                   + (self.size // 8) * (3 + len(getattr(self, 'rank_bitmaps', ()))))
+        return strings + columns + indexes + 8 * self.size
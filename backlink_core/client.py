@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""
+Cliente síncrono da SE Ranking API, compartilhado pela CLI e pela aplicação web
+
+`BacklinkClient` reúne a requisição (limitador, cache em disco, leitura em
+streaming opcional), a paginação pelo cursor `next` e a análise de um
+domínio (BacklinkStats + BacklinkTable). Erros da API levantam
+`BacklinkAPIError`; cabe a quem chama decidir como exibi-los.
+
+O `requests` (e o pool de conexões) só é importado ao criar o cliente, para
+que importar a CLI ou a aplicação web não pague esse custo.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .aggregation import BacklinkStats
+from .backlink_table import BacklinkTable
+from .json_stream import CHUNK_SIZE, JSONArrayStream, iter_batches, scan_field, tee_compressed
+from .metrics import metrics
+from .normalize import normalize_domain
+from .rate_limiter import get_shared_limiter
+from .response_cache import CACHE_BYPASS, CACHE_REFRESH, CACHE_USE, CACHEABLE_ENDPOINTS, get_shared_cache
+
+
+API_BASE_URL = "https://api.seranking.com"
+
+# Tamanho máximo de página aceito pelo endpoint /v1/backlinks/raw
+DEFAULT_PAGE_SIZE = 1000
+
+# Máximo de links novos/perdidos listados no resultado da análise incremental
+CHANGES_LIMIT = 100
+
+
+class BacklinkAPIError(Exception):
+    """Falha ao obter ou decodificar uma resposta da SE Ranking API"""
+
+
+def feed_page(rows: Iterable[Dict], stats: BacklinkStats, table: Optional[BacklinkTable] = None,
+              sample: Optional[List[Dict]] = None, sample_size: int = 0) -> int:
+    """Acumula as linhas de uma página nas estatísticas (e na tabela)
+
+    Processa em lotes, de modo que uma página lida em streaming é percorrida
+    uma única vez; as primeiras linhas vão para `sample`, até `sample_size`.
+    Retorna o número de linhas. Medido como a etapa 'aggregate' (no modo
+    streaming, inclui a leitura e a decodificação da página).
+    """
+    count = 0
+    with metrics.measure('aggregate'):
+        for batch in iter_batches(rows):
+            stats.add_batch(batch)
+            if table is not None:
+                table.extend(batch)
+            if sample is not None and len(sample) < sample_size:
+                sample.extend(batch[:sample_size - len(sample)])
+            count += len(batch)
+    metrics.inc('rows_total', count)
+    return count
+
+
+def analysis_result(domain: str, stats: BacklinkStats, table: Optional[BacklinkTable],
+                    has_more: bool, pages_fetched: int, error: Optional[str] = None,
+                    sample: Optional[List[Dict]] = None) -> Dict:
+    """Resultado de `analyze_domain` a partir do que foi acumulado
+
+    Uma falha na primeira página resulta em `success=False`; em páginas
+    seguintes, o resultado é parcial (`partial=True`) com o que já foi lido.
+    """
+    if error and not pages_fetched:
+        return {
+            'success': False,
+            'domain': domain,
+            'error': error
+        }
+
+    result = {
+        'success': True,
+        'domain': domain
+    }
+    result.update(stats.summary())
+    result.update({
+        'has_more': has_more,
+        'pages_fetched': pages_fetched,
+        'partial': bool(error)
+    })
+    if error:
+        result['error'] = error
+    if table is not None:
+        table.freeze()
+        result['backlinks_table'] = table
+    if sample is not None:
+        result['top_backlinks'] = sample
+    return result
+
+
+class BacklinkClient:
+    """Cliente para análise de backlinks usando SE Ranking API"""
+
+    def __init__(self, api_token: Optional[str] = None, base_url: Optional[str] = None,
+                 max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                 pool_size: Optional[int] = None, cache_mode: str = CACHE_USE,
+                 stream_json: Optional[bool] = None, aggregation_workers: Optional[int] = None):
+        """Cria o cliente a partir dos argumentos ou das variáveis de ambiente
+
+        `base_url` aponta para a API (padrão: SE_RANKING_API_URL ou a API
+        pública); `pool_size` dimensiona o pool de conexões por host (padrão:
+        SE_RANKING_POOL_SIZE); `cache_mode` é o modo padrão do cache em disco
+        ('use', 'refresh' ou 'bypass'), que pode ser trocado por chamada.
+        `aggregation_workers` liga a agregação em vários processos (padrão:
+        BACKLINKS_AGGREGATION_WORKERS; 0 = desligada). Levanta ValueError se
+        não houver chave da API.
+        """
+        from .transport import SessionPool, TransportConfig
+
+        self.api_token = api_token or os.getenv('SE_RANKING_API_TOKEN')
+        if not self.api_token:
+            raise ValueError("Chave da API não encontrada!")
+
+        self.base_url = base_url or os.getenv('SE_RANKING_API_URL', API_BASE_URL)
+        # Pool de conexões HTTP (tamanho, keep-alive, timeouts e compressão via ambiente)
+        self.transport = SessionPool(TransportConfig.from_env(pool_maxsize=pool_size))
+        # Vazão e concorrência compartilhadas por todas as threads
+        self.limiter = get_shared_limiter()
+        # Cache em disco das respostas (None se desativado)
+        self.cache = get_shared_cache() if cache_mode != CACHE_BYPASS else None
+        self.cache_mode = cache_mode
+        # Orçamento da paginação (0 = sem limite)
+        if max_rows is None:
+            max_rows = int(os.getenv('BACKLINKS_MAX_ROWS', '10000'))
+        if max_pages is None:
+            max_pages = int(os.getenv('BACKLINKS_MAX_PAGES', '10'))
+        self.max_rows = max_rows
+        self.max_pages = max_pages
+        # Lê as páginas em streaming, sem montar a resposta inteira em memória
+        if stream_json is None:
+            stream_json = os.getenv('BACKLINKS_STREAM_JSON', '').lower() in ('1', 'true', 'yes')
+        self.stream_json = stream_json
+        # Processos que decodificam e agregam as páginas (ver parallel.py)
+        if aggregation_workers is None:
+            aggregation_workers = int(os.getenv('BACKLINKS_AGGREGATION_WORKERS', '0'))
+        self.aggregation_workers = aggregation_workers
+        # Análise incremental: ordem pedida à API (vazio = ordem padrão) e
+        # intervalo entre varreduras completas, que detectam links perdidos
+        self.incremental_order_by = os.getenv('BACKLINKS_INCREMENTAL_ORDER_BY', 'first_seen')
+        self.full_scan_days = float(os.getenv('BACKLINKS_SNAPSHOT_FULL_SCAN_DAYS', '7'))
+
+    def normalize_domain(self, domain: str) -> str:
+        """Remove protocolo, 'www.' e caminho do domínio informado"""
+        return normalize_domain(domain)
+
+    def _cache_for(self, endpoint: str, cache_mode: str):
+        if endpoint in CACHEABLE_ENDPOINTS and cache_mode != CACHE_BYPASS:
+            return self.cache
+        return None
+
+    def _send(self, url: str, params: dict, stream: bool = False):
+        """GET pelo limitador, com retentativas; levanta BacklinkAPIError em erro HTTP"""
+        import requests
+
+        try:
+            # Inclui a espera do limitador e as retentativas; sem streaming, o download do corpo
+            with metrics.measure('upstream'):
+                response = self.limiter.request(
+                    lambda: self.transport.get(url, params=params, stream=stream),
+                    retry_exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                )
+            metrics.inc('upstream_requests_total', status=response.status_code)
+            if response.status_code >= 400:
+                response.close()
+            if response.status_code == 429:
+                metrics.inc('errors_total', type='rate_limited')
+                raise BacklinkAPIError("Limite de requisições da SE Ranking excedido (HTTP 429). Tente novamente em instantes.")
+            response.raise_for_status()
+            return response
+        except requests.exceptions.HTTPError as e:
+            metrics.inc('errors_total', type='http')
+            raise BacklinkAPIError(f"Erro na requisição: {e}")
+        except requests.exceptions.RequestException as e:
+            metrics.inc('errors_total', type='timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection')
+            raise BacklinkAPIError(f"Erro na requisição: {e}")
+
+    def _make_request(self, endpoint: str, params: dict, cache_mode: Optional[str] = None) -> dict:
+        """Faz uma requisição para a API da SE Ranking
+
+        `cache_mode` controla o cache em disco: 'use', 'refresh' (ignora a
+        entrada guardada e grava a nova) ou 'bypass' (não usa); padrão: o
+        modo do cliente.
+        """
+        body = self._fetch_body(endpoint, params, cache_mode=cache_mode)
+        try:
+            with metrics.measure('decode'):
+                return json.loads(body)
+        except ValueError as e:
+            metrics.inc('errors_total', type='decode')
+            raise BacklinkAPIError(f"Erro ao decodificar resposta JSON: {e}")
+
+    def _fetch_body(self, endpoint: str, params: dict, cache_mode: Optional[str] = None) -> bytes:
+        """Como `_make_request`, mas retorna o corpo sem decodificar
+
+        Um corpo que não tem cara de objeto JSON (ex.: página de erro ou
+        resposta truncada) levanta BacklinkAPIError e não vai para o cache.
+        """
+        cache_mode = cache_mode or self.cache_mode
+        cache = self._cache_for(endpoint, cache_mode)
+        if cache and cache_mode != CACHE_REFRESH:
+            body = cache.get(endpoint, params)
+            if body is not None:
+                return body
+
+        cache_params = dict(params)
+        params['apiKey'] = self.api_token
+
+        body = self._send(f"{self.base_url}{endpoint}", params).content
+        metrics.inc('upstream_bytes_total', len(body))
+        stripped = body.strip()
+        if not (stripped.startswith(b'{') and stripped.endswith(b'}')):
+            metrics.inc('errors_total', type='decode')
+            raise BacklinkAPIError("Erro ao decodificar resposta JSON: o corpo não é um objeto JSON")
+        if cache:
+            cache.put(endpoint, cache_params, body)
+        return body
+
+    def _stream_request(self, endpoint: str, params: dict, cache_mode: Optional[str] = None) -> JSONArrayStream:
+        """Como `_make_request`, mas lê o corpo em pedaços (`stream=True`)
+
+        Retorna um JSONArrayStream que decodifica os `backlinks` à medida que
+        são iterados; os demais campos (ex.: `next`) ficam em `finish()`. O
+        corpo é comprimido para o cache durante a leitura.
+        """
+        cache_mode = cache_mode or self.cache_mode
+        cache = self._cache_for(endpoint, cache_mode)
+        if cache and cache_mode != CACHE_REFRESH:
+            chunks = cache.get_stream(endpoint, params, CHUNK_SIZE)
+            if chunks is not None:
+                return JSONArrayStream(chunks)
+
+        cache_params = dict(params)
+        params['apiKey'] = self.api_token
+
+        response = self._send(f"{self.base_url}{endpoint}", params, stream=True)
+        chunks = self._iter_body(response)
+        if cache:
+            chunks = tee_compressed(
+                chunks, lambda body: cache.put_compressed(endpoint, cache_params, body)
+            )
+        return JSONArrayStream(chunks)
+
+    def _iter_body(self, response) -> Iterator[bytes]:
+        """Pedaços do corpo de uma resposta lida em streaming"""
+        import requests
+
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                received += len(chunk)
+                yield chunk
+        except requests.exceptions.RequestException as e:
+            metrics.inc('errors_total', type='connection')
+            raise BacklinkAPIError(f"Erro na requisição: {e}")
+        finally:
+            metrics.inc('upstream_bytes_total', received)
+            response.close()
+
+    def get_backlinks(self, domain: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                      cache_mode: Optional[str] = None, stream: bool = False, order_by: Optional[str] = None,
+                      raw: bool = False):
+        """Obtém uma página de backlinks de um domínio
+
+        Com `stream=True`, retorna um JSONArrayStream em vez do dicionário, e
+        com `raw=True`, o corpo sem decodificar (bytes); `order_by` pede à API
+        uma ordenação (ex.: 'first_seen').
+        """
+        params = {
+            'target': self.normalize_domain(domain),
+            'mode': 'domain',
+            'limit': limit,
+            'output': 'json'
+        }
+        if cursor:
+            params['next'] = cursor
+        if order_by:
+            params['order_by'] = order_by
+
+        if stream:
+            return self._stream_request('/v1/backlinks/raw', params, cache_mode=cache_mode)
+        if raw:
+            return self._fetch_body('/v1/backlinks/raw', params, cache_mode=cache_mode)
+        return self._make_request('/v1/backlinks/raw', params, cache_mode=cache_mode)
+
+    def iter_backlinks(self, domain: str, page_size: int = DEFAULT_PAGE_SIZE,
+                       max_rows: Optional[int] = None, max_pages: Optional[int] = None,
+                       cache_mode: Optional[str] = None, stream: Optional[bool] = None,
+                       order_by: Optional[str] = None, cursor: Optional[str] = None):
+        """Percorre o perfil de backlinks seguindo o cursor `next` da API.
+
+        Gera um dicionário por página com as chaves `backlinks` (lote da página),
+        `page` (número da página), `next` (cursor da página seguinte) e
+        `has_more` (se ainda há dados além do orçamento). Apenas uma página fica
+        em memória por vez. `cursor` retoma a paginação a partir de um cursor
+        já obtido (as páginas voltam a ser numeradas a partir de 1).
+
+        Com `stream` (padrão: BACKLINKS_STREAM_JSON), `backlinks` é um iterável
+        de uso único decodificado durante a leitura do corpo; como o cursor vem
+        depois do array, `next` e `has_more` só são preenchidos quando o
+        consumidor pede a próxima página (ou encerra o laço).
+        """
+        max_rows = self.max_rows if max_rows is None else max_rows
+        max_pages = self.max_pages if max_pages is None else max_pages
+        stream = self.stream_json if stream is None else stream
+
+        rows_fetched = 0
+        page = 0
+        while True:
+            limit = page_size
+            if max_rows:
+                limit = min(limit, max_rows - rows_fetched)
+
+            data = self.get_backlinks(domain, limit=limit, cursor=cursor,
+                                      cache_mode=cache_mode, stream=stream, order_by=order_by)
+            page += 1
+            if stream:
+                page_info = {'backlinks': data, 'page': page, 'next': None, 'has_more': False}
+                yield page_info
+                cursor = data.finish().get('next')
+                fetched = data.count
+            else:
+                backlinks = data.get('backlinks', [])
+                cursor = data.get('next')
+                fetched = len(backlinks)
+                page_info = {'backlinks': backlinks, 'page': page, 'next': None, 'has_more': False}
+
+            rows_fetched += fetched
+            page_info['next'] = cursor
+            page_info['has_more'] = bool(cursor) and bool(fetched)
+            if not stream:
+                yield page_info
+
+            budget_exhausted = (
+                (max_rows and rows_fetched >= max_rows) or
+                (max_pages and page >= max_pages)
+            )
+            if not page_info['has_more'] or budget_exhausted:
+                break
+
+    def iter_page_bodies(self, domain: str, page_size: int = DEFAULT_PAGE_SIZE,
+                         cache_mode: Optional[str] = None) -> Iterator[Dict]:
+        """Como `iter_backlinks`, mas com o corpo de cada página sem decodificar
+
+        Gera `{'body', 'page', 'next', 'has_more'}`; o cursor é lido direto
+        dos bytes (`scan_field`). Sem decodificar a página não se sabe
+        quantas linhas ela tem: para o orçamento de `max_rows`, uma página
+        com cursor conta como cheia (a API só devolve menos que `limit` na
+        última).
+        """
+        rows_fetched = 0
+        page = 0
+        cursor = None
+        while True:
+            limit = page_size
+            if self.max_rows:
+                limit = min(limit, self.max_rows - rows_fetched)
+
+            body = self.get_backlinks(domain, limit=limit, cursor=cursor, cache_mode=cache_mode, raw=True)
+            page += 1
+            previous, cursor = cursor, scan_field(body, 'next')
+            rows_fetched += limit
+            # Um cursor repetido indicaria uma página vazia sem fim
+            has_more = bool(cursor) and cursor != previous
+            yield {'body': body, 'page': page, 'next': cursor, 'has_more': has_more}
+
+            budget_exhausted = (
+                (self.max_rows and rows_fetched >= self.max_rows) or
+                (self.max_pages and page >= self.max_pages)
+            )
+            if not has_more or budget_exhausted:
+                break
+
+    def iter_page_rows(self, domain: str, errors: List[str], max_rows: Optional[int] = None,
+                       cache_mode: Optional[str] = None) -> Iterator[Iterable[Dict]]:
+        """Linhas de cada página de `iter_backlinks`, encerrando na primeira falha
+
+        A mensagem de erro vai para `errors` em vez de propagar a exceção, de
+        modo que o que já foi lido continua utilizável (ex.: exportação parcial).
+        """
+        try:
+            for page in self.iter_backlinks(domain, max_rows=max_rows, cache_mode=cache_mode):
+                yield page['backlinks']
+        except (BacklinkAPIError, ValueError) as e:
+            errors.append(str(e))
+
+    def analyze_domain(self, domain: str, cache_mode: Optional[str] = None, build_table: bool = True,
+                       sample_size: int = 0, on_page: Optional[Callable[[int, int], None]] = None,
+                       incremental: bool = False, full_scan: bool = False) -> Dict:
+        """Percorre as páginas de um domínio e retorna o resumo da análise
+
+        Com `build_table=True`, os backlinks ficam em `backlinks_table`
+        (BacklinkTable), usada para as consultas paginadas; com `sample_size`,
+        os primeiros backlinks vêm em `top_backlinks`. `on_page(página,
+        linhas)` é chamado a cada página processada (ex.: progresso na CLI).
+
+        Com `incremental=True`, compara com o snapshot do domínio (ver
+        `analyze_changes`); nesse modo não há `backlinks_table`. Sem a
+        tabela e com `aggregation_workers`, as páginas são agregadas em vários
+        processos (ver `analyze_parallel`). Toda análise bem-sucedida é
+        acrescentada ao histórico do domínio (ver `history`).
+        """
+        domain = self.normalize_domain(domain)
+        if incremental:
+            return self.analyze_changes(domain, cache_mode=cache_mode, sample_size=sample_size,
+                                        on_page=on_page, full_scan=full_scan)
+        if self.aggregation_workers > 0 and not build_table:
+            return self.analyze_parallel(domain, cache_mode=cache_mode, sample_size=sample_size,
+                                         on_page=on_page)
+
+        for event in self.iter_analysis(domain, cache_mode=cache_mode, build_table=build_table,
+                                        sample_size=sample_size):
+            if event['event'] == 'page' and on_page:
+                on_page(event['page'], event['rows'])
+        return event['result']
+
+    def analyze_parallel(self, domain: str, cache_mode: Optional[str] = None, sample_size: int = 0,
+                         on_page: Optional[Callable[[int, int], None]] = None,
+                         workers: Optional[int] = None) -> Dict:
+        """Análise com as páginas decodificadas e agregadas em um pool de processos
+
+        Mesmo resultado de `analyze_domain(build_table=False)`. Esta thread só
+        busca as páginas (ver `iter_page_bodies`), enquanto até `workers`
+        processos (padrão: `aggregation_workers`) agregam as anteriores; só
+        a página da amostra (`sample_size`) é decodificada aqui. `on_page` é
+        chamado a cada página somada ao total.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+        from .history import record_history
+        from .parallel import discard_shared_aggregator, get_shared_aggregator
+
+        domain = self.normalize_domain(domain)
+        aggregator = get_shared_aggregator(workers or self.aggregation_workers)
+        stats = BacklinkStats()
+        sample = [] if sample_size else None
+        last_page = None
+        pages = 0
+        merged = 0
+        error = None
+
+        def bodies():
+            nonlocal last_page, pages
+            for page in self.iter_page_bodies(domain, cache_mode=cache_mode):
+                last_page = page
+                pages = page['page']
+                if sample is not None and len(sample) < sample_size:
+                    rows = json.loads(page['body']).get('backlinks') or []
+                    sample.extend(rows[:sample_size - len(sample)])
+                yield page['body']
+
+        def on_result(rows: int):
+            nonlocal merged
+            merged += 1
+            metrics.inc('rows_total', rows)
+            if on_page:
+                on_page(merged, rows)
+
+        try:
+            aggregator.aggregate(bodies(), stats, on_result)
+        except (BacklinkAPIError, ValueError) as e:
+            error = str(e)
+        except BrokenProcessPool as e:
+            # Um processo do pool morreu: as páginas em voo se perderam e o
+            # pool não aceita mais tarefas; a próxima análise cria outro
+            discard_shared_aggregator(aggregator)
+            metrics.inc('errors_total', type='aggregation')
+            return {'success': False, 'domain': domain,
+                    'error': f"Falha na agregação paralela: {e or 'processo encerrado'}"}
+
+        has_more = bool(last_page and last_page['has_more'])
+        result = analysis_result(domain, stats, None, has_more, pages, error, sample)
+        record_history(result)
+        return result
+
+    def iter_analysis(self, domain: str, cache_mode: Optional[str] = None, build_table: bool = True,
+                      sample_size: int = 0, page_rows: int = 0) -> Iterator[Dict]:
+        """Análise página a página, para quem exibe o progresso enquanto os dados chegam
+
+        Gera um evento por página processada, `{'event': 'page', 'page',
+        'rows', 'stats', 'backlinks'}`, em que `stats` é o BacklinkStats
+        acumulado até ali e `backlinks` traz até `page_rows` linhas da página;
+        o último evento é `{'event': 'result', 'result'}`, com o mesmo
+        resultado de `analyze_domain`.
+        """
+        from .history import record_history
+
+        domain = self.normalize_domain(domain)
+        stats = BacklinkStats()
+        table = BacklinkTable() if build_table else None
+        sample = [] if sample_size else None
+        last_page = None
+        pages = 0
+        error = None
+
+        try:
+            # Processa os backlinks página a página, conforme chegam da API
+            for page in self.iter_backlinks(domain, cache_mode=cache_mode):
+                last_page = page
+                page_sample = []
+                wanted = page_rows
+                if sample is not None:
+                    wanted = max(wanted, sample_size - len(sample))
+                rows = feed_page(page['backlinks'], stats, table, page_sample, wanted)
+                if sample is not None:
+                    sample.extend(page_sample[:sample_size - len(sample)])
+                pages = page['page']
+                yield {
+                    'event': 'page',
+                    'page': pages,
+                    'rows': rows,
+                    'stats': stats,
+                    'backlinks': page_sample[:page_rows]
+                }
+        except (BacklinkAPIError, ValueError) as e:
+            error = str(e)
+
+        # Lido após o laço: no modo streaming só é conhecido ao fim da página
+        has_more = bool(last_page and last_page['has_more'])
+        result = analysis_result(domain, stats, table, has_more, pages, error, sample)
+        record_history(result)
+        yield {'event': 'result', 'result': result}
+
+    def analyze_changes(self, domain: str, cache_mode: Optional[str] = None, sample_size: int = 0,
+                        on_page: Optional[Callable[[int, int], None]] = None,
+                        full_scan: bool = False) -> Dict:
+        """Análise incremental: backlinks novos e perdidos desde o último snapshot
+
+        Pede as páginas do `first_seen` mais recente para o mais antigo e para
+        ao chegar a linhas anteriores ao mais recente já conhecido, de modo
+        que o custo acompanha o número de mudanças e não o tamanho do perfil.
+        O resumo é o do snapshot somado às linhas novas.
+
+        Links perdidos só podem ser detectados quando a varredura chega ao fim
+        do perfil: com `full_scan=True`, quando o último snapshot completo tem
+        mais de BACKLINKS_SNAPSHOT_FULL_SCAN_DAYS dias, ou quando a API não
+        devolve as linhas na ordem pedida (sem ordem, não há parada antecipada).
+        A primeira análise de um domínio cria a linha de base.
+        """
+        from datetime import datetime
+        from .history import record_history
+        from .snapshots import backlink_key, get_shared_snapshots, link_row, summary_deltas
+
+        domain = self.normalize_domain(domain)
+        store = get_shared_snapshots()
+        snapshot = store.load(domain)
+        if snapshot and not full_scan and self.full_scan_days:
+            full_scan = time.time() - snapshot['full_scan_at'] >= self.full_scan_days * 86400
+        watermark = snapshot['watermark'] if snapshot else None
+        stop_at_known = bool(snapshot and watermark and not full_scan)
+
+        scanned = BacklinkStats()   # todas as linhas lidas nesta análise
+        added = BacklinkStats()     # apenas as linhas que não estavam no snapshot
+        seen = set()
+        fresh_rows = []             # gravadas no snapshot só se a análise der certo
+        new_backlinks = []
+        new_count = 0
+        newest = watermark
+        previous_first_seen = None
+        ordered = True
+        stopped_early = False
+        sample = [] if sample_size else None
+        last_page = None
+        pages = 0
+        error = None
+
+        try:
+            for page in self.iter_backlinks(domain, cache_mode=cache_mode,
+                                            order_by=self.incremental_order_by or None):
+                last_page = page
+                rows = 0
+                reached_known = False
+                for batch in iter_batches(page['backlinks']):
+                    keys = [backlink_key(backlink) for backlink in batch]
+                    known = store.known_keys(domain, keys) if snapshot else ()
+                    fresh = []
+                    for key, backlink in zip(keys, batch):
+                        if key not in known and key not in seen:
+                            fresh.append((key, backlink))
+                        seen.add(key)
+
+                        first_seen = backlink.get('first_seen')
+                        if first_seen:
+                            if previous_first_seen and first_seen > previous_first_seen:
+                                ordered = False
+                            previous_first_seen = first_seen
+                            if newest is None or first_seen > newest:
+                                newest = first_seen
+                            if watermark and first_seen < watermark:
+                                reached_known = True
+
+                    scanned.add_batch(batch)
+                    added.add_batch(backlink for _, backlink in fresh)
+                    fresh_rows.extend(link_row(key, backlink) for key, backlink in fresh)
+                    new_count += len(fresh)
+                    if snapshot and len(new_backlinks) < CHANGES_LIMIT:
+                        new_backlinks.extend(backlink for _, backlink in fresh[:CHANGES_LIMIT - len(new_backlinks)])
+                    if sample is not None and len(sample) < sample_size:
+                        sample.extend(batch[:sample_size - len(sample)])
+                    rows += len(batch)
+
+                pages = page['page']
+                if on_page:
+                    on_page(pages, rows)
+                if stop_at_known and ordered and reached_known:
+                    stopped_early = True
+                    break
+        except (BacklinkAPIError, ValueError) as e:
+            error = str(e)
+
+        has_more = bool(last_page and last_page['has_more']) and not stopped_early
+        reached_end = not (error or stopped_early or has_more)
+
+        lost_count, lost_backlinks = None, None
+        if snapshot and reached_end:
+            lost_count, lost_backlinks = store.remove_missing(domain, seen, CHANGES_LIMIT)
+        # Uma varredura até o fim recalcula tudo; senão, o snapshot recebe as novas
+        if snapshot is None or reached_end:
+            stats = scanned
+        else:
+            stats = snapshot['stats'].merge(added)
+
+        result = analysis_result(domain, stats, None, has_more, pages, error, sample)
+        if not result['success']:
+            return result
+
+        store.save(domain, stats, result, newest, complete=reached_end, full_scan=reached_end,
+                   links=fresh_rows)
+        if snapshot is None:
+            mode = 'baseline'
+        else:
+            mode = 'incremental' if stopped_early else 'full'
+        result['changes'] = {
+            'mode': mode,
+            'since': (datetime.fromtimestamp(snapshot['updated_at']).isoformat(timespec='seconds')
+                      if snapshot else None),
+            'ordered': ordered,
+            'new_count': new_count,
+            'new_backlinks': new_backlinks,
+            'lost_count': lost_count,
+            'lost_backlinks': lost_backlinks,
+            'deltas': summary_deltas(snapshot['summary'], result) if snapshot else {}
+        }
+        record_history(result, incremental=True)
+        return result
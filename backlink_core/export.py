@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Exportação dos resultados de análise
+
+`JSONLWriter` grava um resultado por linha (JSON Lines), com escrita segura
+entre threads e flush a cada linha, para que o consumidor acompanhe o
+progresso de um lote.
+
+`BacklinkExporter` converte os backlinks de um domínio em CSV, NDJSON ou
+Parquet (com pyarrow) à medida que as páginas chegam da API: cada lote vira
+um pedaço de bytes, gravado em arquivo pela CLI ou enviado em chunks pelo
+/export, sem montar a lista completa em memória. As colunas são as do
+formato compacto (`WIRE_COLUMNS`), com campos ausentes vazios (null).
+
+Os módulos usados só na exportação dos backlinks são importados sob demanda,
+para não pesar na inicialização da CLI (que usa apenas o JSONLWriter).
+"""
+
+import io
+import json
+import threading
+from typing import Dict, IO, Iterable, Iterator, List
+
+# Chaves do resultado que não são serializáveis ou não fazem parte do resumo
+NON_EXPORTED_KEYS = ('backlinks_table', 'top_backlinks')
+
+
+def jsonl_record(result: Dict) -> Dict:
+    """Resultado de `analyze_domain` sem os campos internos (tabela, amostra)"""
+    return {key: value for key, value in result.items() if key not in NON_EXPORTED_KEYS}
+
+
+class JSONLWriter:
+    """Escreve registros JSON Lines em um arquivo de texto aberto"""
+
+    def __init__(self, output: IO[str]):
+        self.output = output
+        self.records = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict):
+        line = json.dumps(jsonl_record(record), ensure_ascii=False) + '\n'
+        with self._lock:
+            self.output.write(line)
+            self.output.flush()
+            self.records += 1
+
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+# Extensões de arquivo reconhecidas por `format_from_path`
+EXPORT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.parquet': 'parquet'
+}
+
+# Linhas por row group do Parquet (acumuladas antes de cada gravação)
+PARQUET_ROW_GROUP_ROWS = 32768
+
+
+def format_from_path(path: str, default: str = 'csv') -> str:
+    """Formato de exportação pela extensão do arquivo"""
+    for extension, export_format in EXPORT_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return export_format
+    return default
+
+
+def export_records(backlinks: List[Dict], start: int = 0) -> List[tuple]:
+    """Backlinks da API como tuplas na ordem de WIRE_COLUMNS (posição a partir de start + 1)"""
+    from .hostnames import extract_host
+
+    records = []
+    append = records.append
+    position = start
+    for backlink in backlinks:
+        get = backlink.get
+        url_from = get('url_from')
+        position += 1
+        append((
+            position,
+            url_from,
+            (extract_host(url_from) or None) if url_from else None,
+            get('url_to'),
+            get('title'),
+            get('anchor'),
+            get('alt'),
+            1 if get('nofollow') else 0,
+            1 if get('image') else 0,
+            get('image_source'),
+            get('inlink_rank') or 0,
+            get('domain_inlink_rank') or 0,
+            get('first_seen'),
+            get('last_visited')
+        ))
+    return records
+
+
+class CSVEncoder:
+    """CSV com cabeçalho; campos ausentes ficam vazios"""
+
+    def __init__(self):
+        import csv
+
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue().encode('utf-8')
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        from .backlink_table import WIRE_COLUMNS
+
+        self._writer.writerow(WIRE_COLUMNS)
+        return self._take()
+
+    def encode(self, records: List[tuple]) -> bytes:
+        self._writer.writerows(records)
+        return self._take()
+
+    def finish(self) -> bytes:
+        return b''
+
+
+class NDJSONEncoder:
+    """Um objeto JSON por linha, com as chaves de WIRE_COLUMNS"""
+
+    def begin(self) -> bytes:
+        return b''
+
+    def encode(self, records: List[tuple]) -> bytes:
+        from .backlink_table import WIRE_COLUMNS
+
+        dumps = json.dumps
+        lines = [dumps(dict(zip(WIRE_COLUMNS, record)), ensure_ascii=False) for record in records]
+        lines.append('')
+        return '\n'.join(lines).encode('utf-8')
+
+    def finish(self) -> bytes:
+        return b''
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino do ParquetWriter que acumula os bytes até serem retirados
+
+    `tell()` conta todos os bytes já escritos: o rodapé do Parquet guarda
+    as posições absolutas dos row groups.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder:
+    """Parquet (requer pyarrow), um row group a cada PARQUET_ROW_GROUP_ROWS linhas"""
+
+    def __init__(self, row_group_rows: int = PARQUET_ROW_GROUP_ROWS):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("A exportação em Parquet requer o pacote pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ('position', pa.int64()),
+            ('source_url', pa.string()),
+            ('referring_domain', pa.string()),
+            ('target_url', pa.string()),
+            ('title', pa.string()),
+            ('anchor_text', pa.string()),
+            ('alt_text', pa.string()),
+            ('is_nofollow', pa.bool_()),
+            ('is_image', pa.bool_()),
+            ('image_source', pa.string()),
+            ('inlink_rank', pa.int32()),
+            ('domain_inlink_rank', pa.int32()),
+            ('first_seen', pa.string()),
+            ('last_visited', pa.string())
+        ])
+        self.row_group_rows = row_group_rows
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression='snappy')
+        self._pending = []
+
+    def _flush(self):
+        if not self._pending:
+            return
+        columns = list(zip(*self._pending))
+        self._pending = []
+        pa = self._pa
+        arrays = []
+        for values, field in zip(columns, self.schema):
+            if field.type == pa.bool_():
+                # Os registros trazem os booleanos como 0/1
+                arrays.append(pa.array(values, type=pa.int8()).cast(pa.bool_()))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def begin(self) -> bytes:
+        return self._sink.take()
+
+    def encode(self, records: List[tuple]) -> bytes:
+        self._pending.extend(records)
+        if len(self._pending) >= self.row_group_rows:
+            self._flush()
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        self._flush()
+        self._writer.close()
+        return self._sink.take()
+
+
+_ENCODERS = {
+    'csv': CSVEncoder,
+    'ndjson': NDJSONEncoder,
+    'parquet': ParquetEncoder
+}
+
+
+class BacklinkExporter:
+    """Converte páginas de backlinks da API em pedaços de bytes de um formato
+
+    Uso: `for chunk in exporter.iter_chunks(páginas): destino.write(chunk)`.
+    `rows` e `bytes` acompanham o que já foi produzido.
+    """
+
+    def __init__(self, export_format: str = 'csv'):
+        if export_format not in _ENCODERS:
+            raise ValueError(f"Formato de exportação inválido: {export_format} "
+                             f"(use {', '.join(EXPORT_FORMATS)})")
+        self.format = export_format
+        self.mimetype = EXPORT_MIMETYPES[export_format]
+        self.encoder = _ENCODERS[export_format]()
+        self.rows = 0
+        self.bytes = 0
+
+    def iter_chunks(self, pages: Iterable[Iterable[Dict]]) -> Iterator[bytes]:
+        """Gera o arquivo em pedaços, um por lote de até 1.000 backlinks
+
+        Para uma exportação parcial continuar legível (rodapé do Parquet),
+        as falhas da API devem encerrar `pages` em vez de propagar a exceção
+        (ver `BacklinkClient.iter_page_rows`).
+        """
+        from .json_stream import iter_batches
+
+        chunks = [self.encoder.begin()]
+        for rows in pages:
+            for batch in iter_batches(rows):
+                chunks.append(self.encoder.encode(export_records(batch, self.rows)))
+                self.rows += len(batch)
+                yield from self._emit(chunks)
+        chunks.append(self.encoder.finish())
+        yield from self._emit(chunks)
+
+    def _emit(self, chunks: List[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            if chunk:
+                self.bytes += len(chunk)
+                yield chunk
+        chunks.clear()
+
+    def write_to(self, pages: Iterable[Iterable[Dict]], output: IO[bytes]) -> int:
+        """Grava o arquivo em `output` (aberto em modo binário); retorna o total de linhas"""
+        for chunk in self.iter_chunks(pages):
+            output.write(chunk)
+        return self.rows
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Histórico das análises por domínio, para tendências ao longo do tempo
+
+Cada análise concluída acrescenta um registro de largura fixa ao arquivo do
+domínio (`points.bin`): data, totais, ranks e o histograma de ranks em
+faixas de 10. As âncoras mais frequentes e os backlinks de maior rank vão
+para `anchors.bin` e `links.bin`, também de largura fixa, com os textos
+(URLs e âncoras) trocados por ids de uma tabela de strings sem repetição
+(`strings.bin`, com o deslocamento e o tamanho de cada uma em
+`strings.idx`). Cada link guarda também o ponto em que o par (url_from,
+url_to) apareceu pela primeira vez. O registro do ponto é gravado por
+último e aponta para os seus links e âncoras, então um acréscimo
+interrompido não corrompe o histórico: o que ficou sem ponto é descartado
+no acréscimo seguinte.
+
+Os arquivos só crescem e são lidos com `mmap`: uma consulta de tendência
+localiza o período por busca binária na data e desempacota só os registros
+do período (inclusive para contar os links novos), sem carregar o histórico
+inteiro em objetos Python; os textos só são lidos para o ponto mais recente.
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from mmap import ACCESS_READ, mmap
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+MAGIC = b'BLHIST02'
+HEADER = struct.Struct('<8sI4x')
+
+# data, totais, média de rank, rank máx./mín., percentis (p25, p50, p75,
+# p90, p99), flags, páginas, 11 faixas de rank e os trechos de links e âncoras
+POINT = struct.Struct('<d6QdBB5BBI11QQIQI')
+LINK = struct.Struct('<IIIBBI')     # url_from, url_to, âncora, rank, nofollow, 1º ponto do par
+ANCHOR = struct.Struct('<IQ')       # âncora, ocorrências
+STRING = struct.Struct('<QI')       # deslocamento e tamanho em strings.bin
+
+MISSING = 0xFFFFFFFF
+
+# Métricas do ponto, na ordem do registro (após a data)
+METRICS = ('total_backlinks', 'referring_domains', 'registrable_domains',
+           'dofollow_count', 'nofollow_count', 'image_links', 'avg_domain_rank')
+RANK_BUCKETS = ('0',) + tuple(f"{start}-{min(start + 9, 100)}" for start in range(1, 101, 10))
+PERCENTILES = ('p25', 'p50', 'p75', 'p90', 'p99')
+
+FLAG_PARTIAL = 1
+FLAG_HAS_MORE = 2
+FLAG_INCREMENTAL = 4
+
+# Posições no registro desempacotado
+_TIMESTAMP = 0
+_REFERRING = 2
+_FLAGS = 15
+_BUCKETS = slice(17, 28)
+_LINKS = slice(28, 30)
+_ANCHORS = slice(30, 32)
+
+BUCKETS = ('day', 'week', 'month')
+
+# Backlinks (de maior rank) e âncoras guardados por análise
+TOP_LINKS = 20
+TOP_ANCHORS = 10
+
+
+def _top_links(result: Dict, limit: int) -> List[Tuple]:
+    """(url_from, url_to, âncora, rank, nofollow) dos backlinks de maior rank do resultado"""
+    table = result.get('backlinks_table')
+    if table is not None:
+        links = []
+        for index in table.by_domain_rank[:limit]:
+            row = table.row(index)
+            links.append(tuple(None if value == 'N/A' else value for value in (
+                row['source_url'], row['target_url'], row['anchor_text'])) +
+                (row['domain_inlink_rank'], row['is_nofollow']))
+        return links
+    rows = sorted(result.get('top_backlinks') or [],
+                  key=lambda backlink: int(backlink.get('domain_inlink_rank') or 0), reverse=True)
+    return [(backlink.get('url_from'), backlink.get('url_to'), backlink.get('anchor'),
+             int(backlink.get('domain_inlink_rank') or 0), bool(backlink.get('nofollow')))
+            for backlink in rows[:limit]]
+
+
+def _bucket_label(timestamp: float, bucket: str) -> str:
+    """Período (UTC) de uma data: '2024-05-31', '2024-W22' (semana ISO) ou '2024-05'"""
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    if bucket == 'week':
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    return moment.strftime('%Y-%m-%d' if bucket == 'day' else '%Y-%m')
+
+
+def parse_time(value: str) -> float:
+    """Data ISO ('2024-05-31' ou '2024-05-31T12:00:00'), em UTC se sem fuso, como timestamp"""
+    try:
+        moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Data inválida: {value} (use AAAA-MM-DD)") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _map(path: str, stack: ExitStack):
+    """Arquivo inteiro mapeado para leitura (b'' se vazio ou inexistente)"""
+    try:
+        handle = stack.enter_context(open(path, 'rb'))
+    except FileNotFoundError:
+        return b''
+    if os.fstat(handle.fileno()).st_size == 0:
+        return b''
+    return stack.enter_context(mmap(handle.fileno(), 0, access=ACCESS_READ))
+
+
+def _aligned_end(handle, size: int, start: int = 0) -> int:
+    """Posição do fim do arquivo, descartando um registro incompleto no final"""
+    handle.seek(0, os.SEEK_END)
+    end = handle.tell()
+    aligned = start + (end - start) // size * size
+    if aligned != end:
+        handle.truncate(aligned)
+    return aligned
+
+
+class HistoryStore:
+    """Histórico por domínio em arquivos só de acréscimo (ver o módulo)"""
+
+    def __init__(self, directory: str, top_links: int = TOP_LINKS, top_anchors: int = TOP_ANCHORS):
+        self.directory = directory
+        self.top_links = top_links
+        self.top_anchors = top_anchors
+        self._lock = threading.Lock()
+        # Tabela de strings por domínio: ({texto: id}, strings já lidas)
+        self._strings = {}
+        # Primeiro ponto de cada par de links por domínio: ({par: ponto}, links já lidos)
+        self._firsts = {}
+
+    @classmethod
+    def from_env(cls) -> 'HistoryStore':
+        """Cria o histórico a partir das variáveis de ambiente"""
+        default_dir = os.path.join(tempfile.gettempdir(), 'backlinks_history')
+        return cls(os.getenv('BACKLINKS_HISTORY_DIR', default_dir),
+                   top_links=int(os.getenv('BACKLINKS_HISTORY_TOP_LINKS', str(TOP_LINKS))))
+
+    def _path(self, domain: str, name: str = '') -> str:
+        if not domain or domain in ('.', '..'):
+            raise ValueError(f"Domínio inválido: {domain!r}")
+        return os.path.join(self.directory, quote(domain, safe='.-_'), name)
+
+    def domains(self) -> List[str]:
+        """Domínios com histórico"""
+        from urllib.parse import unquote
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(unquote(name) for name in names
+                      if os.path.exists(os.path.join(self.directory, name, 'points.bin')))
+
+    # Gravação
+
+    def _intern(self, domain: str, index, data, values) -> List[int]:
+        """Ids dos textos na tabela de strings do domínio, acrescentando os novos"""
+        interned, known = self._strings.get(domain, ({}, 0))
+        end = _aligned_end(index, STRING.size)
+        count = end // STRING.size
+        if count > known:
+            # Strings acrescentadas por outro processo desde a última leitura
+            index.seek(known * STRING.size)
+            entries = index.read((count - known) * STRING.size)
+            for number, (offset, length) in enumerate(STRING.iter_unpack(entries), known):
+                data.seek(offset)
+                interned[data.read(length).decode('utf-8')] = number
+        elif count < known:
+            interned = {text: number for text, number in interned.items() if number < count}
+
+        data.seek(0, os.SEEK_END)
+        ids = []
+        for value in values:
+            if value is None:
+                ids.append(MISSING)
+                continue
+            number = interned.get(value)
+            if number is None:
+                # O texto antes da entrada do índice que aponta para ele
+                encoded = value.encode('utf-8')
+                offset = data.tell()
+                data.write(encoded)
+                index.write(STRING.pack(offset, len(encoded)))
+                number = interned[value] = count
+                count += 1
+            ids.append(number)
+        data.flush()
+        index.flush()
+        self._strings[domain] = (interned, count)
+        return ids
+
+    def _first_points(self, domain: str, link_file, end: int) -> Dict[int, int]:
+        """Primeiro ponto em que cada par (url_from, url_to) apareceu, lendo só os links novos"""
+        firsts, known = self._firsts.get(domain, ({}, 0))
+        count = end // LINK.size
+        if count < known:
+            firsts, known = {}, 0
+        if count > known:
+            # Links acrescentados por outro processo desde a última leitura
+            link_file.seek(known * LINK.size)
+            for url_from, url_to, _, _, _, first in LINK.iter_unpack(link_file.read((count - known) * LINK.size)):
+                firsts.setdefault(url_from << 32 | url_to, first)
+        self._firsts[domain] = (firsts, count)
+        return firsts
+
+    def append(self, result: Dict, timestamp: Optional[float] = None, incremental: bool = False) -> int:
+        """Acrescenta o resultado de uma análise ao histórico do domínio
+
+        Retorna o número de pontos do domínio após o acréscimo. A data é a
+        atual (ou `timestamp`), nunca anterior à do último ponto. Levanta
+        ValueError se o histórico existente estiver em outro formato.
+        """
+        domain = result['domain']
+        links = _top_links(result, self.top_links)
+        anchors = [(entry['anchor'], entry['count']) for entry in result.get('top_anchors', [])[:self.top_anchors]]
+        percentiles = result.get('domain_rank_percentiles', {})
+        histogram = result.get('domain_rank_histogram', {})
+        flags = ((FLAG_PARTIAL if result.get('partial') else 0) | (FLAG_HAS_MORE if result.get('has_more') else 0)
+                 | (FLAG_INCREMENTAL if incremental else 0))
+
+        directory = self._path(domain)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, ExitStack() as stack:
+            lock = stack.enter_context(open(os.path.join(directory, '.lock'), 'a'))
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            files = {name: stack.enter_context(open(os.path.join(directory, name), 'a+b'))
+                     for name in ('points.bin', 'links.bin', 'anchors.bin', 'strings.bin', 'strings.idx')}
+
+            points = files['points.bin']
+            points.seek(0, os.SEEK_END)
+            if points.tell() < HEADER.size:
+                points.truncate(0)
+                points.write(HEADER.pack(MAGIC, POINT.size))
+            else:
+                points.seek(0)
+                self._check_header(points.read(HEADER.size))
+            end = _aligned_end(points, POINT.size, HEADER.size)
+            number = (end - HEADER.size) // POINT.size
+            now = time.time() if timestamp is None else timestamp
+            links_start = anchors_start = 0
+            if number:
+                points.seek(end - POINT.size)
+                record = POINT.unpack(points.read(POINT.size))
+                now = max(now, record[_TIMESTAMP])
+                links_start, anchors_start = sum(record[_LINKS]), sum(record[_ANCHORS])
+
+            texts = [text for link in links for text in link[:3]] + [anchor for anchor, _ in anchors]
+            ids = self._intern(domain, files['strings.idx'], files['strings.bin'], texts)
+
+            # Links e âncoras além dos do último ponto vêm de um acréscimo interrompido
+            link_file = files['links.bin']
+            link_file.truncate(links_start * LINK.size)
+            firsts = self._first_points(domain, link_file, links_start * LINK.size)
+            for position, (_, _, _, rank, nofollow) in enumerate(links):
+                url_from, url_to, anchor = ids[position * 3:position * 3 + 3]
+                first = firsts.setdefault(url_from << 32 | url_to, number)
+                link_file.write(LINK.pack(url_from, url_to, anchor, min(max(rank, 0), 255), int(nofollow), first))
+            link_file.flush()
+            self._firsts[domain] = (firsts, links_start + len(links))
+
+            anchor_file = files['anchors.bin']
+            anchor_file.truncate(anchors_start * ANCHOR.size)
+            for anchor_id, (_, count) in zip(ids[len(links) * 3:], anchors):
+                anchor_file.write(ANCHOR.pack(anchor_id, count))
+            anchor_file.flush()
+
+            points.seek(end)
+            points.write(POINT.pack(
+                now,
+                result.get('total_backlinks', 0), result.get('total_referring_domains', 0),
+                result.get('total_registrable_domains', 0), result.get('dofollow_count', 0),
+                result.get('nofollow_count', 0), result.get('image_links', 0),
+                float(result.get('avg_domain_rank', 0)),
+                result.get('max_domain_rank', 0), result.get('min_domain_rank', 0),
+                *(percentiles.get(name, 0) for name in PERCENTILES),
+                flags, result.get('pages_fetched', 0),
+                *(histogram.get(name, 0) for name in RANK_BUCKETS),
+                links_start, len(links), anchors_start, len(anchors)
+            ))
+            points.flush()
+            return number + 1
+
+    # Leitura
+
+    @staticmethod
+    def _check_header(header) -> None:
+        magic, size = HEADER.unpack_from(header)
+        if magic != MAGIC or size != POINT.size:
+            raise ValueError('Formato do histórico não reconhecido')
+
+    @classmethod
+    def _count(cls, points) -> int:
+        """Número de registros completos no arquivo de pontos"""
+        if len(points) < HEADER.size:
+            return 0
+        cls._check_header(points)
+        return (len(points) - HEADER.size) // POINT.size
+
+    @staticmethod
+    def _point(points, number: int) -> Tuple:
+        return POINT.unpack_from(points, HEADER.size + number * POINT.size)
+
+    @staticmethod
+    def _search(points, count: int, timestamp: float) -> int:
+        """Primeiro ponto com data >= `timestamp` (os pontos estão em ordem de data)"""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from('<d', points, HEADER.size + middle * POINT.size)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def trend(self, domain: str, bucket: str = 'day', since: Optional[float] = None,
+              until: Optional[float] = None) -> Dict:
+        """Agregados do histórico por período (dia, semana ISO ou mês, em UTC)
+
+        Por período: número de análises, os valores da última (e a variação
+        em relação ao período anterior), mínimo e máximo de domínios de
+        referência, a distribuição de ranks em % e a deriva em relação ao
+        período anterior (distância de variação total, 0-100), e quantos
+        backlinks entre os de maior rank apareceram pela primeira vez (pelo
+        primeiro ponto gravado em cada link, sem ler os pontos anteriores).
+        `latest` traz o ponto mais recente, com as âncoras e os backlinks.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Período inválido: {bucket} (use {', '.join(BUCKETS)})")
+        with ExitStack() as stack:
+            points = _map(self._path(domain, 'points.bin'), stack)
+            links = _map(self._path(domain, 'links.bin'), stack)
+            total = self._count(points)
+            first = self._search(points, total, since) if since is not None else 0
+            last = self._search(points, total, until) if until is not None else total
+
+            buckets = []
+            current = None
+            previous = None
+            for number in range(first, last):
+                record = self._point(points, number)
+                label = _bucket_label(record[_TIMESTAMP], bucket)
+                if current is None or current['bucket'] != label:
+                    if current is not None:
+                        previous = self._close_bucket(current, previous)
+                        buckets.append(current)
+                    current = {'bucket': label, 'snapshots': 0, 'first_at': record[_TIMESTAMP],
+                               'referring_domains_range': [record[_REFERRING], record[_REFERRING]],
+                               'new_top_links': 0}
+                current['snapshots'] += 1
+                current['last'] = record
+                low, high = current['referring_domains_range']
+                current['referring_domains_range'] = [min(low, record[_REFERRING]), max(high, record[_REFERRING])]
+                current['new_top_links'] += self._new_links(links, number, *record[_LINKS])
+            if current is not None:
+                self._close_bucket(current, previous)
+                buckets.append(current)
+
+            latest = None
+            if total:
+                latest = self._describe(self._point(points, total - 1), domain, links, stack)
+            return {
+                'success': True,
+                'domain': domain,
+                'bucket': bucket,
+                'points': total,
+                'points_in_range': last - first,
+                'buckets': buckets,
+                'latest': latest
+            }
+
+    @staticmethod
+    def _new_links(links, number: int, start: int, count: int) -> int:
+        """Pares (url_from, url_to) distintos do ponto `number` que aparecem nele pela primeira vez"""
+        keys = set()
+        for offset in range(start * LINK.size, (start + count) * LINK.size, LINK.size):
+            url_from, url_to, _, _, _, first = LINK.unpack_from(links, offset)
+            if first == number:
+                keys.add(url_from << 32 | url_to)
+        return len(keys)
+
+    @staticmethod
+    def _close_bucket(current: Dict, previous: Optional[Dict]) -> Dict:
+        """Converte o último ponto do período em valores, variações e deriva de ranks"""
+        record = current.pop('last')
+        values = dict(zip(METRICS, record[1:8]))
+        values['avg_domain_rank'] = round(values['avg_domain_rank'], 2)
+        buckets = record[_BUCKETS]
+        total = sum(buckets)
+        shares = {name: round(count * 100 / total, 2) if total else 0.0
+                  for name, count in zip(RANK_BUCKETS, buckets)}
+        current['first_at'] = _iso(current['first_at'])
+        current['last_at'] = _iso(record[_TIMESTAMP])
+        current['partial'] = bool(record[_FLAGS] & (FLAG_PARTIAL | FLAG_HAS_MORE))
+        current['metrics'] = values
+        current['changes'] = None
+        current['rank_distribution'] = shares
+        current['rank_drift'] = None
+        if previous is not None:
+            current['changes'] = {name: round(values[name] - previous['metrics'][name], 2) for name in METRICS}
+            current['rank_drift'] = round(sum(abs(shares[name] - previous['rank_distribution'][name])
+                                              for name in RANK_BUCKETS) / 2, 2)
+        return current
+
+    def _describe(self, record: Tuple, domain: str, links, stack: ExitStack) -> Dict:
+        """Ponto completo, com os textos das âncoras e dos backlinks"""
+        index = _map(self._path(domain, 'strings.idx'), stack)
+        data = _map(self._path(domain, 'strings.bin'), stack)
+        anchors = _map(self._path(domain, 'anchors.bin'), stack)
+
+        def text(number: int) -> Optional[str]:
+            if number == MISSING:
+                return None
+            offset, length = STRING.unpack_from(index, number * STRING.size)
+            return bytes(data[offset:offset + length]).decode('utf-8')
+
+        def rows(layout: struct.Struct, buffer, start: int, count: int):
+            return [layout.unpack_from(buffer, offset)
+                    for offset in range(start * layout.size, (start + count) * layout.size, layout.size)]
+
+        point = {'at': _iso(record[_TIMESTAMP])}
+        point.update(zip(METRICS, record[1:8]))
+        point.update({
+            'max_domain_rank': record[8],
+            'min_domain_rank': record[9],
+            'domain_rank_percentiles': dict(zip(PERCENTILES, record[10:15])),
+            'partial': bool(record[_FLAGS] & FLAG_PARTIAL),
+            'has_more': bool(record[_FLAGS] & FLAG_HAS_MORE),
+            'incremental': bool(record[_FLAGS] & FLAG_INCREMENTAL),
+            'pages_fetched': record[16],
+            'domain_rank_histogram': dict(zip(RANK_BUCKETS, record[_BUCKETS])),
+            'top_anchors': [{'anchor': text(anchor), 'count': count}
+                            for anchor, count in rows(ANCHOR, anchors, *record[_ANCHORS])],
+            'top_links': [{'url_from': text(url_from), 'url_to': text(url_to), 'anchor': text(anchor),
+                           'domain_inlink_rank': rank, 'nofollow': bool(nofollow)}
+                          for url_from, url_to, anchor, rank, nofollow, _ in rows(LINK, links, *record[_LINKS])]
+        })
+        return point
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_history() -> Optional[HistoryStore]:
+    """Retorna o histórico único do processo, ou None se desativado"""
+    global _shared_store
+    if os.getenv('BACKLINKS_HISTORY', 'on').lower() in ('off', '0', 'false'):
+        return None
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = HistoryStore.from_env()
+    return _shared_store
+
+
+def record_history(result: Dict, incremental: bool = False):
+    """Acrescenta uma análise bem-sucedida ao histórico (falhas de disco só são avisadas)"""
+    store = get_shared_history()
+    if store is None or not result.get('success'):
+        return
+    try:
+        store.append(result, incremental=incremental)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Histórico indisponível: {e}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Extração rápida de hosts e agrupamento por domínio registrável
+
+`extract_host` substitui `urlparse(url).netloc` no caminho quente da
+agregação: um scanner simples localiza a autoridade da URL e o resultado é
+memoizado por prefixo (esquema + autoridade), que se repete muito nos perfis
+de backlinks (várias páginas do mesmo site).
+
+`registrable_domain` agrupa hosts pelo domínio registrável (eTLD+1), usando a
+Public Suffix List completa em `data/public_suffix_list.dat` (seções ICANN e
+PRIVATE, cópia sem alterações de https://publicsuffix.org/list/; para
+atualizar, basta substituir o arquivo), ex.: `blog.exemplo.com.br` ->
+`exemplo.com.br` e `usuario.github.io` -> `usuario.github.io`. As regras com
+rótulos internacionalizados valem também na forma punycode (`xn--`), que é a
+das URLs.
+"""
+
+import os
+from encodings.idna import ToASCII
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+PUBLIC_SUFFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'data', 'public_suffix_list.dat')
+
+# Limite de entradas da memoização de prefixos (esvaziada ao atingir)
+HOST_CACHE_SIZE = 65536
+
+_host_cache = {}
+
+
+def extract_host(url: str) -> str:
+    """Host de uma URL, em minúsculas e sem porta, usuário ou ponto final
+
+    Aceita URLs com ou sem esquema ('https://a.com/x', '//a.com', 'a.com/x').
+    Retorna '' quando não há host.
+    """
+    start = url.find('://')
+    if start != -1 and url.find('/', 0, start) == -1:
+        start += 3
+    else:
+        start = 2 if url.startswith('//') else 0
+
+    # A autoridade termina no primeiro '/', '?' ou '#'
+    end = len(url)
+    for separator in '/?#':
+        position = url.find(separator, start, end)
+        if position != -1:
+            end = position
+
+    prefix = url[:end]
+    host = _host_cache.get(prefix)
+    if host is None:
+        host = _clean_authority(url[start:end])
+        if len(_host_cache) >= HOST_CACHE_SIZE:
+            _host_cache.clear()
+        _host_cache[prefix] = host
+    return host
+
+
+def _clean_authority(authority: str) -> str:
+    """Remove credenciais e porta da autoridade e normaliza o host"""
+    at = authority.rfind('@')
+    if at != -1:
+        authority = authority[at + 1:]
+
+    if authority.startswith('['):
+        # IPv6: [::1]:8080
+        close = authority.find(']')
+        return authority[:close + 1].lower() if close != -1 else ''
+
+    colon = authority.find(':')
+    if colon != -1:
+        authority = authority[:colon]
+    return authority.rstrip('.').lower()
+
+
+def _punycode(rule: str) -> Optional[str]:
+    """Regra com rótulos internacionalizados na forma ASCII (`xn--`), ou None"""
+    if rule.isascii():
+        return None
+    try:
+        return '.'.join(ToASCII(label).decode('ascii') for label in rule.split('.'))
+    except UnicodeError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_public_suffixes(path: str = PUBLIC_SUFFIX_FILE) -> Tuple[frozenset, frozenset, frozenset]:
+    """Lê as regras da Public Suffix List: (normais, curingas, exceções)"""
+    rules, wildcards, exceptions = set(), set(), set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            rule = line.strip().split(' ', 1)[0]
+            if not rule or rule.startswith('//'):
+                continue
+            if rule.startswith('!'):
+                target, rule = exceptions, rule[1:]
+            elif rule.startswith('*.'):
+                target, rule = wildcards, rule[2:]
+            else:
+                target = rules
+            target.add(rule)
+            ascii_rule = _punycode(rule)
+            if ascii_rule:
+                target.add(ascii_rule)
+    return frozenset(rules), frozenset(wildcards), frozenset(exceptions)
+
+
+@lru_cache(maxsize=HOST_CACHE_SIZE)
+def public_suffix(host: str) -> Optional[str]:
+    """Sufixo público (eTLD) mais longo do host, ex.: 'com.br' ou 'github.io'"""
+    if not host or host.startswith('['):
+        return None
+    rules, wildcards, exceptions = _load_public_suffixes()
+
+    labels = host.split('.')
+    for index in range(len(labels)):
+        candidate = '.'.join(labels[index:])
+        if candidate in exceptions:
+            return '.'.join(labels[index + 1:])
+        if candidate in rules:
+            return candidate
+        parent = '.'.join(labels[index + 1:])
+        if index + 1 < len(labels) and parent in wildcards:
+            return candidate
+    # Regra padrão da PSL: o último rótulo é um sufixo público
+    return labels[-1]
+
+
+@lru_cache(maxsize=HOST_CACHE_SIZE)
+def registrable_domain(host: str) -> str:
+    """Domínio registrável (eTLD+1) do host; o próprio host se não houver"""
+    suffix = public_suffix(host)
+    if not suffix or suffix == host:
+        return host
+    label = host[:-len(suffix) - 1].rsplit('.', 1)[-1]
+    return f"{label}.{suffix}"
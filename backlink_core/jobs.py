@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Fila de análises em segundo plano (SQLite), para perfis grandes demais para
+uma requisição síncrona
+
+`JobQueue` guarda os jobs e, a cada página processada, um checkpoint com o
+cursor `next`, os contadores e o estado do BacklinkStats. Um worker renova
+a concessão (lease) do job a cada checkpoint; se ele morrer, outro worker
+assume o job depois de BACKLINKS_JOB_LEASE segundos e retoma a partir do
+último cursor, sem reprocessar as páginas já contadas.
+
+`JobWorkerPool` executa os jobs em threads; vários processos (ex.:
+`backlink_checker.py --jobs-worker`) podem consumir a mesma fila.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, Optional
+
+from .aggregation import BacklinkStats
+from .backlink_table import BacklinkTable
+from .client import BacklinkAPIError, analysis_result, feed_page
+from .response_cache import CACHE_USE
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class JobQueue:
+    """Fila de jobs em SQLite, segura entre threads e entre processos"""
+
+    def __init__(self, path: str, lease: float = 120.0, max_attempts: int = 3):
+        import sqlite3
+
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # O timeout cobre a espera pelo lock de escrita de outro processo
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        try:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                cache_mode TEXT NOT NULL,
+                max_rows INTEGER NOT NULL,
+                max_pages INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                heartbeat REAL,
+                worker TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                cursor TEXT,
+                pages INTEGER NOT NULL DEFAULT 0,
+                rows INTEGER NOT NULL DEFAULT 0,
+                has_more INTEGER NOT NULL DEFAULT 0,
+                stats BLOB,
+                result TEXT,
+                error TEXT
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+
+    @classmethod
+    def from_env(cls) -> 'JobQueue':
+        """Cria a fila a partir das variáveis de ambiente"""
+        default_path = os.path.join(tempfile.gettempdir(), 'backlinks_jobs.sqlite3')
+        return cls(
+            path=os.getenv('BACKLINKS_JOBS_PATH', default_path),
+            lease=float(os.getenv('BACKLINKS_JOB_LEASE', '120')),
+            max_attempts=int(os.getenv('BACKLINKS_JOB_MAX_ATTEMPTS', '3'))
+        )
+
+    def submit(self, domain: str, max_rows: int, max_pages: int, cache_mode: str = CACHE_USE) -> Dict:
+        """Enfileira a análise do domínio
+
+        Se já houver um job ativo (na fila ou em execução) para o domínio, ele
+        é retornado em vez de criar outro.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT id FROM jobs WHERE domain = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1',
+                    (domain, JOB_QUEUED, JOB_RUNNING)
+                ).fetchone()
+                if row:
+                    job_id = row[0]
+                else:
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        'INSERT INTO jobs (id, domain, cache_mode, max_rows, max_pages, status, created_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (job_id, domain, cache_mode, max_rows, max_pages, JOB_QUEUED, time.time())
+                    )
+            finally:
+                self._conn.execute('COMMIT')
+        return self.get(job_id)
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Reserva o próximo job: um da fila ou um cujo worker parou de renovar a concessão"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Jobs abandonados que já esgotaram as tentativas falham
+                self._conn.execute(
+                    'UPDATE jobs SET status = ?, finished_at = ?, error = ? '
+                    'WHERE status = ? AND heartbeat < ? AND attempts >= ?',
+                    (JOB_FAILED, now, 'Worker interrompido repetidamente', JOB_RUNNING,
+                     now - self.lease, self.max_attempts)
+                )
+                row = self._conn.execute(
+                    'SELECT id FROM jobs WHERE status = ? OR (status = ? AND heartbeat < ?) '
+                    'ORDER BY created_at LIMIT 1',
+                    (JOB_QUEUED, JOB_RUNNING, now - self.lease)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    'UPDATE jobs SET status = ?, worker = ?, heartbeat = ?, attempts = attempts + 1, '
+                    'started_at = COALESCE(started_at, ?) WHERE id = ?',
+                    (JOB_RUNNING, worker, now, now, row[0])
+                )
+            finally:
+                self._conn.execute('COMMIT')
+        return self._load(row[0], with_stats=True)
+
+    def checkpoint(self, job_id: str, worker: str, cursor: Optional[str], pages: int, rows: int,
+                   has_more: bool, stats: BacklinkStats) -> bool:
+        """Grava o progresso após uma página; False se o job foi assumido por outro worker"""
+        blob = zlib.compress(json.dumps(stats.to_state(), ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            updated = self._conn.execute(
+                'UPDATE jobs SET cursor = ?, pages = ?, rows = ?, has_more = ?, stats = ?, heartbeat = ? '
+                'WHERE id = ? AND worker = ? AND status = ?',
+                (cursor, pages, rows, int(has_more), blob, time.time(), job_id, worker, JOB_RUNNING)
+            ).rowcount
+        return bool(updated)
+
+    def finish(self, job_id: str, worker: str, result: Dict) -> bool:
+        """Conclui o job com o resultado da análise"""
+        return self._close(job_id, worker, JOB_DONE, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Encerra o job com erro (o progresso parcial continua disponível)"""
+        return self._close(job_id, worker, JOB_FAILED, error=error)
+
+    def _close(self, job_id: str, worker: str, status: str, result: Optional[str] = None,
+               error: Optional[str] = None) -> bool:
+        with self._lock:
+            updated = self._conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? '
+                'WHERE id = ? AND worker = ? AND status = ?',
+                (status, result, error, time.time(), job_id, worker, JOB_RUNNING)
+            ).rowcount
+        return bool(updated)
+
+    def _load(self, job_id: str, with_stats: bool = False) -> Optional[Dict]:
+        with self._lock:
+            cursor = self._conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        if row is None:
+            return None
+        job = dict(zip(columns, row))
+        job['has_more'] = bool(job['has_more'])
+        stats = job.pop('stats')
+        if with_stats:
+            job['stats'] = BacklinkStats.from_state(json.loads(zlib.decompress(stats))) if stats else None
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Situação do job: progresso, estimativa de término e resumo (parcial ou final)"""
+        job = self._load(job_id, with_stats=True)
+        if job is None:
+            return None
+        stats = job.pop('stats')
+        result = job.pop('result')
+
+        now = time.time()
+        elapsed = ((job['finished_at'] or now) - job['started_at']) if job['started_at'] else 0.0
+        view = {
+            'job_id': job['id'],
+            'domain': job['domain'],
+            'status': job['status'],
+            'pages_fetched': job['pages'],
+            'rows_processed': job['rows'],
+            'attempts': job['attempts'],
+            'elapsed_s': round(elapsed, 1),
+            'eta_s': self._eta(job, elapsed),
+            'error': job['error']
+        }
+        if result:
+            view['result'] = json.loads(result)
+        elif stats is not None:
+            view['partial'] = stats.summary()
+        return view
+
+    @staticmethod
+    def _eta(job: Dict, elapsed: float) -> Optional[float]:
+        """Tempo restante estimado pela vazão até aqui e pelo orçamento de linhas/páginas
+
+        Sem orçamento (0 = sem limite) o tamanho do perfil é desconhecido e
+        não há estimativa.
+        """
+        if job['status'] != JOB_RUNNING or not job['rows'] or not elapsed:
+            return 0.0 if job['status'] in (JOB_DONE, JOB_FAILED) else None
+        remaining = []
+        if job['max_rows']:
+            remaining.append((job['max_rows'] - job['rows']) * elapsed / job['rows'])
+        if job['max_pages']:
+            remaining.append((job['max_pages'] - job['pages']) * elapsed / job['pages'])
+        return round(max(0.0, min(remaining)), 1) if remaining else None
+
+
+def run_job(client, queue: JobQueue, job: Dict, worker: str, build_table: bool = False) -> Optional[Dict]:
+    """Executa (ou retoma) um job reservado com `JobQueue.claim`
+
+    O checkpoint de cada página é gravado quando a página seguinte chega, já
+    com o cursor conhecido também no modo streaming. Com `build_table=True`
+    e um job iniciado do zero, o resultado traz a `backlinks_table`.
+    Retorna o resultado, ou None se o job falhou ou foi assumido por outro
+    worker.
+    """
+    from .history import record_history
+
+    domain = job['domain']
+    stats = job['stats'] or BacklinkStats()
+    resumed = job['pages'] > 0
+    table = BacklinkTable() if build_table and not resumed else None
+    pages, rows = job['pages'], job['rows']
+    has_more = job['has_more']
+    max_rows, max_pages = job['max_rows'], job['max_pages']
+
+    def budget_left() -> bool:
+        return not ((max_rows and rows >= max_rows) or (max_pages and pages >= max_pages))
+
+    def save(page: Dict) -> bool:
+        return queue.checkpoint(job['id'], worker, page['next'], pages, rows, page['has_more'], stats)
+
+    if not resumed or (job['cursor'] and budget_left()):
+        pending = None
+        try:
+            for page in client.iter_backlinks(
+                    domain, cache_mode=job['cache_mode'], cursor=job['cursor'],
+                    max_rows=max_rows - rows if max_rows else 0,
+                    max_pages=max_pages - pages if max_pages else 0):
+                if pending is not None and not save(pending):
+                    return None
+                rows += feed_page(page['backlinks'], stats, table)
+                pages += 1
+                pending = page
+            if pending is not None:
+                has_more = pending['has_more']
+                if not save(pending):
+                    return None
+        except (BacklinkAPIError, ValueError) as e:
+            queue.fail(job['id'], worker, str(e))
+            return None
+
+    result = analysis_result(domain, stats, table, has_more, pages)
+    stored = {key: value for key, value in result.items() if key != 'backlinks_table'}
+    if not queue.finish(job['id'], worker, stored):
+        return None
+    record_history(result)
+    return result
+
+
+class JobWorkerPool:
+    """Threads que consomem a fila de jobs
+
+    `on_complete(resultado)` é chamado a cada job concluído (ex.: para guardar
+    o resultado no cache da aplicação web).
+    """
+
+    def __init__(self, client, queue: JobQueue, workers: int = 2, poll_interval: float = 1.0,
+                 build_table: bool = False, on_complete: Optional[Callable[[Dict], None]] = None):
+        self.client = client
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.build_table = build_table
+        self.on_complete = on_complete
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self) -> 'JobWorkerPool':
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(f"{self._prefix}:{index}",),
+                                      name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def notify(self):
+        """Acorda as threads ociosas (ex.: logo após enfileirar um job)"""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Pede às threads que parem após o job atual e aguarda"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self, worker: str):
+        while not self._stop.is_set():
+            job = self.queue.claim(worker)
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            try:
+                result = run_job(self.client, self.queue, job, worker, build_table=self.build_table)
+            except Exception as e:
+                self.queue.fail(job['id'], worker, f"Erro inesperado: {e}")
+                continue
+            if result is not None and self.on_complete:
+                self.on_complete(result)
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_queue() -> JobQueue:
+    """Retorna a fila de jobs única do processo"""
+    global _shared_queue
+    if _shared_queue is None:
+        with _shared_lock:
+            if _shared_queue is None:
+                _shared_queue = JobQueue.from_env()
+    return _shared_queue
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Decodificação incremental de respostas JSON grandes
+
+`JSONArrayStream` lê o corpo da resposta em pedaços (ex.: `iter_content` de
+uma requisição com `stream=True`) e entrega, um a um, os itens do array de
+nível superior indicado (por padrão `backlinks`), sem montar o documento
+inteiro em memória. Os demais campos de nível superior (ex.: o cursor `next`)
+ficam em `fields` ao final da leitura.
+
+Cada item é decodificado pelo `json.JSONDecoder.raw_decode` (scanner em C);
+só o trecho ainda não consumido do corpo fica no buffer.
+"""
+
+import codecs
+import json
+import zlib
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List
+
+
+WHITESPACE = ' \t\n\r'
+
+# Tamanho dos pedaços lidos da resposta HTTP
+CHUNK_SIZE = 64 * 1024
+
+# Descarta o trecho já consumido do buffer ao passar deste tamanho
+_COMPACT_AT = 256 * 1024
+
+
+class JSONArrayStream:
+    """Itera os itens de `document[array_key]` a partir de pedaços de bytes"""
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str = 'backlinks'):
+        self.array_key = array_key
+        self.fields = {}
+        self.count = 0
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._exhausted = False
+        self._items = self._parse()
+
+    def __iter__(self) -> Iterator:
+        return self._items
+
+    def finish(self) -> Dict:
+        """Consome o restante do documento e retorna os demais campos"""
+        for _ in self._items:
+            pass
+        return self.fields
+
+    # Leitura do buffer
+
+    def _read_more(self) -> bool:
+        """Acrescenta o próximo pedaço ao buffer; False se o corpo acabou"""
+        if self._exhausted:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            self._buffer += self._text.decode(b'', final=True)
+            return False
+
+        if self._pos > _COMPACT_AT:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += self._text.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Próximo caractere significativo (sem consumir); '' no fim do corpo"""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._read_more():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Esperado '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _value(self):
+        """Decodifica o próximo valor JSON completo do buffer"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            # Um número no fim do buffer pode continuar no próximo pedaço
+            if end == len(self._buffer) and not self._exhausted:
+                if self._read_more():
+                    continue
+            self._pos = end
+            return value
+
+    # Estrutura do documento
+
+    def _parse(self) -> Iterator:
+        self._expect('{')
+        first = True
+        while True:
+            if self._peek() == '}':
+                self._pos += 1
+                self._end()
+                return
+            if not first:
+                self._expect(',')
+            first = False
+
+            key = self._value()
+            self._expect(':')
+            if key == self.array_key and self._peek() == '[':
+                yield from self._array_items()
+            else:
+                self.fields[key] = self._value()
+
+    def _end(self):
+        """Lê o corpo até o fim (libera a conexão e fecha o `tee_compressed`)"""
+        if self._peek():
+            raise json.JSONDecodeError("Dados extras após o documento", self._buffer, self._pos)
+
+    def _array_items(self) -> Iterator:
+        self._expect('[')
+        first = True
+        while True:
+            if self._peek() == ']':
+                self._pos += 1
+                return
+            if not first:
+                self._expect(',')
+            first = False
+            self.count += 1
+            yield self._value()
+
+
+def tee_compressed(chunks: Iterable[bytes], on_complete: Callable[[bytes], None],
+                   level: int = 6) -> Iterator[bytes]:
+    """Repassa os pedaços e, ao final, entrega o corpo inteiro comprimido (zlib)
+
+    Usado para gravar no cache de respostas durante a leitura em streaming,
+    sem manter o corpo descomprimido em memória.
+    """
+    compressor = zlib.compressobj(level)
+    parts = []
+    for chunk in chunks:
+        parts.append(compressor.compress(chunk))
+        yield chunk
+    parts.append(compressor.flush())
+    on_complete(b''.join(parts))
+
+
+def scan_field(body: bytes, key: str = 'next'):
+    """Valor do campo `key` de um documento JSON sem decodificar o documento
+
+    Procura a última ocorrência de `"key":` nos bytes e decodifica só o
+    valor. Dentro de strings JSON as aspas são escapadas, então a chave só
+    casa com um campo de verdade; pressupõe que os itens do documento (ex.:
+    os backlinks) não têm um campo com o mesmo nome. Retorna None se o campo
+    não existir.
+    """
+    needle = b'"' + key.encode('utf-8') + b'"'
+    end = len(body)
+    while True:
+        start = body.rfind(needle, 0, end)
+        if start < 0:
+            return None
+        colon = start + len(needle)
+        while colon < len(body) and body[colon] in b' \t\n\r':
+            colon += 1
+        if colon < len(body) and body[colon] == ord(':'):
+            text = body[colon + 1:].decode('utf-8', 'replace')
+            value, _ = json.JSONDecoder().raw_decode(text, len(text) - len(text.lstrip(WHITESPACE)))
+            return value
+        end = start
+
+
+def iter_batches(rows: Iterable, size: int = 1000) -> Iterator[List]:
+    """Agrupa as linhas em listas de até `size` itens (uma lista é repassada inteira)"""
+    if isinstance(rows, list):
+        if rows:
+            yield rows
+        return
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Comparação de perfis entre vários domínios (link gap e sobreposição)
+
+Os perfis são buscados em paralelo e cada um vira o conjunto de domínios de
+referência do seu BacklinkStats (por domínio registrável, eTLD+1, ou por
+host). Cada domínio de referência recebe uma máscara de bits com os perfis
+em que aparece; todas as operações saem dessas máscaras:
+
+- gap: domínios que linkam para pelo menos `min_competitors` concorrentes e
+  não para o alvo
+- únicos: domínios presentes em um único perfil
+- comuns: domínios presentes em todos os perfis
+- matriz de sobreposição (interseções par a par) e índice de Jaccard
+
+As listas trazem até `limit` domínios, os de maior contagem primeiro.
+"""
+
+import heapq
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .aggregation import BacklinkStats
+
+LEVELS = ('registrable', 'host')
+
+
+def profile_domains(stats: BacklinkStats, level: str = 'registrable') -> Set[str]:
+    """Domínios de referência do perfil: registráveis (eTLD+1) ou hosts"""
+    if level not in LEVELS:
+        raise ValueError(f"Nível inválido: {level} (use {', '.join(LEVELS)})")
+    return stats.registrable_domains() if level == 'registrable' else set(stats.referring_domains)
+
+
+def fetch_profiles(client, domains: Iterable[str], workers: int = 8,
+                   cache_mode: Optional[str] = None) -> Dict[str, Tuple[Dict, Optional[BacklinkStats]]]:
+    """Analisa os domínios em paralelo; retorna {domínio: (resultado, BacklinkStats)}
+
+    Todas as threads compartilham o cliente (pool de conexões e limitador).
+    O BacklinkStats é None quando a análise falha.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def analyze(domain: str) -> Tuple[Dict, Optional[BacklinkStats]]:
+        stats = BacklinkStats()
+        result = None
+        for event in client.iter_analysis(domain, cache_mode=cache_mode, build_table=False):
+            if event['event'] == 'page':
+                stats = event['stats']
+            else:
+                result = event['result']
+        return result, stats if result['success'] else None
+
+    domains = list(dict.fromkeys(client.normalize_domain(domain) for domain in domains))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(domains)))) as executor:
+        return dict(zip(domains, executor.map(analyze, domains)))
+
+
+def _top(candidates: Dict[int, List[str]], limit: int) -> List[Tuple[str, int]]:
+    """Até `limit` (domínio, contagem), por contagem decrescente e nome"""
+    top = []
+    for count in sorted(candidates, reverse=True):
+        if len(top) >= limit:
+            break
+        for domain in heapq.nsmallest(limit - len(top), candidates[count]):
+            top.append((domain, count))
+    return top
+
+
+def membership_masks(sets: List[Set[str]]) -> Dict[str, int]:
+    """{domínio: máscara de bits dos perfis (bit i = presente em sets[i])}"""
+    masks = {}
+    get = masks.get
+    for index, domains in enumerate(sets):
+        bit = 1 << index
+        for domain in domains:
+            masks[domain] = get(domain, 0) | bit
+    return masks
+
+
+def compare_profiles(profiles: Dict[str, Set[str]], target: Optional[str] = None,
+                     min_competitors: int = 1, limit: int = 100) -> Dict:
+    """Sobreposição entre os perfis e, com `target`, o link gap do alvo
+
+    `profiles` mapeia cada domínio analisado ao seu conjunto de domínios de
+    referência; os demais perfis são os concorrentes do `target`.
+    """
+    started = time.perf_counter()
+    names = list(profiles)
+    if target is not None and target not in profiles:
+        raise ValueError(f"O alvo {target} não está entre os perfis comparados")
+    sets = [profiles[name] for name in names]
+    bits = [1 << index for index in range(len(names))]
+
+    # Uma única passada pelos domínios; o resto sai das máscaras distintas,
+    # bem menos numerosas que os domínios (perfis de nicho se repetem)
+    masks = membership_masks(sets)
+    groups = Counter(masks.values())
+    members = {mask: [index for index, bit in enumerate(bits) if mask & bit] for mask in groups}
+
+    overlap = [[0] * len(names) for _ in names]
+    for mask, count in groups.items():
+        for i in members[mask]:
+            row = overlap[i]
+            for j in members[mask]:
+                row[j] += count
+    jaccard = [[0.0] * len(names) for _ in names]
+    for i in range(len(names)):
+        for j in range(len(names)):
+            union = overlap[i][i] + overlap[j][j] - overlap[i][j]
+            jaccard[i][j] = round(overlap[i][j] / union, 4) if union else 0.0
+
+    everyone = (1 << len(names)) - 1
+    single = {bit: index for index, bit in enumerate(bits)}
+    # Máscaras do gap: fora do alvo e em pelo menos `min_competitors` perfis
+    gap_masks = set()
+    if target is not None:
+        ours = bits[names.index(target)]
+        gap_masks = {mask for mask in groups if not mask & ours and len(members[mask]) >= min_competitors}
+
+    unique = [[] for _ in names]
+    common = []
+    candidates = {}
+    for domain, mask in masks.items():
+        if mask in single:
+            unique[single[mask]].append(domain)
+        if mask == everyone:
+            common.append(domain)
+        if mask in gap_masks:
+            candidates.setdefault(len(members[mask]), []).append(domain)
+
+    comparison = {
+        'domains': names,
+        'referring_domains': {name: len(domains) for name, domains in zip(names, sets)},
+        'union': len(masks),
+        'common_to_all': {'count': len(common), 'domains': heapq.nsmallest(limit, common)},
+        'unique': {name: {'count': len(domains), 'domains': heapq.nsmallest(limit, domains)}
+                   for name, domains in zip(names, unique)},
+        'overlap': {'domains': names, 'shared': overlap, 'jaccard': jaccard}
+    }
+
+    if target is not None:
+        comparison['gap'] = {
+            'target': target,
+            'competitors': [name for name in names if name != target],
+            'min_competitors': min_competitors,
+            'count': sum(groups[mask] for mask in gap_masks),
+            'domains': [{'domain': domain, 'competitors': [names[index] for index in members[masks[domain]]],
+                         'count': count}
+                        for domain, count in _top(candidates, limit)]
+        }
+
+    comparison['compute_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return comparison
+
+
+def link_gap(client, target: str, competitors: List[str], min_competitors: int = 1,
+             level: str = 'registrable', limit: int = 100, workers: int = 8,
+             cache_mode: Optional[str] = None) -> Dict:
+    """Busca os perfis do alvo e dos concorrentes e compara (ver `compare_profiles`)
+
+    Perfis cuja análise falhou ficam fora da comparação e aparecem em
+    `errors`; uma falha no alvo resulta em `success=False`. Levanta
+    ValueError se `min_competitors` não estiver entre 1 e o número de
+    concorrentes (o valor nunca é ajustado em silêncio).
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Nível inválido: {level} (use {', '.join(LEVELS)})")
+    target = client.normalize_domain(target)
+    competitors = [domain for domain in dict.fromkeys(client.normalize_domain(d) for d in competitors)
+                   if domain != target]
+    if not competitors:
+        raise ValueError('Informe pelo menos um concorrente diferente do alvo')
+    if not 1 <= min_competitors <= len(competitors):
+        raise ValueError(f"min_competitors deve estar entre 1 e {len(competitors)} "
+                         f"(número de concorrentes), recebido: {min_competitors}")
+
+    started = time.perf_counter()
+    fetched = fetch_profiles(client, [target, *competitors], workers=workers, cache_mode=cache_mode)
+    fetch_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    errors = {domain: result.get('error') for domain, (result, stats) in fetched.items() if stats is None}
+    if target in errors:
+        return {'success': False, 'domain': target, 'error': errors[target], 'errors': errors}
+
+    profiles = {domain: profile_domains(stats, level)
+                for domain, (result, stats) in fetched.items() if stats is not None}
+    comparison = compare_profiles(profiles, target=target, min_competitors=min_competitors, limit=limit)
+    comparison.update({
+        'success': True,
+        'level': level,
+        # Perfis comparados sem todos os backlinks (limite de linhas ou falha no meio)
+        'incomplete': [domain for domain, (result, stats) in fetched.items()
+                       if stats is not None and (result['partial'] or result['has_more'])],
+        'errors': errors,
+        'fetch_ms': fetch_ms
+    })
+    return comparison
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Métricas do processo: contadores e histogramas de latência por etapa
+
+As etapas do caminho quente (chamada à API, decodificação do JSON,
+agregação, formatação e serialização da resposta, compressão) são medidas
+com `metrics.measure('etapa')` e acumuladas em histogramas de buckets fixos;
+os contadores somam chamadas à API, bytes, linhas e erros por tipo.
+`render()` gera o formato de texto do Prometheus (servido em /metrics pela
+aplicação web), acrescentando os contadores que outros componentes já
+mantêm (caches, limitador), e `summary()`, o resumo exibido pela CLI com
+`--stats`.
+
+Sem dependências: o custo por medição é um `perf_counter`, uma busca binária
+nos buckets e um lock.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+PREFIX = 'backlinks_'
+
+# Limites superiores dos buckets, em segundos
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Descrição (HELP) das métricas conhecidas
+DESCRIPTIONS = {
+    'stage_seconds': 'Duração das etapas do processamento (upstream, decode, aggregate, format, serialize, compress)',
+    'request_seconds': 'Duração das requisições da aplicação web por endpoint',
+    'upstream_requests_total': 'Chamadas à API da SE Ranking por status HTTP',
+    'upstream_bytes_total': 'Bytes recebidos da API da SE Ranking',
+    'rows_total': 'Backlinks processados',
+    'errors_total': 'Erros por tipo',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Histogram:
+    """Contagens por bucket (não cumulativas), soma e total de observações"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """Registro de contadores e histogramas, seguro para uso entre threads"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._recording = threading.local()
+        # Blocos `record_stages` abertos (em qualquer thread); 0 = sem custo em `observe`
+        self._recorders = 0
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Soma `value` ao contador `name` (sufixo `_total` incluído no nome)"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Registra uma duração no histograma `name`"""
+        if self._recorders and name == 'stage_seconds':
+            stages = getattr(self._recording, 'stages', None)
+            if stages is not None:
+                total = stages.setdefault(labels['stage'], [0, 0.0])
+                total[0] += 1
+                total[1] += seconds
+        key = _labels(labels)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Mede o bloco como a etapa `stage` (histograma `stage_seconds`)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - started, stage=stage)
+
+    @contextmanager
+    def record_stages(self) -> Iterator[Dict[str, list]]:
+        """Acumula também à parte as etapas medidas nesta thread durante o bloco
+
+        Entrega um dicionário {etapa: [chamadas, segundos]}, preenchido à
+        medida que as etapas são medidas (ex.: uma requisição perfilada).
+        """
+        stages = {}
+        previous = getattr(self._recording, 'stages', None)
+        self._recording.stages = stages
+        with self._lock:
+            self._recorders += 1
+        try:
+            yield stages
+        finally:
+            with self._lock:
+                self._recorders -= 1
+            self._recording.stages = previous
+
+    def stage_totals(self) -> Dict[str, Tuple[int, float]]:
+        """Chamadas e segundos acumulados por etapa (histograma `stage_seconds`)"""
+        with self._lock:
+            series = self._histograms.get('stage_seconds', {})
+            return {dict(key).get('stage', ''): (histogram.count, histogram.sum)
+                    for key, histogram in series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self, collected: Iterable[Tuple[str, str, str, Iterable[Tuple[Dict, float]]]] = ()) -> str:
+        """Formato de texto do Prometheus (versão 0.0.4)
+
+        `collected` acrescenta métricas lidas na hora, como tuplas (nome,
+        tipo, descrição, [(rótulos, valor), ...]); ex.: os acertos de cache.
+        """
+        lines = []
+        for name, kind, description, samples in collected:
+            full = PREFIX + name
+            lines.append(f"# HELP {full} {description}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in samples:
+                lines.append(f"{full}{_format_labels(_labels(labels))} {_format_value(value)}")
+        with self._lock:
+            for name in sorted(self._counters):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _format_value(bound)
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {_format_value(round(histogram.sum, 6))}")
+                    lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def _quantile_ms(self, histogram: _Histogram, q: float) -> Optional[float]:
+        """Estimativa do quantil pelo limite superior do bucket; None acima do último"""
+        target = q * histogram.count
+        seen = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            seen += count
+            if seen >= target:
+                return bound * 1000
+        return None
+
+    def summary(self) -> Dict:
+        """Totais por contador e, por etapa, chamadas, tempo total, média e p50/p95"""
+        with self._lock:
+            counters = {}
+            for name, series in self._counters.items():
+                for key, value in series.items():
+                    label = ','.join(f"{k}={v}" for k, v in key)
+                    counters[f"{name}{{{label}}}" if label else name] = value
+            stages = {}
+            for name, series in self._histograms.items():
+                for key, histogram in series.items():
+                    label = ','.join(v for _, v in key) or name
+                    stages[label if name == 'stage_seconds' else f"{name}:{label}"] = {
+                        'count': histogram.count,
+                        'total_ms': round(histogram.sum * 1000, 1),
+                        'mean_ms': round(histogram.sum * 1000 / histogram.count, 2) if histogram.count else 0.0,
+                        'p50_ms': self._quantile_ms(histogram, 0.5),
+                        'p95_ms': self._quantile_ms(histogram, 0.95)
+                    }
+        return {'counters': dict(sorted(counters.items())), 'stages': stages}
+
+
+# Registro único do processo
+metrics = Metrics()
+
+
+def stage_names(summary: Dict) -> List[str]:
+    """Etapas do resumo na ordem do caminho quente"""
+    order = ('upstream', 'decode', 'aggregate', 'format', 'serialize', 'compress')
+    stages = summary['stages']
+    return [name for name in order if name in stages] + sorted(name for name in stages if name not in order)
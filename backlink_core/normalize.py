@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Normalização dos domínios informados pelo usuário
+
+Usada pela CLI, pela aplicação web e pelos caches, para que
+'https://www.Exemplo.com/' e 'exemplo.com' resultem na mesma análise.
+"""
+
+
+def normalize_domain(domain: str) -> str:
+    """Remove protocolo, 'www.', caminho e espaços, em minúsculas
+
+    Ex.: 'https://www.Exemplo.com.br/blog' -> 'exemplo.com.br'
+    """
+    domain = domain.strip().lower()
+    scheme = domain.find('://')
+    if scheme != -1:
+        domain = domain[scheme + 3:]
+    for separator in '/?#':
+        domain = domain.split(separator, 1)[0]
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain.rstrip('.')
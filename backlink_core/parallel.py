@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Agregação em vários processos para perfis muito grandes
+
+No modo normal, a decodificação do JSON e o `add_batch` de cada página rodam
+na thread que pagina, em um único núcleo (e com o GIL). Aqui o processo
+principal só busca as páginas e lê o cursor `next` direto dos bytes
+(`scan_field`); cada corpo vai para um bloco de memória compartilhada
+(multiprocessing.shared_memory) e um processo do pool decodifica a página e
+devolve um BacklinkStats parcial (contadores e o conjunto de hosts), somado
+ao total com `merge`. As linhas nunca passam pelo pickle nem pelo pipe entre
+os processos: só o nome do bloco vai, e só o parcial volta.
+
+Os processos nascem de um servidor de fork (`forkserver`, quando disponível)
+que já importou este módulo: partida rápida e seguro mesmo se o processo
+principal tiver várias threads (aplicação web, workers de jobs).
+"""
+
+import json
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterable, Optional
+
+from .aggregation import BacklinkStats
+from .json_stream import iter_batches
+
+
+def aggregate_shared(name: str, size: int) -> BacklinkStats:
+    """Executado no processo do pool: agrega a página guardada no bloco `name`"""
+    block = SharedMemory(name=name)
+    try:
+        view = block.buf[:size]
+        body = bytes(view)
+        view.release()
+    finally:
+        block.close()
+
+    stats = BacklinkStats()
+    for batch in iter_batches(json.loads(body).get('backlinks') or []):
+        stats.add_batch(batch)
+    return stats
+
+
+class ParallelAggregator:
+    """Pool de processos que agrega corpos de página da API (ver o módulo)"""
+
+    def __init__(self, workers: int):
+        if workers < 1:
+            raise ValueError('workers deve ser maior que zero')
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if context.get_start_method() == 'forkserver':
+            context.set_forkserver_preload([__name__])
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+    def submit(self, body: bytes) -> Future:
+        """Copia o corpo para um bloco compartilhado e agenda a agregação"""
+        block = SharedMemory(create=True, size=max(len(body), 1))
+        block.buf[:len(body)] = body
+        try:
+            future = self.executor.submit(aggregate_shared, block.name, len(body))
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+        def release(_):
+            block.close()
+            block.unlink()
+
+        future.add_done_callback(release)
+        return future
+
+    def aggregate(self, bodies: Iterable[bytes], stats: Optional[BacklinkStats] = None,
+                  on_result: Optional[Callable[[int], None]] = None) -> BacklinkStats:
+        """Agrega os corpos de página em `stats` (ou em um acumulador novo)
+
+        No máximo duas páginas por processo ficam em voo, o que limita a
+        memória enquanto a busca segue adiante; os parciais são somados na
+        ordem de envio e `on_result(linhas)` é chamado a cada página somada.
+        Se `bodies` levantar uma exceção (ex.: falha em uma página seguinte),
+        as páginas já enviadas são somadas antes de propagá-la. Se a falha for
+        do pool (ex.: BrokenProcessPool, um processo morto por falta de
+        memória), as páginas restantes são canceladas e o erro é propagado.
+        """
+        stats = stats if stats is not None else BacklinkStats()
+        pending = deque()
+        pool_failed = False
+
+        def collect():
+            nonlocal pool_failed
+            try:
+                partial = pending.popleft().result()
+            except BaseException:
+                pool_failed = True
+                raise
+            stats.merge(partial)
+            if on_result:
+                on_result(partial.total_backlinks)
+
+        def cancel():
+            while pending:
+                pending.popleft().cancel()
+
+        try:
+            for body in bodies:
+                try:
+                    pending.append(self.submit(body))
+                except BaseException:
+                    pool_failed = True
+                    raise
+                if len(pending) >= 2 * self.workers:
+                    collect()
+        except BaseException as error:
+            if pool_failed or not isinstance(error, Exception):
+                cancel()
+                raise
+            try:
+                while pending:
+                    collect()
+            except BaseException:
+                cancel()
+                raise
+            raise
+        while pending:
+            collect()
+        return stats
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_shared_aggregators = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_aggregator(workers: int) -> ParallelAggregator:
+    """Pool único do processo por número de workers, criado na primeira análise"""
+    aggregator = _shared_aggregators.get(workers)
+    if aggregator is None:
+        with _shared_lock:
+            aggregator = _shared_aggregators.get(workers)
+            if aggregator is None:
+                aggregator = _shared_aggregators[workers] = ParallelAggregator(workers)
+    return aggregator
+
+
+def discard_shared_aggregator(aggregator: ParallelAggregator):
+    """Descarta um pool compartilhado quebrado; a próxima análise cria outro"""
+    with _shared_lock:
+        if _shared_aggregators.get(aggregator.workers) is aggregator:
+            del _shared_aggregators[aggregator.workers]
+    aggregator.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_shared_aggregators():
+    """Encerra os pools compartilhados (ex.: ao fim da CLI)
+
+    Encerrar antes da saída do interpretador evita uma corrida do
+    ProcessPoolExecutor (CPython 3.11), cujo gancho de saída pode escrever no
+    pipe que a thread de gerência está fechando.
+    """
+    with _shared_lock:
+        aggregators = list(_shared_aggregators.values())
+        _shared_aggregators.clear()
+    for aggregator in aggregators:
+        aggregator.close()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Perfil sob demanda de uma execução (CLI com --profile) ou de uma requisição
+
+Dois modos:
+- `sampling` (padrão): uma thread lê a pilha das threads perfiladas a cada
+  `interval` segundos (`sys._current_frames`) e conta as pilhas iguais. O
+  resultado é o formato de pilhas colapsadas (`quadro;quadro;quadro N`,
+  uma pilha por linha), aceito pelo flamegraph.pl, speedscope e similares.
+  Mede tempo de parede: esperas de rede e de locks aparecem como estão.
+- `cprofile`: o cProfile da biblioteca padrão, com chamadas e tempos exatos
+  por função, gravado no formato do pstats (`.prof`, ex.: snakeviz). Só a
+  thread que iniciou a sessão é medida. Grava também pilhas colapsadas
+  reconstruídas do grafo de chamadores (`pstats_collapsed`), com o tempo
+  próprio em microssegundos no lugar das amostras.
+
+Cada sessão guarda também o tempo por etapa (upstream, decode, aggregate...)
+registrado em `metrics` durante a execução, e grava um `.json` com o resumo.
+Nada aqui é importado nem executado quando o perfil está desligado.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from .metrics import metrics
+
+MODES = ('sampling', 'cprofile')
+
+# Intervalo entre amostras do modo `sampling`, em segundos
+DEFAULT_INTERVAL = 0.005
+
+
+def frame_label(code) -> str:
+    """Nome de um quadro na pilha colapsada: `função (arquivo:linha)`"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def pstats_label(function) -> str:
+    """Nome de uma função do pstats no formato de `frame_label`"""
+    filename, line, name = function
+    if filename == '~':
+        return name  # embutida (ex.: <built-in method time.sleep>)
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def pstats_collapsed(entries: Dict, min_share: float = 0.0001) -> Counter:
+    """Pilhas colapsadas (em microssegundos) a partir das estatísticas do pstats
+
+    O cProfile só guarda arestas chamador -> chamado, não pilhas inteiras: o
+    tempo próprio de cada função é atribuído aos seus chamadores pela aresta
+    (tempo próprio gasto em chamadas vindas daquele chamador) e, daí para
+    cima, dividido entre os chamadores de cada um na proporção do tempo
+    acumulado de cada aresta. É uma aproximação (como no gprof): funções
+    chamadas de contextos diferentes com custos diferentes se misturam.
+    Ramos abaixo de `min_share` do tempo total e ciclos de recursão param
+    na função em que ocorrem, sem perder tempo.
+    """
+    labels = {function: pstats_label(function).replace(';', ':') for function in entries}
+    threshold = sum(entry[2] for entry in entries.values()) * min_share
+    stacks = Counter()
+
+    def climb(function, seconds: float, path: List[str], visited: frozenset):
+        callers = entries[function][4]
+        total = sum(edge[3] for caller, edge in callers.items() if caller not in visited)
+        if not total or seconds < threshold:
+            stacks[';'.join(reversed(path))] += seconds
+            return
+        for caller, edge in callers.items():
+            if caller not in visited and edge[3]:
+                climb(caller, seconds * edge[3] / total, path + [labels[caller]], visited | {caller})
+
+    for function, (_, _, own, _, callers) in entries.items():
+        if own <= 0:
+            continue
+        path = [labels[function]]
+        visited = frozenset((function,))
+        edges = {caller: edge[2] for caller, edge in callers.items() if caller != function and edge[2] > 0}
+        if not edges:
+            stacks[path[0]] += own
+            continue
+        # Recursão direta: o tempo próprio da aresta de si para si fica na própria função
+        attributed = sum(edges.values())
+        if own > attributed:
+            stacks[path[0]] += own - attributed
+        for caller, seconds in edges.items():
+            climb(caller, seconds, path + [labels[caller]], visited | {caller})
+
+    return Counter({stack: round(seconds * 1e6) for stack, seconds in stacks.items()
+                    if round(seconds * 1e6)})
+
+
+class StackSampler:
+    """Conta as pilhas das threads observadas, amostradas em uma thread própria"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.counts = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _collapse(self, frame) -> str:
+        labels = self._labels
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                # ';' separa os quadros no formato colapsado
+                label = labels[code] = frame_label(code).replace(';', ':')
+            names.append(label)
+            frame = frame.f_back
+        names.reverse()
+        return ';'.join(names)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_id is not None and thread_id != self.thread_id):
+                    continue
+                self.counts[self._collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        """Pilhas no formato colapsado, da mais frequente para a menos"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def top(self, limit: int) -> List[Dict]:
+        """Funções com mais amostras no topo da pilha (próprias) e em qualquer ponto dela"""
+        own, total = Counter(), Counter()
+        for stack, count in self.counts.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return [{'function': function, 'self_samples': samples, 'total_samples': total[function],
+                 'self_ms': round(samples * self.interval * 1000, 1)}
+                for function, samples in own.most_common(limit)]
+
+
+class ProfileSession:
+    """Perfil de uma execução (ver o módulo)
+
+    Com `current_thread=True` (uma requisição da aplicação web), só a thread
+    que chamou `start` é amostrada e só as etapas medidas nela são somadas;
+    senão, todas as threads do processo e as etapas de todas elas.
+    """
+
+    def __init__(self, mode: str = 'sampling', interval: float = DEFAULT_INTERVAL,
+                 current_thread: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"Modo de perfil inválido: {mode} (use {', '.join(MODES)})")
+        self.mode = mode
+        self.interval = interval
+        self.current_thread = current_thread
+        self.duration = 0.0
+        self.sampler = None
+        self.profiler = None
+        self._stages = {}
+        self._stages_before = {}
+        self._context = ExitStack()
+        self._started = None
+
+    def start(self) -> 'ProfileSession':
+        if self.current_thread:
+            self._stages = self._context.enter_context(metrics.record_stages())
+        else:
+            self._stages_before = metrics.stage_totals()
+        if self.mode == 'sampling':
+            self.sampler = StackSampler(self.interval, threading.get_ident() if self.current_thread else None)
+            self.sampler.start()
+        else:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        """Encerra a coleta (chamadas repetidas são ignoradas)"""
+        if self._started is None:
+            return
+        self.duration = time.perf_counter() - self._started
+        self._started = None
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.current_thread:
+            self._context.close()
+        else:
+            before = self._stages_before
+            self._stages = {}
+            for stage, (count, seconds) in metrics.stage_totals().items():
+                previous = before.get(stage, (0, 0.0))
+                if count > previous[0]:
+                    self._stages[stage] = [count - previous[0], seconds - previous[1]]
+
+    def __enter__(self) -> 'ProfileSession':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def active(self) -> bool:
+        return self._started is not None
+
+    def stages(self) -> Dict[str, Dict]:
+        """Chamadas e tempo total por etapa durante a sessão"""
+        return {stage: {'count': count, 'total_ms': round(seconds * 1000, 1)}
+                for stage, (count, seconds) in self._stages.items()}
+
+    def top(self, limit: int = 15) -> List[Dict]:
+        """Funções mais custosas: por amostras próprias, ou por tempo acumulado no cProfile"""
+        if self.sampler is not None:
+            return self.sampler.top(limit)
+        entries = pstats.Stats(self.profiler).stats
+        ranked = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [{'function': f"{name} ({os.path.basename(filename)}:{line})", 'calls': calls,
+                 'self_ms': round(own * 1000, 1), 'total_ms': round(total * 1000, 1)}
+                for (filename, line, name), (_, calls, own, total, _) in ranked]
+
+    def report(self, limit: int = 15) -> Dict:
+        """Resumo da sessão: modo, duração, amostras, etapas e funções mais custosas"""
+        report = {
+            'mode': self.mode,
+            'duration_ms': round(self.duration * 1000, 1),
+            'stages': self.stages(),
+            'top': self.top(limit)
+        }
+        if self.sampler is not None:
+            report['interval_ms'] = self.interval * 1000
+            report['samples'] = self.sampler.samples
+        return report
+
+    def collapsed(self) -> str:
+        """Pilhas colapsadas: amostras, ou microssegundos de tempo próprio no cProfile"""
+        if self.sampler is not None:
+            return self.sampler.collapsed()
+        stacks = pstats_collapsed(pstats.Stats(self.profiler).stats)
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def write(self, prefix: str) -> List[str]:
+        """Grava `prefixo.collapsed`, `prefixo.prof` (modo cprofile) e `prefixo.json`"""
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = [f"{prefix}.collapsed"]
+        with open(paths[0], 'w', encoding='utf-8') as output:
+            output.write(self.collapsed())
+        if self.profiler is not None:
+            paths.append(f"{prefix}.prof")
+            self.profiler.dump_stats(paths[-1])
+        paths.append(f"{prefix}.json")
+        with open(paths[-1], 'w', encoding='utf-8') as output:
+            json.dump(self.report(), output, ensure_ascii=False, indent=2)
+        return paths
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Controle de vazão das chamadas à SE Ranking API
+
+Combina três mecanismos, compartilhados por todas as threads do processo:
+- Token bucket: limita requisições por segundo, permitindo rajadas curtas
+- Concorrência adaptativa (AIMD): cresce aos poucos enquanto a API responde
+  bem e cai pela metade ao receber HTTP 429/5xx
+- Retentativas com backoff exponencial e jitter, respeitando `Retry-After`
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+
+# Status que indicam sobrecarga/cota da API e devem ser repetidos
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` tokens por segundo, até `burst` acumulados"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self) -> float:
+        """Consome um token se houver; senão, retorna quantos segundos esperar"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível e o consome"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            # Dorme fora do lock para não bloquear as outras threads
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Como `acquire`, mas aguarda sem bloquear o event loop"""
+        import asyncio
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Suspende a emissão de tokens (ex.: após um `Retry-After`)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveConcurrency:
+    """Limite de requisições simultâneas ajustado por AIMD
+
+    Cada resposta bem-sucedida aumenta o limite em 1/limite (≈ +1 por ciclo
+    completo de requisições); uma resposta de sobrecarga multiplica o limite
+    por `decrease_factor`, no máximo uma vez a cada `cooldown` segundos.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1,
+                 decrease_factor: float = 0.5, cooldown: float = 1.0):
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.limit = float(max(self.min_limit, self.max_limit // 2))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Bloqueia até haver uma vaga dentro do limite atual"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded: Optional[bool]):
+        """Libera a vaga e ajusta o limite
+
+        `overloaded=True` reduz o limite, `False` o aumenta e `None` (ex.: erro
+        4xx do cliente) não o altera.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._adjust(overloaded)
+            self._condition.notify_all()
+
+    def _adjust(self, overloaded: Optional[bool]):
+        if overloaded:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        elif overloaded is False:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class AsyncAdaptiveConcurrency(AdaptiveConcurrency):
+    """AdaptiveConcurrency para corrotinas de um mesmo event loop"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._waiters = deque()
+
+    async def acquire(self):
+        """Aguarda (sem bloquear o event loop) uma vaga dentro do limite atual"""
+        import asyncio
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, overloaded: Optional[bool]):
+        self.in_flight -= 1
+        self._adjust(overloaded)
+        for _ in range(max(0, int(self.limit) - self.in_flight)):
+            if not self._waiters:
+                break
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converte o cabeçalho `Retry-After` (segundos ou data HTTP) em segundos"""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Executa requisições respeitando vazão, concorrência e política de retentativa"""
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, max_concurrency: int = 8,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._stats_lock = threading.Lock()
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled = 0
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """Cria o limitador a partir das variáveis de ambiente"""
+        return cls(
+            rate=float(os.getenv('SE_RANKING_RATE_LIMIT', '10')),
+            burst=int(os.getenv('SE_RANKING_RATE_BURST', '10')),
+            max_concurrency=int(os.getenv('SE_RANKING_MAX_CONCURRENCY', '8')),
+            max_retries=int(os.getenv('SE_RANKING_MAX_RETRIES', '4'))
+        )
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Espera antes da retentativa `attempt` (0, 1, ...): backoff exponencial
+        com jitter completo, nunca inferior ao `Retry-After` informado pela API"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _after_error(self, attempt: int) -> bool:
+        """Libera a vaga após uma exceção repetível; True se ainda cabe uma retentativa"""
+        self.concurrency.release(overloaded=True)
+        return attempt < self.max_retries
+
+    def _after_response(self, response, attempt: int) -> Tuple[bool, Optional[float]]:
+        """Classifica a resposta, libera a vaga (AIMD) e aplica o `Retry-After`
+
+        Retorna (repetir, espera mínima pedida pela API em segundos).
+        """
+        status = response.status_code
+        if status not in RETRYABLE_STATUS:
+            self.concurrency.release(overloaded=False if status < 400 else None)
+            return False, None
+
+        self.concurrency.release(overloaded=True)
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if status == 429:
+            self._count('throttled')
+            if retry_after:
+                # A cota vale para o processo todo: pausa todas as threads
+                self.bucket.pause(retry_after)
+        return attempt < self.max_retries, retry_after
+
+    def request(self, send: Callable, retry_exceptions: Tuple = ()):
+        """Executa `send()` (que retorna uma resposta HTTP) com retentativas
+
+        Repete a chamada em status 429/5xx e nas exceções `retry_exceptions`.
+        Retorna a última resposta obtida; se a última tentativa levantou uma
+        exceção, ela é propagada.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            self._count('requests_sent')
+
+            try:
+                response = send()
+            except retry_exceptions:
+                if not self._after_error(attempt):
+                    raise
+                retry_after = None
+            except BaseException:
+                # Erro não repetível (ou interrupção): a vaga não pode ficar ocupada
+                self.concurrency.release(overloaded=None)
+                raise
+            else:
+                retry, retry_after = self._after_response(response, attempt)
+                if not retry:
+                    return response
+                # Devolve a conexão ao pool (respostas lidas com stream=True)
+                response.close()
+
+            self._count('retries')
+            time.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> dict:
+        """Contadores e estado atual do limitador"""
+        return {
+            'rate_per_second': self.bucket.rate,
+            'burst': self.bucket.burst,
+            'concurrency_limit': round(self.concurrency.limit, 2),
+            'in_flight': self.concurrency.in_flight,
+            'requests_sent': self.requests_sent,
+            'retries': self.retries,
+            'throttled': self.throttled
+        }
+
+
+class AsyncRateLimiter(RateLimiter):
+    """RateLimiter para clientes assíncronos (um por event loop)
+
+    O token bucket pode ser compartilhado com o limitador síncrono do processo,
+    de modo que a cota por segundo vale para os dois clientes; a concorrência
+    adaptativa é própria do event loop.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, max_concurrency: int = 8,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 bucket: Optional[TokenBucket] = None):
+        super().__init__(rate, burst, max_concurrency, max_retries, backoff_base, backoff_max)
+        if bucket is not None:
+            self.bucket = bucket
+        self.concurrency = AsyncAdaptiveConcurrency(max_concurrency)
+
+    @classmethod
+    def from_env(cls, bucket: Optional[TokenBucket] = None) -> 'AsyncRateLimiter':
+        """Cria o limitador a partir das variáveis de ambiente"""
+        return cls(
+            rate=float(os.getenv('SE_RANKING_RATE_LIMIT', '10')),
+            burst=int(os.getenv('SE_RANKING_RATE_BURST', '10')),
+            max_concurrency=int(os.getenv('SE_RANKING_MAX_CONCURRENCY', '8')),
+            max_retries=int(os.getenv('SE_RANKING_MAX_RETRIES', '4')),
+            bucket=bucket
+        )
+
+    async def request(self, send: Callable, retry_exceptions: Tuple = ()):
+        """Como `RateLimiter.request`, com `send()` retornando um awaitable"""
+        import asyncio
+        attempt = 0
+        while True:
+            await self.bucket.acquire_async()
+            await self.concurrency.acquire()
+            self._count('requests_sent')
+
+            try:
+                response = await send()
+            except retry_exceptions:
+                if not self._after_error(attempt):
+                    raise
+                retry_after = None
+            except BaseException:
+                # Inclui o cancelamento da tarefa (asyncio.CancelledError)
+                self.concurrency.release(overloaded=None)
+                raise
+            else:
+                retry, retry_after = self._after_response(response, attempt)
+                if not retry:
+                    return response
+                # Devolve a conexão ao pool (respostas lidas em streaming)
+                await response.aclose()
+
+            self._count('retries')
+            await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter() -> RateLimiter:
+    """Retorna o limitador único do processo, criado a partir do ambiente"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter.from_env()
+    return _shared_limiter
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Cache persistente (SQLite) das respostas da SE Ranking API
+
+Os dados de backlinks de um domínio mudam no máximo uma vez por dia, então as
+respostas de /v1/backlinks/raw são guardadas em disco, comprimidas com zlib,
+com validade (TTL) por entrada e descarte LRU quando o total de bytes
+ultrapassa o orçamento configurado.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional
+
+
+# Endpoints cujas respostas podem ser reaproveitadas
+CACHEABLE_ENDPOINTS = {'/v1/backlinks/raw'}
+
+# Modos de uso do cache por requisição
+CACHE_USE = 'use'          # lê e grava
+CACHE_REFRESH = 'refresh'  # ignora o que está gravado, mas grava a resposta nova
+CACHE_BYPASS = 'bypass'    # não lê nem grava
+CACHE_MODES = (CACHE_USE, CACHE_REFRESH, CACHE_BYPASS)
+
+
+class ResponseCache:
+    """Cache de respostas em SQLite, seguro para uso entre threads"""
+
+    def __init__(self, path: str, ttl: int = 86400, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        import sqlite3
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        try:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                target TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                expires REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)'
+        )
+        self._total_bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+        self.bytes_served = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        """Cria o cache a partir das variáveis de ambiente"""
+        default_path = os.path.join(tempfile.gettempdir(), 'backlinks_cache.sqlite3')
+        return cls(
+            path=os.getenv('BACKLINKS_CACHE_PATH', default_path),
+            ttl=int(os.getenv('BACKLINKS_CACHE_TTL', '86400')),
+            max_bytes=int(os.getenv('BACKLINKS_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+        )
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Chave do cache: (endpoint, target, mode, limit, cursor[, ordem]), sem a chave da API"""
+        parts = [
+            endpoint,
+            params.get('target'),
+            params.get('mode'),
+            params.get('limit'),
+            params.get('next')
+        ]
+        if params.get('order_by'):
+            parts.append(params['order_by'])
+        return hashlib.sha256(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, endpoint: str, params: Dict) -> Optional[bytes]:
+        """Retorna o corpo da resposta guardada, ou None se ausente/expirada"""
+        body = self._lookup(endpoint, params)
+        if body is None:
+            return None
+        data = zlib.decompress(body)
+        self.bytes_served += len(data)
+        return data
+
+    def get_stream(self, endpoint: str, params: Dict,
+                   chunk_size: int = 64 * 1024) -> Optional[Iterator[bytes]]:
+        """Como `get`, mas descomprime o corpo em pedaços de até `chunk_size`"""
+        body = self._lookup(endpoint, params)
+        if body is None:
+            return None
+        return self._iter_decompressed(body, chunk_size)
+
+    def _iter_decompressed(self, body: bytes, chunk_size: int) -> Iterator[bytes]:
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(body, chunk_size)
+        while data:
+            self.bytes_served += len(data)
+            yield data
+            data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+        data = decompressor.flush()
+        if data:
+            self.bytes_served += len(data)
+            yield data
+
+    def _lookup(self, endpoint: str, params: Dict) -> Optional[bytes]:
+        """Corpo comprimido da entrada válida, atualizando o acesso e os contadores"""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, size, expires FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, size, expires = row
+            if expires <= now:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._total_bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return body
+
+    def put(self, endpoint: str, params: Dict, body: bytes, ttl: Optional[int] = None):
+        """Guarda o corpo de uma resposta e descarta as entradas menos usadas se
+        o orçamento de bytes for excedido"""
+        self.put_compressed(endpoint, params, zlib.compress(body, 6), ttl)
+
+    def put_compressed(self, endpoint: str, params: Dict, compressed: bytes,
+                       ttl: Optional[int] = None):
+        """Como `put`, para um corpo já comprimido com zlib (leitura em streaming)"""
+        key = self.make_key(endpoint, params)
+        size = len(compressed)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            if old:
+                self._total_bytes -= old[0]
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, endpoint, target, body, size, created, expires, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, params.get('target'), compressed, size, now, expires, now)
+            )
+            self._total_bytes += size
+            self.writes += 1
+            self.bytes_written += size
+            self._evict()
+
+    def _evict(self):
+        """Remove entradas expiradas e, depois, as menos acessadas até caber no orçamento"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        self._conn.execute('DELETE FROM responses WHERE expires <= ?', (time.time(),))
+        self._total_bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()[0]
+
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT key, size FROM responses ORDER BY last_access LIMIT 64'
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Contadores de uso do cache"""
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'expired': self.expired,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'bytes_served': self.bytes_served,
+            'bytes_written': self.bytes_written,
+            'stored_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[ResponseCache]:
+    """Retorna o cache único do processo, ou None se desativado/indisponível"""
+    global _shared_cache
+    import sqlite3
+
+    if os.getenv('BACKLINKS_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                try:
+                    _shared_cache = ResponseCache.from_env()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Cache de respostas indisponível: {e}")
+                    return None
+    return _shared_cache
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Cache em memória dos resultados de análise e coalescência de requisições
+
+- LRUResultCache: guarda os resultados prontos de `analyze_domain`, limitado
+  por um orçamento aproximado de bytes e por TTL
+- SingleFlight: quando várias requisições pedem a mesma análise ao mesmo
+  tempo, apenas a primeira executa; as demais aguardam o mesmo resultado
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def estimate_result_size(result: Dict) -> int:
+    """Estimativa barata do tamanho em memória de um resultado de análise"""
+    size = 1024
+    table = result.get('backlinks_table')
+    if table is not None:
+        size += table.nbytes
+    return size
+
+
+class LRUResultCache:
+    """LRU thread-safe limitado por bytes estimados e por TTL"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: int = 3600,
+                 sizeof: Callable[[Any], int] = estimate_result_size):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # chave -> (valor, tamanho, expira em)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'LRUResultCache':
+        """Cria o cache a partir das variáveis de ambiente"""
+        return cls(
+            max_bytes=int(os.getenv('BACKLINKS_RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+            ttl=int(os.getenv('BACKLINKS_RESULT_CACHE_TTL', '3600'))
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'estimated_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+class _Call:
+    """Execução em andamento compartilhada pelos chamadores de uma mesma chave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Garante uma única execução simultânea por chave"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Executa `fn()` ou aguarda a execução já em andamento para `key`
+
+        Retorna (resultado, compartilhado), onde `compartilhado` indica que o
+        resultado veio da execução iniciada por outro chamador.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'coalesced': self.coalesced
+        }
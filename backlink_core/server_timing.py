@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Medição das fases de inicialização (partida a frio) para o cabeçalho
+`Server-Timing`
+
+`StartupTimings` acumula a duração de cada fase (importação, template,
+cliente HTTP, DNS...). Cada fase é informada uma única vez, na primeira
+resposta produzida depois de medida; assim a primeira requisição de uma
+instância nova traz o detalhamento da partida a frio.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+
+def format_server_timing(entries: List[Tuple[str, Optional[float], Optional[str]]]) -> str:
+    """Monta o valor do cabeçalho: `nome;dur=ms;desc="..."`, separados por vírgula"""
+    parts = []
+    for name, duration_ms, description in entries:
+        part = name
+        if duration_ms is not None:
+            part += f";dur={duration_ms:.1f}"
+        if description:
+            part += f';desc="{description}"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+class StartupTimings:
+    """Durações das fases de inicialização, seguras para uso entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = {}
+        self._pending = []
+        self._cold = True
+
+    def record(self, name: str, seconds: float):
+        """Registra a duração de uma fase (em segundos)"""
+        with self._lock:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+            self._pending.append((f"cold-{name}", seconds * 1000, None))
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Mede o bloco como a fase `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def take(self) -> List[Tuple[str, Optional[float], Optional[str]]]:
+        """Fases ainda não informadas; a primeira chamada marca a resposta como `cold`"""
+        with self._lock:
+            entries, self._pending = self._pending, []
+            if self._cold:
+                self._cold = False
+                entries.insert(0, ('cold', None, 'primeira requisição da instância'))
+            return entries
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self._phases.items()}
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Snapshots (SQLite) dos perfis de backlinks, para a análise incremental
+
+Cada backlink é identificado por um hash de 64 bits de `url_from`, `url_to`
+e `anchor` (`backlink_key`). Por domínio, o snapshot guarda esses hashes
+(com as URLs, para listar links perdidos), o estado do BacklinkStats, o
+resumo da última análise e o `first_seen` mais recente já visto.
+
+Na análise incremental, só as linhas cujo hash não está no snapshot são
+gravadas; links perdidos são removidos apenas quando uma varredura chega ao
+fim do perfil.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .aggregation import BacklinkStats
+
+# Métricas numéricas do resumo comparadas entre duas análises
+DELTA_KEYS = (
+    'total_backlinks', 'total_referring_domains', 'total_registrable_domains',
+    'dofollow_count', 'nofollow_count', 'image_links',
+    'avg_domain_rank', 'max_domain_rank', 'min_domain_rank'
+)
+
+# Parâmetros por consulta (abaixo do limite de variáveis do SQLite)
+_QUERY_CHUNK = 500
+
+
+def backlink_key(backlink: Dict) -> int:
+    """Hash de 64 bits (com sinal, como o INTEGER do SQLite) de um backlink"""
+    raw = '\0'.join((backlink.get('url_from') or '', backlink.get('url_to') or '',
+                     backlink.get('anchor') or ''))
+    digest = hashlib.blake2b(raw.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def link_row(key: int, backlink: Dict) -> Tuple:
+    """Linha da tabela `links` (sem o domínio) de um backlink e seu hash"""
+    return (key, backlink.get('url_from'), backlink.get('url_to'),
+            backlink.get('anchor'), backlink.get('first_seen'))
+
+
+def summary_deltas(previous: Dict, current: Dict) -> Dict:
+    """Diferença (atual - anterior) das métricas numéricas do resumo"""
+    deltas = {}
+    for key in DELTA_KEYS:
+        if key in previous and key in current:
+            delta = current[key] - previous[key]
+            deltas[key] = round(delta, 2) if isinstance(delta, float) else delta
+    return deltas
+
+
+class SnapshotStore:
+    """Snapshots por domínio em SQLite, seguro para uso entre threads"""
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        try:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                domain TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                full_scan_at REAL NOT NULL,
+                watermark TEXT,
+                complete INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                stats BLOB NOT NULL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS links (
+                domain TEXT NOT NULL,
+                key INTEGER NOT NULL,
+                url_from TEXT,
+                url_to TEXT,
+                anchor TEXT,
+                first_seen TEXT,
+                PRIMARY KEY (domain, key)
+            ) WITHOUT ROWID
+        ''')
+
+    @classmethod
+    def from_env(cls) -> 'SnapshotStore':
+        """Cria o armazenamento a partir das variáveis de ambiente"""
+        default_path = os.path.join(tempfile.gettempdir(), 'backlinks_snapshots.sqlite3')
+        return cls(os.getenv('BACKLINKS_SNAPSHOT_PATH', default_path))
+
+    def load(self, domain: str) -> Optional[Dict]:
+        """Metadados do snapshot do domínio (com o BacklinkStats), ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT updated_at, full_scan_at, watermark, complete, summary, stats '
+                'FROM snapshots WHERE domain = ?', (domain,)
+            ).fetchone()
+        if row is None:
+            return None
+        updated_at, full_scan_at, watermark, complete, summary, stats = row
+        return {
+            'domain': domain,
+            'updated_at': updated_at,
+            'full_scan_at': full_scan_at,
+            'watermark': watermark,
+            'complete': bool(complete),
+            'summary': json.loads(summary),
+            'stats': BacklinkStats.from_state(json.loads(zlib.decompress(stats)))
+        }
+
+    def known_keys(self, domain: str, keys: List[int]) -> Set[int]:
+        """Quais dos `keys` já estão no snapshot do domínio"""
+        known = set()
+        with self._lock:
+            for start in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                known.update(key for (key,) in self._conn.execute(
+                    f'SELECT key FROM links WHERE domain = ? AND key IN ({placeholders})',
+                    [domain, *chunk]
+                ))
+        return known
+
+    def remove_missing(self, domain: str, seen: Set[int], limit: int = 100) -> Tuple[int, List[Dict]]:
+        """Remove os links do snapshot que não estão em `seen` (links perdidos)
+
+        Retorna o total removido e até `limit` deles (url_from, url_to,
+        anchor, first_seen).
+        """
+        with self._lock:
+            stored = [key for (key,) in self._conn.execute(
+                'SELECT key FROM links WHERE domain = ?', (domain,))]
+            lost = [key for key in stored if key not in seen]
+            details = []
+            self._conn.execute('BEGIN')
+            for start in range(0, len(lost), _QUERY_CHUNK):
+                chunk = lost[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                if len(details) < limit:
+                    details.extend(
+                        {'url_from': url_from, 'url_to': url_to, 'anchor': anchor,
+                         'first_seen': first_seen}
+                        for url_from, url_to, anchor, first_seen in self._conn.execute(
+                            f'SELECT url_from, url_to, anchor, first_seen FROM links '
+                            f'WHERE domain = ? AND key IN ({placeholders})', [domain, *chunk]
+                        )
+                    )
+                self._conn.execute(
+                    f'DELETE FROM links WHERE domain = ? AND key IN ({placeholders})',
+                    [domain, *chunk]
+                )
+            self._conn.execute('COMMIT')
+        return len(lost), details[:limit]
+
+    def save(self, domain: str, stats: BacklinkStats, summary: Dict, watermark: Optional[str],
+             complete: bool, full_scan: bool, links: Iterable[Tuple] = ()):
+        """Grava os metadados do snapshot após uma análise bem-sucedida
+
+        `links` são os backlinks novos (`link_row`), gravados na mesma
+        transação: uma análise que falha não deixa links no snapshot.
+        """
+        now = time.time()
+        blob = zlib.compress(json.dumps(stats.to_state(), ensure_ascii=False).encode('utf-8'))
+        summary = json.dumps({key: summary[key] for key in DELTA_KEYS if key in summary})
+        with self._lock:
+            previous = self._conn.execute(
+                'SELECT full_scan_at FROM snapshots WHERE domain = ?', (domain,)
+            ).fetchone()
+            full_scan_at = now if full_scan or previous is None else previous[0]
+            self._conn.execute('BEGIN')
+            self._conn.executemany('INSERT OR IGNORE INTO links VALUES (?, ?, ?, ?, ?, ?)',
+                                   ((domain, *row) for row in links))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (domain, now, full_scan_at, watermark, int(complete), summary, blob)
+            )
+            self._conn.execute('COMMIT')
+
+    def delete(self, domain: str):
+        """Apaga o snapshot do domínio (a próxima análise recria a linha de base)"""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.execute('DELETE FROM links WHERE domain = ?', (domain,))
+            self._conn.execute('DELETE FROM snapshots WHERE domain = ?', (domain,))
+            self._conn.execute('COMMIT')
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_snapshots() -> SnapshotStore:
+    """Retorna o armazenamento de snapshots único do processo"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = SnapshotStore.from_env()
+    return _shared_store
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Configuração da camada HTTP usada nas chamadas à SE Ranking API
+
+- TransportConfig: tamanho do pool por host, keep-alive, timeouts de conexão
+  e de leitura separados e compressão aceita (gzip e, se houver o pacote
+  `brotli`, br), lidos das variáveis de ambiente
+- MeteredHTTPAdapter: HTTPAdapter que contabiliza conexões novas x
+  requisições, para medir o reaproveitamento de conexões
+- SessionPool: entrega uma sessão compartilhada (um único pool, seguro entre
+  threads) ou uma sessão por thread, conforme a configuração
+"""
+
+import os
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import brotli  # noqa: F401  (usado pelo urllib3 para decodificar 'br')
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:  # brotli é opcional
+        BROTLI_AVAILABLE = False
+
+
+SESSION_SHARED = 'shared'
+SESSION_PER_THREAD = 'per-thread'
+SESSION_MODES = (SESSION_SHARED, SESSION_PER_THREAD)
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+class TransportConfig:
+    """Parâmetros do pool de conexões e das requisições HTTP"""
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 10, pool_block: bool = False,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 keep_alive: bool = True, compression: bool = True,
+                 session_mode: str = SESSION_SHARED):
+        if session_mode not in SESSION_MODES:
+            raise ValueError(f"Modo de sessão inválido: {session_mode}")
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.compression = compression
+        self.session_mode = session_mode
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'TransportConfig':
+        """Cria a configuração a partir das variáveis de ambiente
+
+        Argumentos nomeados têm precedência sobre o ambiente (ex.: o
+        `pool_maxsize` derivado de --workers na CLI).
+        """
+        values = {
+            'pool_connections': int(os.getenv('SE_RANKING_POOL_HOSTS', '4')),
+            'pool_maxsize': int(os.getenv('SE_RANKING_POOL_SIZE', '10')),
+            'pool_block': _env_flag('SE_RANKING_POOL_BLOCK', '0'),
+            'connect_timeout': float(os.getenv('SE_RANKING_CONNECT_TIMEOUT', '5')),
+            'read_timeout': float(os.getenv('SE_RANKING_READ_TIMEOUT', '30')),
+            'keep_alive': _env_flag('SE_RANKING_KEEP_ALIVE', '1'),
+            'compression': _env_flag('SE_RANKING_COMPRESSION', '1'),
+            'session_mode': os.getenv('SE_RANKING_SESSION_MODE', SESSION_SHARED)
+        }
+        values.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**values)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """Timeout no formato do requests: (conexão, leitura)"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def headers(self) -> Dict[str, str]:
+        """Cabeçalhos fixos das sessões (compressão e keep-alive)"""
+        encodings = ['gzip', 'deflate']
+        if BROTLI_AVAILABLE:
+            encodings.append('br')
+        headers = {'Accept-Encoding': ', '.join(encodings) if self.compression else 'identity'}
+        headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+        return headers
+
+    def describe(self) -> Dict:
+        return {
+            'session_mode': self.session_mode,
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'pool_block': self.pool_block,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'keep_alive': self.keep_alive,
+            'accept_encoding': self.headers()['Accept-Encoding']
+        }
+
+
+class MeteredHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que conta requisições enviadas e conexões (sockets) abertas
+
+    As conexões são contadas no `connect()` das conexões do urllib3, então
+    reconexões de uma mesma conexão do pool (ex.: sem keep-alive) também
+    entram na conta.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._counter_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _count_connection(self):
+        with self._counter_lock:
+            self.connections_opened += 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        count = self._count_connection
+
+        class MeteredHTTPConnection(HTTPConnection):
+            def connect(self):
+                count()
+                return super().connect()
+
+        class MeteredHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                count()
+                return super().connect()
+
+        class MeteredHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = MeteredHTTPConnection
+
+        class MeteredHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = MeteredHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': MeteredHTTPConnectionPool,
+            'https': MeteredHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        with self._counter_lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+    def counters(self) -> Tuple[int, int]:
+        """(requisições, conexões abertas) desde a criação do adapter"""
+        with self._counter_lock:
+            return self.requests_sent, self.connections_opened
+
+
+class SessionPool:
+    """Sessões HTTP configuradas por TransportConfig, com métricas de reuso
+
+    No modo 'per-thread', as sessões de threads encerradas são fechadas (e
+    seus contadores acumulados) ao criar a próxima sessão; o modo é indicado
+    para pools fixos de threads, como o modo lote da CLI.
+    """
+
+    def __init__(self, config: TransportConfig = None):
+        self.config = config or TransportConfig.from_env()
+        self._lock = threading.Lock()
+        self._sessions = {}  # thread -> (sessão, adapter)
+        self._retired_requests = 0
+        self._retired_connections = 0
+        self._shared = None
+        if self.config.session_mode == SESSION_SHARED:
+            self._shared, self._shared_adapter = self._new_session()
+
+    def _new_session(self) -> Tuple[requests.Session, MeteredHTTPAdapter]:
+        config = self.config
+        session = requests.Session()
+        adapter = MeteredHTTPAdapter(pool_connections=config.pool_connections,
+                                     pool_maxsize=config.pool_maxsize,
+                                     pool_block=config.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(config.headers())
+        return session, adapter
+
+    @property
+    def session(self) -> requests.Session:
+        """Sessão compartilhada ou a sessão da thread atual"""
+        if self._shared is not None:
+            return self._shared
+
+        thread = threading.current_thread()
+        entry = self._sessions.get(thread)
+        if entry is None:
+            entry = self._new_session()
+            with self._lock:
+                self._prune()
+                self._sessions[thread] = entry
+        return entry[0]
+
+    def _prune(self):
+        """Fecha as sessões de threads que já terminaram"""
+        for thread in [thread for thread in self._sessions if not thread.is_alive()]:
+            session, adapter = self._sessions.pop(thread)
+            requests_count, connections = adapter.counters()
+            self._retired_requests += requests_count
+            self._retired_connections += connections
+            session.close()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET com os timeouts configurados (podem ser sobrescritos)"""
+        kwargs.setdefault('timeout', self.config.timeout)
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Requisições, conexões abertas e taxa de reaproveitamento de conexões"""
+        with self._lock:
+            if self._shared is not None:
+                adapters = [self._shared_adapter]
+            else:
+                self._prune()
+                adapters = [adapter for _, adapter in self._sessions.values()]
+            requests_count = self._retired_requests
+            connections = self._retired_connections
+            for adapter in adapters:
+                adapter_requests, adapter_connections = adapter.counters()
+                requests_count += adapter_requests
+                connections += adapter_connections
+
+        stats = self.config.describe()
+        stats.update({
+            'sessions': len(adapters),
+            'requests': requests_count,
+            'connections_opened': connections,
+            'connection_reuse_rate': round(1 - connections / requests_count, 3) if requests_count else 0.0
+        })
+        return stats
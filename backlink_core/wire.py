@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Formato e compressão das respostas da aplicação web
+
+- formato: 'rows' (padrão, um objeto por backlink) ou 'columns' (compacto,
+  ver `BacklinkTable.to_columns`), escolhido pelo parâmetro `format` ou
+  pelo cabeçalho Accept (`application/vnd.backlinks.columns+json`)
+- compressão: br (se o pacote `brotli` estiver instalado) ou gzip, conforme
+  o Accept-Encoding do cliente
+- ETag: hash do corpo sem compressão, para respostas 304 em visitas repetidas
+"""
+
+import gzip
+import hashlib
+from typing import Optional
+
+FORMAT_ROWS = 'rows'
+FORMAT_COLUMNS = 'columns'
+WIRE_FORMATS = (FORMAT_ROWS, FORMAT_COLUMNS)
+
+COLUMNS_MIMETYPE = 'application/vnd.backlinks.columns+json'
+
+# Tipos de conteúdo que valem a pena comprimir
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css',
+                          'application/javascript', 'text/csv', 'application/x-ndjson')
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def negotiate_format(requested: Optional[str], accept: str = '') -> str:
+    """Formato da resposta: o parâmetro explícito tem prioridade sobre o Accept"""
+    if requested:
+        if requested not in WIRE_FORMATS:
+            raise ValueError(f"Formato inválido: {requested} (use {', '.join(WIRE_FORMATS)})")
+        return requested
+    return FORMAT_COLUMNS if COLUMNS_MIMETYPE in (accept or '') else FORMAT_ROWS
+
+
+def _accepted_codings(accept_encoding: str) -> dict:
+    """Codificações do Accept-Encoding com seus pesos (q)"""
+    codings = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        codings[coding.strip().lower()] = weight
+    return codings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br', 'gzip' ou None, conforme o que o cliente aceita e o que está disponível"""
+    codings = _accepted_codings(accept_encoding)
+    candidates = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best = None
+    for coding in candidates:
+        weight = codings.get(coding, codings.get('*', 0.0))
+        if weight > 0 and (best is None or weight > best[1]):
+            best = (coding, weight)
+    return best[0] if best else None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Comprime o corpo (níveis intermediários: respostas geradas a cada requisição)"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def body_etag(body: bytes) -> str:
+    """ETag (sem aspas) do corpo sem compressão"""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão do modo lote com o cliente síncrono (threads + requests) x
+o cliente assíncrono (asyncio + httpx)
+
+Um servidor HTTP local imita /v1/backlinks/raw com páginas sintéticas e
+latência fixa por requisição, sem acessar a API real.
+
+Uso:
+    python benchmarks/bench_async_client.py [--domains 200] [--workers 32] [--latency-ms 50]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_backlinks
+
+
+def serve(pages: int, rows: int, latency: float) -> ThreadingHTTPServer:
+    """Stub da API: `pages` páginas de `rows` backlinks por domínio, cursor `next`"""
+    backlinks = generate_backlinks(rows)
+    bodies = []
+    for page in range(1, pages + 1):
+        cursor = f"p{page + 1}" if page < pages else None
+        bodies.append(json.dumps({'backlinks': backlinks, 'next': cursor}).encode('utf-8'))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            cursor = query.get('next', ['p1'])[0]
+            body = bodies[int(cursor[1:]) - 1]
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--domains', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    # Sem cache em disco e sem limite de vazão: mede só o cliente HTTP (a
+    # concorrência adaptativa começa na metade do máximo, isto é, em --workers)
+    os.environ.update({
+        'SE_RANKING_API_TOKEN': 'benchmark',
+        'BACKLINKS_CACHE_DISABLED': '1',
+        'BACKLINKS_HISTORY': 'off',
+        'SE_RANKING_RATE_LIMIT': '0',
+        'SE_RANKING_MAX_CONCURRENCY': str(args.workers * 2),
+        'BACKLINKS_CACHE_PATH': os.path.join(tempfile.gettempdir(), 'bench_async_cache.sqlite3')
+    })
+    from backlink_checker import BacklinkChecker, run_batch, run_batch_async
+
+    server = serve(args.pages, args.rows, args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    domains = [f"site{index}.com" for index in range(args.domains)]
+
+    checker = BacklinkChecker(max_rows=0, max_pages=0, pool_size=args.workers)
+    checker.base_url = url
+    sync_report = run_batch(checker, domains, args.workers, io.StringIO())
+
+    async_report = run_batch_async(domains, args.workers, io.StringIO(),
+                                   max_rows=0, max_pages=0, base_url=url)
+
+    requests_total = args.domains * args.pages
+    print(f"🌐 {args.domains} domínios x {args.pages} páginas ({requests_total} requisições), "
+          f"{args.workers} simultâneos, latência do stub {args.latency_ms:.0f} ms")
+    print(f"{'cliente':24} {'falhas':>7} {'tempo':>9} {'domínios/s':>11} {'p50':>8} {'p99':>8}")
+    for name, report in (('síncrono (threads)', sync_report), ('assíncrono (httpx)', async_report)):
+        print(f"{name:24} {report['failures']:>7} {report['wall_time_s']:>8.2f}s "
+              f"{report['throughput_domains_per_s']:>11.1f} "
+              f"{report['latency_p50_s']:>7.3f}s {report['latency_p99_s']:>7.3f}s")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: partida a frio da função Vercel (api/index.py) por modo de
+pré-aquecimento (BACKLINKS_PREWARM = off, dns, connect)
+
+Cada medição roda em um interpretador novo, que importa api.index e faz as
+primeiras requisições (`GET /` e `POST /analyze`) com o cliente de testes do
+Flask. A API é um servidor local que imita /v1/backlinks/raw, com atraso por
+conexão nova (no lugar do handshake TCP/TLS) e por requisição.
+
+Uso:
+    python benchmarks/bench_cold_start.py [--repeat 7] [--handshake-ms 40] [--latency-ms 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_backlinks
+
+MODES = ('off', 'dns', 'connect')
+
+
+def serve(rows: int, handshake: float, latency: float) -> ThreadingHTTPServer:
+    """Stub da API: uma página de `rows` backlinks; atraso por conexão e por requisição"""
+    body = json.dumps({'backlinks': generate_backlinks(rows), 'next': None}).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            time.sleep(handshake)
+            super().setup()
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def child():
+    """Executado no processo novo: inicialização e primeiras requisições, em JSON"""
+    started = time.perf_counter()
+    import api.index
+    init_ms = (time.perf_counter() - started) * 1000
+
+    client = api.index.app.test_client()
+    timings = {'init_ms': init_ms}
+    for name, call in (('index_ms', lambda: client.get('/')),
+                       ('analyze_ms', lambda: client.post('/analyze', json={
+                           'domain': 'example.com', 'include_backlinks': False}))):
+        request_started = time.perf_counter()
+        response = call()
+        timings[name] = (time.perf_counter() - request_started) * 1000
+        timings.setdefault('server_timing', response.headers.get('Server-Timing'))
+    print(json.dumps(timings))
+
+
+def run_child(mode: str, url: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=ROOT, SE_RANKING_API_TOKEN='benchmark', SE_RANKING_API_URL=url,
+               BACKLINKS_PREWARM=mode, BACKLINKS_CACHE_DISABLED='1', BACKLINKS_HISTORY='off', SE_RANKING_RATE_LIMIT='0')
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                          cwd=tempfile.gettempdir(), env=env, capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--handshake-ms', type=float, default=40.0)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    server = serve(args.rows, args.handshake_ms / 1000, args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Primeira execução fora da medição: compila os .pyc
+    run_child('off', url)
+
+    print(f"🧊 Partida a frio de api/index.py: mediana de {args.repeat} processos novos "
+          f"(handshake {args.handshake_ms:.0f} ms, latência {args.latency_ms:.0f} ms)")
+    print(f"{'modo':10} {'init':>9} {'GET /':>9} {'/analyze':>10} {'init+1ª req.':>13} {'processo':>10}")
+    examples = {}
+    for mode in MODES:
+        runs = [run_child(mode, url) for _ in range(args.repeat)]
+        examples[mode] = runs[-1]['server_timing']
+
+        def median(key):
+            return statistics.median(run[key] for run in runs)
+
+        first_request = median('index_ms') + median('analyze_ms')
+        print(f"{mode:10} {median('init_ms'):>7.1f}ms {median('index_ms'):>7.1f}ms "
+              f"{median('analyze_ms'):>8.1f}ms {median('init_ms') + first_request:>11.1f}ms "
+              f"{median('process_ms'):>8.1f}ms")
+
+    print("\nServer-Timing da primeira resposta (GET /):")
+    for mode, header in examples.items():
+        print(f"  {mode:8} {header}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão (linhas/s) e pico de memória da exportação de backlinks em
+CSV, NDJSON e Parquet, página a página (BacklinkExporter) x montando a lista
+completa antes de gravar
+
+As páginas (1.000 backlinks cada) são entregues uma a uma, como chegariam
+da API, a partir de um conjunto de páginas sintéticas geradas antes da
+medição; a saída vai para um arquivo temporário. No modo 'materialized', a
+lista completa (um dicionário por backlink) é montada antes da gravação: o
+tempo medido é só o da gravação, mas o pico de memória inclui a lista. Cada
+medição roda em um processo novo, para que o pico de memória (RSS) de uma
+não afete a outra.
+
+Uso:
+    python benchmarks/bench_export.py [--rows 1000000] [--formats csv ndjson parquet]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_ROWS = 1000
+# Páginas distintas geradas antes da medição (reutilizadas em ciclo)
+DISTINCT_PAGES = 20
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def iter_pages(pages, rows: int):
+    """`rows` backlinks em páginas de PAGE_ROWS, percorrendo `pages` em ciclo"""
+    for number, start in enumerate(range(0, rows, PAGE_ROWS)):
+        yield pages[number % len(pages)][:rows - start]
+
+
+def child(mode: str, export_format: str, rows: int):
+    """Executado no processo filho: uma exportação e as medições em JSON"""
+    from backlink_core.export import BacklinkExporter
+    from synthetic import generate_backlinks
+
+    pages = [generate_backlinks(PAGE_ROWS, seed=seed) for seed in range(DISTINCT_PAGES)]
+    baseline = max_rss_mb()
+    exporter = BacklinkExporter(export_format)
+    with tempfile.TemporaryFile() as output:
+        if mode == 'streaming':
+            source = iter_pages(pages, rows)
+        else:
+            # Lista completa em memória: um dicionário por backlink, como após ler todas as páginas
+            source = [[dict(backlink) for page in iter_pages(pages, rows) for backlink in page]]
+        started = time.perf_counter()
+        exporter.write_to(source, output)
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({'rows': exporter.rows, 'bytes': exporter.bytes, 'seconds': elapsed,
+                      'baseline_mb': baseline, 'peak_mb': max_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson', 'parquet'],
+                        choices=['csv', 'ndjson', 'parquet'])
+    parser.add_argument('--modes', nargs='+', default=['streaming', 'materialized'],
+                        choices=['streaming', 'materialized'])
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'FORMAT', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, export_format, rows = args.child
+        child(mode, export_format, int(rows))
+        return
+
+    rows_text = f"{args.rows:,}".replace(',', '.')
+    print(f"📤 Exportação de {rows_text} backlinks sintéticos")
+    print(f"{'formato':8} {'modo':13} {'tempo':>9} {'linhas/s':>10} {'arquivo':>10} "
+          f"{'RSS pico':>10} {'acréscimo':>10}")
+    for export_format in args.formats:
+        for mode in args.modes:
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, export_format, str(args.rows)],
+                capture_output=True, text=True, cwd=ROOT
+            )
+            if process.returncode != 0:
+                error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else 'erro'
+                print(f"{export_format:8} {mode:13} ⚠️  {error}")
+                continue
+            m = json.loads(process.stdout.strip().splitlines()[-1])
+            print(f"{export_format:8} {mode:13} {m['seconds']:>8.2f}s {m['rows'] / m['seconds']:>10,.0f} "
+                  f"{m['bytes'] / (1024 * 1024):>8.1f}MB {m['peak_mb']:>8.1f}MB "
+                  f"{m['peak_mb'] - m['baseline_mb']:>8.1f}MB".replace(',', '.'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: histórico das análises (HistoryStore) com N dias de análises
+diárias de um domínio cujo perfil cresce a cada dia
+
+Mede o acréscimo de cada análise (registro do ponto, âncoras, backlinks de
+maior rank e a tabela de strings) e as consultas de tendência por dia,
+semana e mês, do histórico inteiro e dos últimos 90 dias, além do tamanho
+dos arquivos. Os resultados das análises são montados antes da medição.
+
+Uso:
+    python benchmarks/bench_history.py [--days 730] [--runs 5]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backlink_core.aggregation import BacklinkStats
+from backlink_core.client import analysis_result
+from backlink_core.history import HistoryStore
+from synthetic import generate_backlinks
+
+DOMAIN = 'example.com'
+
+
+def make_results(days: int, rows_per_day: int = 20):
+    """Resultados de `days` análises diárias (com 10 backlinks de amostra cada)"""
+    backlinks = generate_backlinks(1000 + days * rows_per_day)
+    stats = BacklinkStats().add_batch(backlinks[:1000])
+    results = []
+    for day in range(days):
+        start = 1000 + day * rows_per_day
+        stats.add_batch(backlinks[start:start + rows_per_day])
+        sample = backlinks[start - 10:start]
+        results.append(analysis_result(DOMAIN, stats, None, False, 1, None, sample))
+    return results
+
+
+def fill(store: HistoryStore, results, first_day: float) -> list:
+    """Acrescenta um resultado por dia a partir de `first_day`; retorna os tempos (ms)"""
+    times = []
+    for day, result in enumerate(results):
+        started = time.perf_counter()
+        store.append(result, timestamp=first_day + day * 86400)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"🧪 Montando {args.days} análises diárias...")
+    results = make_results(args.days)
+    directory = tempfile.mkdtemp(prefix='bench_history_')
+    try:
+        store = HistoryStore(directory)
+        now = time.time()
+        appends = fill(store, results, now - args.days * 86400)
+        files = os.path.join(directory, DOMAIN)
+        size = sum(os.path.getsize(os.path.join(files, name)) for name in os.listdir(files))
+        print(f"💾 {size / 1024:.0f} KB em disco | acréscimo: mediana {statistics.median(appends):.2f}ms, "
+              f"máx {max(appends):.2f}ms")
+
+        for bucket in ('day', 'week', 'month'):
+            for label, since in (('tudo', None), ('90 dias', now - 90 * 86400)):
+                times = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    trend = store.trend(DOMAIN, bucket, since=since)
+                    times.append((time.perf_counter() - started) * 1000)
+                print(f"📈 {bucket:5} {label:8} {len(trend['buckets']):>4} períodos: "
+                      f"mediana {statistics.median(times):.1f}ms ({args.runs} execuções)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
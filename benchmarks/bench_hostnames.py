@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: extração de host com `hostnames.extract_host` x `urlparse().netloc`
+
+Uso:
+    python benchmarks/bench_hostnames.py [--rows 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backlink_core import hostnames
+from backlink_core.hostnames import extract_host, registrable_domain
+from synthetic import iter_backlinks
+
+
+def with_urlparse(urls):
+    hosts = set()
+    for url in urls:
+        try:
+            host = urlparse(url).netloc
+        except ValueError:
+            continue
+        if host:
+            hosts.add(host)
+    return hosts
+
+
+def with_extract_host(urls):
+    hosts = set()
+    for url in urls:
+        host = extract_host(url)
+        if host:
+            hosts.add(host)
+    return hosts
+
+
+def best_of(run, urls, repeat, reset=None):
+    best = float('inf')
+    for _ in range(repeat):
+        if reset:
+            reset()
+        started = time.perf_counter()
+        result = run(urls)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    urls = [backlink['url_from'] for backlink in iter_backlinks(args.rows)]
+
+    parse_time, parse_hosts = best_of(with_urlparse, urls, args.repeat)
+    cold_time, hosts = best_of(with_extract_host, urls, args.repeat,
+                               reset=hostnames._host_cache.clear)
+    warm_time, _ = best_of(with_extract_host, urls, args.repeat)
+    assert {host.lower() for host in parse_hosts} == hosts
+
+    started = time.perf_counter()
+    registrable = {registrable_domain(host) for host in hosts}
+    etld_time = time.perf_counter() - started
+
+    def number(value):
+        return f"{value:,}".replace(',', '.')
+
+    print(f"🔗 {number(len(urls))} URLs | {number(len(hosts))} hosts | "
+          f"{number(len(registrable))} domínios registráveis")
+    print(f"{'urlparse().netloc':32} {parse_time * 1000:9.1f} ms")
+    print(f"{'extract_host (memo vazia)':32} {cold_time * 1000:9.1f} ms  ({parse_time / cold_time:.1f}x)")
+    print(f"{'extract_host (memo aquecida)':32} {warm_time * 1000:9.1f} ms  ({parse_time / warm_time:.1f}x)")
+    print(f"{'registrable_domain (por host)':32} {etld_time * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
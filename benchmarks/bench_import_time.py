@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: custo de importação (partida a frio) da CLI, da aplicação web e do
+núcleo compartilhado, medido com `python -X importtime` em processos novos
+
+Com `--tree`, mede também outra cópia do projeto (ex.: um checkout anterior
+criado com `git worktree add /tmp/antes <commit>`) para comparar.
+
+Uso:
+    python benchmarks/bench_import_time.py [--repeat 7] [--tree /tmp/antes]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ('backlink_core', 'backlink_checker', 'app', 'api.index')
+
+
+def import_time_us(tree: str, module: str) -> int:
+    """Tempo cumulativo (µs) de `import module` em um interpretador novo"""
+    env = dict(os.environ, PYTHONPATH=tree, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=tree, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return -1
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return -1
+
+
+def measure(tree: str, repeat: int) -> dict:
+    """Mediana de `repeat` medições por módulo (None se não importável)"""
+    results = {}
+    for module in MODULES:
+        # A primeira execução compila os .pyc e aquece o cache do sistema de arquivos
+        import_time_us(tree, module)
+        samples = [import_time_us(tree, module) for _ in range(repeat)]
+        results[module] = None if min(samples) < 0 else statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--tree', metavar='CAMINHO', help='Outra cópia do projeto para comparar')
+    args = parser.parse_args()
+
+    current = measure(ROOT, args.repeat)
+    other = measure(os.path.abspath(args.tree), args.repeat) if args.tree else None
+
+    def fmt(value):
+        return f"{value / 1000:>9.1f} ms" if value is not None else f"{'—':>12}"
+
+    header = f"{'módulo':20} {'atual':>12}"
+    if other is not None:
+        header += f" {'--tree':>12} {'diferença':>10}"
+    print(f"⏱️  python -X importtime, mediana de {args.repeat} processos")
+    print(header)
+    for module in MODULES:
+        line = f"{module:20} {fmt(current[module])}"
+        if other is not None:
+            line += f" {fmt(other[module])}"
+            if current[module] is not None and other[module]:
+                line += f" {current[module] / other[module] - 1:>+9.0%}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tempo de `compare_profiles` (link gap, únicos, comuns e matriz de
+sobreposição) para N perfis com M domínios de referência cada
+
+Os perfis são sorteados de um universo comum de domínios com popularidade
+desigual (alguns domínios aparecem em quase todos os perfis, a maioria em
+poucos), como em nichos reais. Mede só a comparação, sem acessar a API.
+
+Uso:
+    python benchmarks/bench_link_gap.py [--profiles 10] [--domains 100000] [--runs 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backlink_core.link_gap import compare_profiles
+
+TLDS = ('com', 'com.br', 'org', 'net', 'io', 'edu', 'co.uk', 'de')
+
+
+def make_profiles(count: int, size: int, seed: int = 42):
+    """`count` perfis de `size` domínios, de um universo de 4 * `size` domínios"""
+    rng = random.Random(seed)
+    universe = [f"site{index}.{TLDS[index % len(TLDS)]}" for index in range(size * 4)]
+    # Pesos decrescentes: os primeiros domínios do universo são os mais citados
+    weights = [1.0 / (index + 10) ** 0.5 for index in range(len(universe))]
+    profiles = {}
+    for number in range(count):
+        domains = set()
+        while len(domains) < size:
+            domains.update(rng.choices(universe, weights, k=size - len(domains)))
+        profiles[f"concorrente{number}.com"] = domains
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=10)
+    parser.add_argument('--domains', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--min-competitors', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"🧪 Gerando {args.profiles} perfis de {args.domains:,} domínios...".replace(',', '.'))
+    profiles = make_profiles(args.profiles, args.domains)
+    target = next(iter(profiles))
+
+    times = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = compare_profiles(profiles, target=target, min_competitors=args.min_competitors)
+        times.append((time.perf_counter() - started) * 1000)
+
+    print(f"🌍 União: {result['union']:,} domínios | comuns a todos: {result['common_to_all']['count']:,} | "
+          f"gap (≥ {args.min_competitors}): {result['gap']['count']:,}".replace(',', '.'))
+    print(f"⏱️  compare_profiles: mediana {statistics.median(times):.0f}ms | "
+          f"mín {min(times):.0f}ms | máx {max(times):.0f}ms ({args.runs} execuções)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: escalabilidade da agregação em vários processos (ParallelAggregator)
+com 1, 2, 4 e 8 workers, contra a agregação serial no processo principal
+
+As páginas (1.000 backlinks cada) são corpos JSON sintéticos gerados antes da
+medição, como chegariam da API; mede-se a decodificação e a agregação de
+todas elas. No modo serial, cada página passa por `json.loads` e
+`add_batch` no processo principal (o que `analyze_domain` faz hoje); nos
+demais, pelo pool de processos, com os corpos em memória compartilhada. O
+pool é criado e aquecido antes da medição. O resumo de cada modo é conferido
+com o serial.
+
+Uso:
+    python benchmarks/bench_parallel_aggregation.py [--rows 500000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backlink_core.aggregation import BacklinkStats
+from backlink_core.json_stream import iter_batches
+from backlink_core.parallel import ParallelAggregator
+from synthetic import generate_backlinks
+
+PAGE_ROWS = 1000
+
+
+def make_bodies(rows: int):
+    """Corpos JSON das páginas de um perfil sintético de `rows` backlinks"""
+    backlinks = generate_backlinks(rows)
+    bodies = []
+    for start in range(0, rows, PAGE_ROWS):
+        cursor = str(start + PAGE_ROWS) if start + PAGE_ROWS < rows else None
+        bodies.append(json.dumps({'backlinks': backlinks[start:start + PAGE_ROWS],
+                                  'next': cursor}).encode('utf-8'))
+    return bodies
+
+
+def serial(bodies) -> BacklinkStats:
+    stats = BacklinkStats()
+    for body in bodies:
+        for batch in iter_batches(json.loads(body).get('backlinks') or []):
+            stats.add_batch(batch)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"🧪 Gerando {args.rows:,} backlinks sintéticos...".replace(',', '.'))
+    bodies = make_bodies(args.rows)
+    megabytes = sum(len(body) for body in bodies) / (1024 * 1024)
+    print(f"📦 {len(bodies)} páginas, {megabytes:.0f} MB de JSON | {os.cpu_count()} CPUs")
+
+    started = time.perf_counter()
+    expected = serial(bodies).summary()
+    baseline = time.perf_counter() - started
+    print(f"{'modo':10} {'tempo':>8} {'linhas/s':>10} {'aceleração':>11}")
+    print(f"{'serial':10} {baseline:>7.2f}s {args.rows / baseline:>10,.0f} {1.0:>10.2f}x".replace(',', '.'))
+
+    for workers in args.workers:
+        aggregator = ParallelAggregator(workers)
+        try:
+            aggregator.aggregate(bodies[:workers])
+            started = time.perf_counter()
+            stats = aggregator.aggregate(bodies)
+            elapsed = time.perf_counter() - started
+        finally:
+            aggregator.close()
+        check = '' if stats.summary() == expected else '  ⚠️  resumo diferente do serial'
+        print(f"{f'{workers} proc.':10} {elapsed:>7.2f}s {args.rows / elapsed:>10,.0f} "
+              f"{baseline / elapsed:>10.2f}x{check}".replace(',', '.'))
+
+
+if __name__ == '__main__':
+    main()
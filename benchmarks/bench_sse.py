@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tempo até os primeiros backlinks na tela, `POST /analyze` x
+`GET /analyze/stream` (Server-Sent Events)
+
+Com o /analyze, nada aparece antes do fim da análise; com o streaming, o
+primeiro evento `rows` sai assim que a primeira página da API é processada.
+As requisições passam pelo cliente de testes do Flask e a API é um servidor
+local com várias páginas e latência fixa por requisição.
+
+Uso:
+    python benchmarks/bench_sse.py [--pages 10] [--rows 1000] [--latency-ms 200] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_async_client import serve
+
+
+def measure_analyze(client) -> dict:
+    started = time.perf_counter()
+    response = client.post('/analyze', json={'domain': 'example.com', 'cache': 'bypass',
+                                             'include_backlinks': False})
+    total = (time.perf_counter() - started) * 1000
+    assert response.get_json()['success'], response.get_json()
+    return {'first_stats_ms': total, 'first_rows_ms': total, 'total_ms': total}
+
+
+def measure_stream(client) -> dict:
+    started = time.perf_counter()
+    response = client.get('/analyze/stream?domain=example.com&cache=bypass&rows=20', buffered=False)
+    timings = {}
+    buffer = ''
+    for chunk in response.response:
+        buffer += chunk.decode('utf-8')
+        while '\n\n' in buffer:
+            event, buffer = buffer.split('\n\n', 1)
+            name = event.split('\n', 1)[0][len('event: '):]
+            elapsed = (time.perf_counter() - started) * 1000
+            if name == 'stats':
+                timings.setdefault('first_stats_ms', elapsed)
+            elif name == 'rows':
+                timings.setdefault('first_rows_ms', elapsed)
+            elif name in ('done', 'failure'):
+                assert name == 'done', event
+                timings['total_ms'] = elapsed
+    response.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=200.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    server = serve(args.pages, args.rows, args.latency_ms / 1000)
+    os.environ.update(SE_RANKING_API_TOKEN='benchmark', SE_RANKING_RATE_LIMIT='0',
+                      BACKLINKS_CACHE_DISABLED='1', BACKLINKS_HISTORY='off',
+                      SE_RANKING_API_URL=f"http://127.0.0.1:{server.server_address[1]}")
+    from app import app
+
+    client = app.test_client()
+    print(f"📡 {args.pages} páginas de {args.rows} backlinks, latência {args.latency_ms:.0f} ms "
+          f"(mediana de {args.repeat})")
+    print(f"{'endpoint':18} {'1º resumo':>11} {'1ªs linhas':>11} {'total':>11}")
+    for name, measure in (('/analyze', measure_analyze), ('/analyze/stream', measure_stream)):
+        runs = [measure(client) for _ in range(args.repeat)]
+
+        def median(key):
+            return statistics.median(run[key] for run in runs)
+
+        print(f"{name:18} {median('first_stats_ms'):>9.0f}ms {median('first_rows_ms'):>9.0f}ms "
+              f"{median('total_ms'):>9.0f}ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
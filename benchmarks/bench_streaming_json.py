@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pico de memória (RSS) da leitura de uma página grande de backlinks,
+com `response.json()` x decodificação em streaming (`json_stream`)
+
+Um servidor HTTP local serve uma resposta sintética de /v1/backlinks/raw
+(~50 MB por padrão); cada medição roda em um processo novo, que usa o
+BacklinkClient do núcleo (backlink_core) apontado para esse servidor.
+
+Uso:
+    python benchmarks/bench_streaming_json.py [--megabytes 50]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import iter_backlinks
+
+
+def write_body(path: str, megabytes: int) -> int:
+    """Grava uma resposta sintética com ~`megabytes` MB; retorna o nº de linhas"""
+    target = megabytes * 1024 * 1024
+    written = rows = 0
+    with open(path, 'wb') as f:
+        f.write(b'{"backlinks": [')
+        for backlink in iter_backlinks(10 ** 9):
+            chunk = (b', ' if rows else b'') + json.dumps(backlink).encode('utf-8')
+            f.write(chunk)
+            written += len(chunk)
+            rows += 1
+            if written >= target:
+                break
+        f.write(b'], "next": null}')
+    return rows
+
+
+def serve(path: str) -> ThreadingHTTPServer:
+    """Servidor local que responde qualquer GET com o corpo gravado em `path`"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(256 * 1024)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def child(mode: str, url: str):
+    """Executado no processo filho: uma análise e as medições em JSON"""
+    os.environ.update({
+        'SE_RANKING_API_TOKEN': 'benchmark',
+        'BACKLINKS_CACHE_DISABLED': '1',
+        'BACKLINKS_HISTORY': 'off',
+        'BACKLINKS_MAX_ROWS': '0',
+        'BACKLINKS_MAX_PAGES': '1',
+        'BACKLINKS_STREAM_JSON': '1' if mode.startswith('streaming') else '0'
+    })
+    from backlink_core import BacklinkClient, BacklinkStats
+    from backlink_core.json_stream import iter_batches
+
+    checker = BacklinkClient(base_url=url)
+    baseline = max_rss_mb()
+
+    started = time.perf_counter()
+    if mode.endswith('+table'):
+        result = checker.analyze_domain('example.com')
+        rows = result['total_backlinks']
+    else:
+        stats = BacklinkStats()
+        for page in checker.iter_backlinks('example.com'):
+            for batch in iter_batches(page['backlinks']):
+                stats.add_batch(batch)
+        rows = stats.total_backlinks
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({'rows': rows, 'seconds': elapsed,
+                      'baseline_mb': baseline, 'peak_mb': max_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=int, default=50)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'URL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'backlinks.json')
+        rows = write_body(path, args.megabytes)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        server = serve(path)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        rows_text = f"{rows:,}".replace(',', '.')
+        print(f"📦 Resposta sintética: {size_mb:.1f} MB, {rows_text} backlinks")
+        print(f"{'modo':28} {'linhas':>9} {'tempo':>9} {'RSS base':>10} {'RSS pico':>10} {'acréscimo':>10}")
+        for mode in ('buffered', 'streaming', 'buffered+table', 'streaming+table'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, url],
+                check=True, capture_output=True, text=True, cwd=ROOT
+            ).stdout
+            m = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:28} {m['rows']:>9} {m['seconds']:>8.2f}s "
+                  f"{m['baseline_mb']:>8.1f}MB {m['peak_mb']:>8.1f}MB "
+                  f"{m['peak_mb'] - m['baseline_mb']:>8.1f}MB")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
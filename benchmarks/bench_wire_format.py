@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tamanho e tempo de geração da resposta do /analyze com todos os
+backlinks, formato 'rows' (um objeto por backlink) x 'columns' (compacto),
+sem compressão, com gzip e com br (se o pacote brotli estiver instalado)
+
+Usa a tabela montada a partir de backlinks sintéticos, sem acessar a API.
+
+Uso:
+    python benchmarks/bench_wire_format.py [--rows 1000 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backlink_core.backlink_table import BacklinkTable
+from backlink_core.wire import brotli, compress_body
+from synthetic import generate_backlinks
+
+
+def timed(function):
+    started = time.perf_counter()
+    value = function()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    encodings = ('gzip', 'br') if brotli is not None else ('gzip',)
+    print(f"{'linhas':>8} {'formato':8} {'gerar':>9} {'JSON':>10}"
+          + ''.join(f" {encoding:>10} {'(ms)':>7}" for encoding in encodings))
+    for rows in args.rows:
+        table = BacklinkTable.from_backlinks(generate_backlinks(rows))
+        for name, build in (('rows', table.to_rows), ('columns', table.to_columns)):
+            body, build_ms = timed(lambda: json.dumps({'all_backlinks': build()}).encode('utf-8'))
+            line = f"{rows:>8} {name:8} {build_ms:>7.1f}ms {len(body) / 1024:>8.0f}KB"
+            for encoding in encodings:
+                compressed, compress_ms = timed(lambda: compress_body(body, encoding))
+                line += f" {len(compressed) / 1024:>8.0f}KB {compress_ms:>7.1f}"
+            print(line)
+    if brotli is None:
+        print("\nℹ️  br não medido: instale o pacote brotli")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o endpoint /v1/backlinks/raw da SE Ranking, para
+benchmarks e desenvolvimento sem consumir a API real
+
+- cada domínio tem um perfil de `rows` backlinks sintéticos (synthetic.py,
+  mesmos campos de API_FIELDS_DOCUMENTATION.md), determinístico por domínio
+  e posição: a mesma página tem sempre o mesmo conteúdo
+- paginação por `limit` (até `max_limit` linhas por resposta) e cursor `next`
+- `order_by=first_seen`: do mais recente para o mais antigo, com o backlink
+  de posição `i` visto pela primeira vez no dia 2000-01-01 + `i`, de modo que
+  os acrescentados com `set_rows` são os mais novos (análise incremental)
+- latência fixa por requisição e atraso por conexão nova (no lugar do
+  handshake TCP/TLS)
+- injeção de HTTP 429 (uma fração das requisições, com semente fixa), com
+  `Retry-After`
+- `apiKey` obrigatório (403 sem ele), como na API real
+
+Uso como servidor:
+    python benchmarks/mock_api.py [--port 8765] [--rows 10000] [--latency-ms 50] [--throttle-rate 0.05]
+    SE_RANKING_API_URL=http://127.0.0.1:8765 SE_RANKING_API_TOKEN=mock python app.py
+
+Uso nos benchmarks:
+    with MockAPIServer(rows=5000, latency=0.02) as api:
+        client = BacklinkClient(base_url=api.url)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_backlink
+
+ENDPOINT = '/v1/backlinks/raw'
+
+# Páginas já serializadas mantidas em memória (por domínio, início e tamanho)
+PAGE_CACHE_SIZE = 256
+
+
+def profile_rows(domain: str, start: int, count: int, seed: int = 42) -> List[Dict]:
+    """Backlinks `start` a `start + count` do perfil sintético do domínio"""
+    rows = []
+    for index in range(start, start + count):
+        rng = random.Random(f"{seed}:{domain}:{index}")
+        rows.append(make_backlink(index, rng, target=domain))
+    return rows
+
+
+def ordered_rows(domain: str, start: int, count: int, total: int, seed: int = 42) -> List[Dict]:
+    """Como `profile_rows`, na ordem de `order_by=first_seen` (ver o módulo)"""
+    rows = []
+    for index in range(total - 1 - start, total - 1 - start - count, -1):
+        row = profile_rows(domain, index, 1, seed)[0]
+        row['first_seen'] = (date(2000, 1, 1) + timedelta(days=index)).isoformat()
+        rows.append(row)
+    return rows
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    """Stub de /v1/backlinks/raw em uma thread; `url` vai em SE_RANKING_API_URL"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, rows: int = 10000, max_limit: int = 1000, latency: float = 0.0,
+                 handshake: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 0.0,
+                 seed: int = 42, host: str = '127.0.0.1', port: int = 0):
+        self.rows = rows
+        self.max_limit = max_limit
+        self.latency = latency
+        self.handshake = handshake
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+        self.requests = 0
+        self.throttled = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        super().__init__((host, port), _Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockAPIServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'MockAPIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'requests': self.requests, 'throttled': self.throttled,
+                    'connections': self.connections, 'bytes_sent': self.bytes_sent}
+
+    def set_rows(self, rows: int):
+        """Muda o tamanho dos perfis (links novos ou perdidos na próxima análise)"""
+        with self._lock:
+            self.rows = rows
+            self._pages.clear()
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            throttle = self.throttle_rate > 0 and self._rng.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+            return throttle
+
+    def page_body(self, domain: str, start: int, limit: int, order_by: Optional[str] = None) -> bytes:
+        """Corpo JSON da página (com cache das páginas mais recentes)"""
+        key = (domain, start, limit, order_by)
+        with self._lock:
+            body = self._pages.get(key)
+            if body is not None:
+                self._pages.move_to_end(key)
+                return body
+
+        count = max(0, min(limit, self.rows - start))
+        end = start + count
+        cursor = str(end) if count and end < self.rows else None
+        if order_by == 'first_seen':
+            backlinks = ordered_rows(domain, start, count, self.rows, self.seed)
+        else:
+            backlinks = profile_rows(domain, start, count, self.seed)
+        body = json.dumps({
+            'backlinks': backlinks,
+            'next': cursor
+        }).encode('utf-8')
+
+        with self._lock:
+            self._pages[key] = body
+            if len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: MockAPIServer
+
+    def setup(self):
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+        with self.server._lock:
+            self.server.connections += 1
+        super().setup()
+
+    def _send_json(self, status: int, payload, headers: Optional[Dict] = None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.bytes_sent += len(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != ENDPOINT:
+            self._send_json(404, {'message': 'Not found'})
+            return
+
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if not query.get('apiKey'):
+            self._send_json(403, {'message': 'API key is required'})
+            return
+        if self.server.should_throttle():
+            self._send_json(429, {'message': 'Too many requests'},
+                            {'Retry-After': f"{self.server.retry_after:g}"})
+            return
+
+        try:
+            limit = min(int(query.get('limit', 100)), self.server.max_limit)
+            start = int(query.get('next') or 0)
+        except ValueError:
+            self._send_json(400, {'message': 'Invalid limit or next'})
+            return
+        domain = query.get('target', 'example.com')
+        self._send_json(200, self.server.page_body(domain, start, limit, query.get('order_by')))
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rows', type=int, default=10000, help='Backlinks por domínio')
+    parser.add_argument('--max-limit', type=int, default=1000, help='Máximo de linhas por página')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--handshake-ms', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fração das requisições com HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After (s) das respostas 429')
+    args = parser.parse_args()
+
+    server = MockAPIServer(rows=args.rows, max_limit=args.max_limit, latency=args.latency_ms / 1000,
+                           handshake=args.handshake_ms / 1000, throttle_rate=args.throttle_rate,
+                           retry_after=args.retry_after, host=args.host, port=args.port)
+    print(f"🧪 API simulada em {server.url}{ENDPOINT} ({args.rows} backlinks por domínio)")
+    print(f"💡 Use: SE_RANKING_API_URL={server.url} SE_RANKING_API_TOKEN=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n⏹️  Encerrado: {server.stats()}")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks reprodutíveis, com a API simulada (mock_api.py)
+
+Grupos:
+- fetch: paginação do BacklinkClient (leitura normal, em streaming e com
+  HTTP 429 injetado)
+- aggregation: BacklinkStats, BacklinkTable, analyze_domain, link gap e
+  tendência do histórico
+- formatting: materialização das linhas, formato compacto, consulta
+  paginada, exportação CSV e serialização da resposta do /analyze
+- flask: rota /analyze sob carga concorrente (servidor HTTP real com
+  threads), com e sem o cache de resultados
+
+Cada benchmark roda `--rounds` vezes após um aquecimento e informa min, max,
+média, mediana, desvio padrão, IQR e ops/s, no formato do pytest-benchmark
+(`--json`), para comparar com uma execução anterior (`--compare`).
+
+Uso:
+    python benchmarks/suite.py [--quick] [-k fetch] [--json resultados.json]
+    python benchmarks/suite.py --compare base.json [--threshold 10] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_api import MockAPIServer
+from synthetic import generate_backlinks
+
+BENCHMARKS = []
+
+
+def benchmark(group: str):
+    """Registra uma função `(bench, config)` como benchmark do grupo"""
+    def register(function):
+        BENCHMARKS.append((group, function.__name__, function))
+        return function
+    return register
+
+
+class Bench:
+    """Mede uma chamada repetidas vezes (equivalente à fixture do pytest-benchmark)"""
+
+    def __init__(self, rounds: int, warmup: int):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.timings = []
+        self.extra_info = {}
+
+    def __call__(self, function: Callable, *args, **kwargs):
+        for _ in range(self.warmup):
+            function(*args, **kwargs)
+        result = None
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            result = function(*args, **kwargs)
+            self.timings.append(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> Dict:
+        timings = sorted(self.timings)
+        mean = statistics.fmean(timings)
+        quartiles = statistics.quantiles(timings, n=4) if len(timings) > 1 else [timings[0]] * 3
+        return {
+            'min': timings[0],
+            'max': timings[-1],
+            'mean': mean,
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            'median': statistics.median(timings),
+            'iqr': quartiles[2] - quartiles[0],
+            'rounds': len(timings),
+            'ops': 1 / mean if mean else 0.0
+        }
+
+
+class Config:
+    """Tamanhos dos dados e servidores compartilhados entre os benchmarks"""
+
+    def __init__(self, quick: bool, latency_ms: float):
+        self.profile_rows = 5000 if quick else 20000
+        self.aggregation_rows = 20000 if quick else 100000
+        self.format_rows = 5000 if quick else 20000
+        # Link gap: perfis x domínios de referência por perfil
+        self.link_gap_profiles = (5, 20000) if quick else (10, 100000)
+        # Histórico: dias de análises diárias
+        self.history_days = 180 if quick else 730
+        self.concurrency = 8 if quick else 16
+        self.requests_per_round = 32 if quick else 128
+        self.latency = latency_ms / 1000
+        self.api = MockAPIServer(rows=self.profile_rows, latency=self.latency).start()
+        self.throttled_api = MockAPIServer(rows=self.profile_rows, latency=self.latency,
+                                           throttle_rate=0.2, retry_after=0).start()
+        self._backlinks = {}
+        self._tables = {}
+
+    def backlinks(self, rows: int) -> List[Dict]:
+        if rows not in self._backlinks:
+            self._backlinks[rows] = generate_backlinks(rows)
+        return self._backlinks[rows]
+
+    def table(self, rows: int):
+        from backlink_core import BacklinkTable
+
+        if rows not in self._tables:
+            self._tables[rows] = BacklinkTable.from_backlinks(self.backlinks(rows))
+        return self._tables[rows]
+
+    def client(self, base_url: Optional[str] = None, **kwargs):
+        from backlink_core import BacklinkClient
+        from backlink_core.rate_limiter import RateLimiter
+
+        client = BacklinkClient(base_url=base_url or self.api.url, max_rows=0, max_pages=0,
+                                cache_mode='bypass', **kwargs)
+        # Sem limite de vazão e com backoff curto: mede o cliente, não a espera
+        client.limiter = RateLimiter(rate=0, burst=1, max_concurrency=64, max_retries=8,
+                                     backoff_base=0.001, backoff_max=0.01)
+        return client
+
+    def close(self):
+        self.api.stop()
+        self.throttled_api.stop()
+
+
+def consume(client, domain: str) -> int:
+    rows = 0
+    for page in client.iter_backlinks(domain):
+        for _ in page['backlinks']:
+            rows += 1
+    return rows
+
+
+# fetch
+
+@benchmark('fetch')
+def fetch_buffered(bench: Bench, config: Config):
+    client = config.client(stream_json=False)
+    rows = bench(consume, client, 'example.com')
+    bench.extra_info.update(rows=rows, rows_per_s=rows * bench.stats()['ops'])
+
+
+@benchmark('fetch')
+def fetch_streaming(bench: Bench, config: Config):
+    client = config.client(stream_json=True)
+    rows = bench(consume, client, 'example.com')
+    bench.extra_info.update(rows=rows, rows_per_s=rows * bench.stats()['ops'])
+
+
+@benchmark('fetch')
+def fetch_with_429(bench: Bench, config: Config):
+    client = config.client(base_url=config.throttled_api.url)
+    rows = bench(consume, client, 'example.com')
+    bench.extra_info.update(rows=rows, throttle_rate=config.throttled_api.throttle_rate,
+                            retries=client.limiter.throttled)
+
+
+# aggregation
+
+@benchmark('aggregation')
+def aggregation_stats(bench: Bench, config: Config):
+    from backlink_core import BacklinkStats
+    from backlink_core.json_stream import iter_batches
+
+    backlinks = config.backlinks(config.aggregation_rows)
+
+    def run():
+        stats = BacklinkStats()
+        for batch in iter_batches(iter(backlinks)):
+            stats.add_batch(batch)
+        return stats.summary()
+
+    bench(run)
+    bench.extra_info['rows'] = len(backlinks)
+
+
+@benchmark('aggregation')
+def aggregation_table(bench: Bench, config: Config):
+    from backlink_core import BacklinkTable
+
+    backlinks = config.backlinks(config.aggregation_rows)
+    bench(BacklinkTable.from_backlinks, backlinks)
+    bench.extra_info['rows'] = len(backlinks)
+
+
+@benchmark('aggregation')
+def analyze_domain(bench: Bench, config: Config):
+    client = config.client()
+    result = bench(client.analyze_domain, 'example.com')
+    bench.extra_info['rows'] = result['total_backlinks']
+
+
+@benchmark('aggregation')
+def aggregation_link_gap(bench: Bench, config: Config):
+    from backlink_core.link_gap import compare_profiles
+    from bench_link_gap import make_profiles
+
+    profiles = make_profiles(*config.link_gap_profiles)
+    result = bench(compare_profiles, profiles, target=next(iter(profiles)), min_competitors=2)
+    bench.extra_info.update(profiles=len(profiles), union=result['union'], gap=result['gap']['count'])
+
+
+@benchmark('aggregation')
+def aggregation_history_trend(bench: Bench, config: Config):
+    import tempfile
+    from backlink_core.history import HistoryStore
+    from bench_history import DOMAIN, fill, make_results
+
+    with tempfile.TemporaryDirectory(prefix='bench_history_') as directory:
+        store = HistoryStore(directory)
+        fill(store, make_results(config.history_days), time.time() - config.history_days * 86400)
+        trend = bench(store.trend, DOMAIN, 'week')
+    bench.extra_info.update(points=trend['points'], buckets=len(trend['buckets']))
+
+
+# formatting
+
+@benchmark('formatting')
+def format_to_rows(bench: Bench, config: Config):
+    table = config.table(config.format_rows)
+    bench(table.to_rows)
+    bench.extra_info['rows'] = len(table)
+
+
+@benchmark('formatting')
+def format_to_columns(bench: Bench, config: Config):
+    table = config.table(config.format_rows)
+    bench(table.to_columns)
+    bench.extra_info['rows'] = len(table)
+
+
+@benchmark('formatting')
+def format_query_page(bench: Bench, config: Config):
+    table = config.table(config.format_rows)
+    bench(table.query, link_type='dofollow', anchor='seo', min_rank=20, sort='domain_rank', page=3)
+    bench.extra_info['rows'] = len(table)
+
+
+@benchmark('formatting')
+def format_export_csv(bench: Bench, config: Config):
+    from backlink_core.export import BacklinkExporter
+
+    backlinks = config.backlinks(config.format_rows)
+
+    def run():
+        exporter = BacklinkExporter('csv')
+        for _ in exporter.iter_chunks([backlinks]):
+            pass
+        return exporter.bytes
+
+    size = bench(run)
+    bench.extra_info.update(rows=len(backlinks), bytes=size)
+
+
+@benchmark('formatting')
+def format_analyze_json(bench: Bench, config: Config):
+    table = config.table(config.format_rows)
+    bench(lambda: json.dumps({'all_backlinks': table.to_rows()}))
+    bench.extra_info['rows'] = len(table)
+
+
+# flask
+
+def load_round(url: str, bodies: List[Dict], concurrency: int, latencies: List[float]):
+    """Envia `bodies` ao /analyze com `concurrency` threads (uma sessão HTTP cada)"""
+    import requests
+
+    pending = list(bodies)
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    body = pending.pop()
+                started = time.perf_counter()
+                response = session.post(f"{url}/analyze", json=body, timeout=60)
+                elapsed = time.perf_counter() - started
+                if response.status_code != 200 or not response.json().get('success'):
+                    errors.append(response.text[:200])
+                with lock:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise RuntimeError(f"/analyze falhou: {errors[0]}")
+
+
+def flask_load(bench: Bench, config: Config, bodies: List[Dict]):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    from app import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    latencies = []
+    try:
+        bench(load_round, url, bodies, config.concurrency, latencies)
+    finally:
+        server.shutdown()
+
+    latencies.sort()
+    bench.extra_info.update(
+        requests=len(bodies),
+        concurrency=config.concurrency,
+        requests_per_s=len(bodies) / bench.stats()['median'],
+        latency_p50_ms=latencies[len(latencies) // 2] * 1000,
+        latency_p95_ms=latencies[int(len(latencies) * 0.95)] * 1000,
+        latency_p99_ms=latencies[int(len(latencies) * 0.99)] * 1000
+    )
+
+
+@benchmark('flask')
+def flask_analyze_concurrent(bench: Bench, config: Config):
+    """Domínios distintos, sem cache: cada requisição percorre a API simulada"""
+    bodies = [{'domain': f"site{index}.com", 'cache': 'bypass', 'include_backlinks': False}
+              for index in range(config.requests_per_round)]
+    flask_load(bench, config, bodies)
+
+
+@benchmark('flask')
+def flask_analyze_cached(bench: Bench, config: Config):
+    """Mesmo domínio: a primeira análise fica no cache de resultados"""
+    bodies = [{'domain': 'example.com', 'include_backlinks': False}] * config.requests_per_round
+    flask_load(bench, config, bodies)
+
+
+# Execução e relatório
+
+def machine_info() -> Dict:
+    return {
+        'node': platform.node(),
+        'processor': platform.processor(),
+        'machine': platform.machine(),
+        'python_implementation': platform.python_implementation(),
+        'python_version': platform.python_version(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def commit_info() -> Dict:
+    def git(*args) -> str:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    try:
+        return {'id': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+                'branch': git('rev-parse', '--abbrev-ref', 'HEAD')}
+    except OSError:
+        return {}
+
+
+def run(args) -> Dict:
+    # Antes de importar o app: API simulada, sem cache em disco nem limite de vazão
+    config = Config(args.quick, args.latency_ms)
+    os.environ.update({
+        'SE_RANKING_API_TOKEN': 'benchmark',
+        'SE_RANKING_API_URL': config.api.url,
+        'SE_RANKING_RATE_LIMIT': '0',
+        'SE_RANKING_MAX_CONCURRENCY': '64',
+        'BACKLINKS_CACHE_DISABLED': '1',
+        'BACKLINKS_HISTORY': 'off',
+        'BACKLINKS_MAX_ROWS': '0',
+        'BACKLINKS_MAX_PAGES': '0'
+    })
+
+    results = []
+    try:
+        for group, name, function in BENCHMARKS:
+            fullname = f"{group}::{name}"
+            if args.k and not any(pattern in fullname for pattern in args.k):
+                continue
+            bench = Bench(args.rounds, args.warmup)
+            function(bench, config)
+            stats = bench.stats()
+            results.append({'group': group, 'name': name, 'fullname': fullname, 'params': None,
+                            'stats': stats, 'extra_info': bench.extra_info})
+            print(f"  {fullname:40} {stats['median'] * 1000:>10.2f}ms "
+                  f"(±{stats['stddev'] * 1000:.2f}) {stats['ops']:>10.1f} ops/s", file=sys.stderr)
+    finally:
+        config.close()
+
+    return {
+        'machine_info': machine_info(),
+        'commit_info': commit_info(),
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'version': '1',
+        'options': {'quick': args.quick, 'rounds': args.rounds, 'warmup': args.warmup,
+                    'latency_ms': args.latency_ms},
+        'benchmarks': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Imprime a variação da mediana por benchmark; retorna os que pioraram além do limite"""
+    previous = {item['fullname']: item['stats'] for item in baseline['benchmarks']}
+    regressions = []
+    print(f"\n📊 Comparação com {baseline.get('commit_info', {}).get('id', '?')[:10]} "
+          f"(mediana; limite {threshold:.0f}%)", file=sys.stderr)
+    for item in current['benchmarks']:
+        before = previous.get(item['fullname'])
+        if not before:
+            print(f"  {item['fullname']:40} (novo)", file=sys.stderr)
+            continue
+        change = (item['stats']['median'] / before['median'] - 1) * 100
+        marker = '✅'
+        if change > threshold:
+            marker = '❌'
+            regressions.append(item['fullname'])
+        elif change < -threshold:
+            marker = '⚡'
+        print(f"  {marker} {item['fullname']:40} {before['median'] * 1000:>9.2f}ms → "
+              f"{item['stats']['median'] * 1000:>9.2f}ms ({change:+.1f}%)", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Dados menores (execução rápida)')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latência da API simulada')
+    parser.add_argument('-k', action='append', help='Só os benchmarks cujo nome contém o texto')
+    parser.add_argument('--json', metavar='ARQUIVO', help="Grava os resultados em JSON ('-' para stdout)")
+    parser.add_argument('--compare', metavar='ARQUIVO', help='JSON de uma execução anterior')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Piora aceitável da mediana, em %%')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Código de saída 1 se algum benchmark piorar além do limite')
+    args = parser.parse_args()
+
+    print(f"🏁 Suíte de benchmarks ({'rápida' if args.quick else 'completa'}, "
+          f"{args.rounds} rodadas)", file=sys.stderr)
+    results = run(args)
+
+    if args.json == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+        print(f"💾 Resultados em {args.json}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"❌ {len(regressions)} benchmark(s) acima do limite", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
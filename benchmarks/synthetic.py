@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Gerador de backlinks sintéticos para os benchmarks
+
+Produz registros com os mesmos campos e distribuições aproximadas descritas em
+API_FIELDS_DOCUMENTATION.md (~60% dofollow, ~5-10% imagem, ranks de 0 a 100,
+datas YYYY-MM-DD), de forma determinística a partir de uma semente.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+
+TLDS = ['com', 'com.br', 'org', 'net', 'io', 'co.uk', 'de', 'info', 'blog', 'edu']
+WORDS = ['seo', 'marketing', 'ferramenta', 'backlinks', 'análise', 'guia', 'review',
+         'melhor', 'digital', 'conteúdo', 'links', 'ranking', 'dicas', 'blog', 'site']
+
+
+def make_backlink(index: int, rng: random.Random, target: str = 'example.com',
+                  referring_domains: int = 5000) -> Dict:
+    """Um backlink sintético no formato de /v1/backlinks/raw"""
+    domain_id = int(rng.paretovariate(1.2)) % referring_domains
+    tld = TLDS[domain_id % len(TLDS)]
+    host = f"{'www.' if domain_id % 3 else ''}site{domain_id}.{tld}"
+    image = rng.random() < 0.08
+    first_seen = date(2020, 1, 1) + timedelta(days=rng.randrange(1800))
+    last_visited = first_seen + timedelta(days=rng.randrange(365))
+    anchor = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+
+    return {
+        'url_from': f"https://{host}/artigo/{index}",
+        'url_to': f"https://{target}/{rng.choice(['', 'blog', 'produto', 'sobre'])}",
+        'title': f"{anchor.title()} - Site {domain_id}",
+        'anchor': '' if image else anchor,
+        'alt': anchor if image else '',
+        'nofollow': rng.random() < 0.4,
+        'image': image,
+        'image_source': f"https://{host}/img/{index}.png" if image else '',
+        'inlink_rank': rng.choice([0, 0, 0, rng.randint(1, 30)]),
+        'domain_inlink_rank': max(1, min(100, int(rng.gauss(35, 20)))) if rng.random() < 0.75 else 0,
+        'first_seen': first_seen.isoformat(),
+        'last_visited': last_visited.isoformat()
+    }
+
+
+def iter_backlinks(count: int, seed: int = 42, **kwargs) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_backlink(index, rng, **kwargs)
+
+
+def generate_backlinks(count: int, seed: int = 42, **kwargs) -> List[Dict]:
+    return list(iter_backlinks(count, seed, **kwargs))
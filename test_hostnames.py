@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Testes do agrupamento por domínio registrável com a Public Suffix List
+"""
+
+import pytest
+
+from backlink_core.hostnames import public_suffix, registrable_domain
+
+
+@pytest.mark.parametrize('host, expected', [
+    ('blog.exemplo.com.br', 'exemplo.com.br'),      # sufixo de segundo nível (ICANN)
+    ('www.exemplo.com.vn', 'exemplo.com.vn'),       # fora do antigo recorte da lista
+    ('usuario.github.io', 'usuario.github.io'),     # seção PRIVATE
+    ('a.b.kawasaki.jp', 'a.b.kawasaki.jp'),         # curinga (*.kawasaki.jp)
+    ('www.city.kawasaki.jp', 'city.kawasaki.jp'),   # exceção (!city.kawasaki.jp)
+    ('loja.exemplo.xn--55qx5d.xn--j6w193g', 'exemplo.xn--55qx5d.xn--j6w193g'),  # 公司.香港 em punycode
+    ('exemplo.com', 'exemplo.com'),
+    ('localhost', 'localhost'),
+])
+def test_registrable_domain(host, expected):
+    assert registrable_domain(host) == expected
+
+
+def test_public_suffix_defaults_to_last_label():
+    assert public_suffix('site.tld-inexistente') == 'tld-inexistente'
+    assert public_suffix('[::1]') is None
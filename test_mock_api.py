@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente contra a API simulada (benchmarks/mock_api.py)
+
+Paginação pelo cursor `next`, retentativa em HTTP 429 com `Retry-After`,
+mesmo resultado com e sem decodificação em streaming e contagem de links
+novos e perdidos da análise incremental, com e sem parada antecipada. Não
+usam a API real nem o cache, o histórico ou os snapshots do usuário.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from mock_api import MockAPIServer
+
+from backlink_core import snapshots
+from backlink_core.client import BacklinkClient
+from backlink_core.rate_limiter import RateLimiter
+
+DOMAIN = 'example.com'
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('SE_RANKING_API_TOKEN', 'mock')
+    monkeypatch.setenv('BACKLINKS_CACHE_DISABLED', '1')
+    monkeypatch.setenv('BACKLINKS_HISTORY', 'off')
+    monkeypatch.setattr(snapshots, '_shared_store',
+                        snapshots.SnapshotStore(str(tmp_path / 'snapshots.db')))
+
+
+def make_client(api: MockAPIServer, **kwargs) -> BacklinkClient:
+    client = BacklinkClient(base_url=api.url, max_rows=0, max_pages=0, cache_mode='bypass', **kwargs)
+    # Sem limite de vazão e com backoff curto, como nos benchmarks
+    client.limiter = RateLimiter(rate=0, burst=1, max_concurrency=4, max_retries=8,
+                                 backoff_base=0.001, backoff_max=0.01)
+    return client
+
+
+def link(backlink) -> tuple:
+    return backlink['url_from'], backlink['url_to'], backlink['anchor']
+
+
+def test_pagination_follows_next_cursor():
+    with MockAPIServer(rows=250, max_limit=100) as api:
+        pages = list(make_client(api, stream_json=False).iter_backlinks(DOMAIN))
+
+        assert [len(page['backlinks']) for page in pages] == [100, 100, 50]
+        assert [page['next'] for page in pages] == ['100', '200', None]
+        assert [page['has_more'] for page in pages] == [True, True, False]
+        assert len({link(backlink) for page in pages for backlink in page['backlinks']}) == 250
+        assert api.stats()['requests'] == 3
+
+
+def test_retries_throttled_requests_after_retry_after():
+    with MockAPIServer(rows=500, max_limit=50, throttle_rate=0.3, retry_after=0.02) as api:
+        client = make_client(api, stream_json=False)
+        started = time.perf_counter()
+        rows = sum(len(page['backlinks']) for page in client.iter_backlinks(DOMAIN))
+        elapsed = time.perf_counter() - started
+
+        assert rows == 500
+        assert api.stats()['throttled'] > 0
+        assert client.limiter.throttled == api.stats()['throttled']
+        assert client.limiter.retries == client.limiter.throttled
+        # Cada 429 espera ao menos o Retry-After antes de repetir
+        assert elapsed >= client.limiter.throttled * 0.02
+
+
+def test_streaming_and_buffered_results_match():
+    with MockAPIServer(rows=1200, max_limit=500) as api:
+        buffered = make_client(api, stream_json=False).analyze_domain(DOMAIN, sample_size=20)
+        streamed = make_client(api, stream_json=True).analyze_domain(DOMAIN, sample_size=20)
+
+    table_buffered = buffered.pop('backlinks_table')
+    table_streamed = streamed.pop('backlinks_table')
+    assert streamed == buffered
+    assert len(table_streamed) == len(table_buffered) == 1200
+
+
+def test_snapshot_counts_new_and_lost_links():
+    with MockAPIServer(rows=300, max_limit=100) as api:
+        client = make_client(api)
+        # Sem ordem por first_seen: toda análise vai até o fim do perfil
+        client.incremental_order_by = ''
+
+        baseline = client.analyze_changes(DOMAIN)
+        assert baseline['changes']['mode'] == 'baseline'
+        assert baseline['changes']['new_count'] == 300
+
+        api.set_rows(350)
+        grown = client.analyze_changes(DOMAIN)
+        assert grown['changes']['new_count'] == 50
+        assert grown['changes']['lost_count'] == 0
+        assert grown['total_backlinks'] == 350
+
+        api.set_rows(320)
+        shrunk = client.analyze_changes(DOMAIN)
+        assert shrunk['changes']['new_count'] == 0
+        assert shrunk['changes']['lost_count'] == 30
+        assert len(shrunk['changes']['lost_backlinks']) == 30
+        assert shrunk['total_backlinks'] == 320
+
+
+def test_incremental_analysis_stops_at_known_links():
+    with MockAPIServer(rows=300, max_limit=100) as api:
+        client = make_client(api)
+        assert client.incremental_order_by == 'first_seen'
+
+        baseline = client.analyze_changes(DOMAIN)
+        assert baseline['pages_fetched'] == 3
+
+        api.set_rows(310)
+        requests = api.stats()['requests']
+        changes = client.analyze_changes(DOMAIN)
+        assert changes['changes']['mode'] == 'incremental'
+        assert changes['pages_fetched'] == 1
+        assert api.stats()['requests'] == requests + 1
+        assert changes['changes']['new_count'] == 10
+        # Com a parada antecipada, links perdidos não são procurados
+        assert not changes['changes']['lost_count']
+        assert changes['total_backlinks'] == 310
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Testes do limitador: vagas de concorrência liberadas em qualquer saída de
+`request` e respostas descartadas fechadas antes da retentativa
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backlink_core.rate_limiter import AsyncRateLimiter, RateLimiter
+
+MAX_CONCURRENCY = 2
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+def failing_send():
+    raise ValueError('resposta inválida')
+
+
+def test_non_retryable_exceptions_release_the_slot():
+    limiter = RateLimiter(rate=0, max_concurrency=MAX_CONCURRENCY, max_retries=0)
+    outcome = []
+
+    def run():
+        for _ in range(MAX_CONCURRENCY + 1):
+            with pytest.raises(ValueError):
+                limiter.request(failing_send)
+        outcome.append(limiter.request(lambda: FakeResponse(200)).status_code)
+
+    # Com a vaga presa, `acquire` bloquearia para sempre
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+    assert outcome == [200]
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_async_non_retryable_exceptions_release_the_slot():
+    async def failing():
+        failing_send()
+
+    async def succeeding():
+        return FakeResponse(200)
+
+    async def run():
+        limiter = AsyncRateLimiter(rate=0, max_concurrency=MAX_CONCURRENCY, max_retries=0)
+        for _ in range(MAX_CONCURRENCY + 1):
+            with pytest.raises(ValueError):
+                await limiter.request(failing)
+        response = await asyncio.wait_for(limiter.request(succeeding), timeout=5)
+        return response.status_code, limiter.concurrency.in_flight
+
+    assert asyncio.run(run()) == (200, 0)
+
+
+def test_async_retried_responses_are_closed():
+    responses = [FakeResponse(503), FakeResponse(200)]
+    pending = iter(responses)
+
+    async def send():
+        return next(pending)
+
+    async def run():
+        limiter = AsyncRateLimiter(rate=0, max_concurrency=MAX_CONCURRENCY, max_retries=2,
+                                   backoff_base=0.001, backoff_max=0.001)
+        return await limiter.request(send)
+
+    assert asyncio.run(run()) is responses[1]
+    assert responses[0].closed
+    assert not responses[1].closed